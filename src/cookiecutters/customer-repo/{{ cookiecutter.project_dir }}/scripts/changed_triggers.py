@@ -0,0 +1,32 @@
+import json
+import sys
+
+args = sys.argv[1:]
+
+file_path = args[0]
+
+# Data Factory refuses to update or delete a started trigger
+CHANGING_OPERATIONS = ("update", "replace", "delete", "delete-replaced", "create-replacement")
+TRIGGER_RESOURCE_TYPE = "azure-native:datafactory:Trigger"
+
+
+def load_file(path: str):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def print_trigger_ids(data: dict):
+    trigger_ids = {
+        step["oldState"]["id"]
+        for step in data.get("steps", [])
+        if step["op"] in CHANGING_OPERATIONS
+        and TRIGGER_RESOURCE_TYPE in step["urn"]
+        and step.get("oldState", {}).get("id")
+    }
+    for trigger_id in sorted(trigger_ids):
+        print(trigger_id)
+
+
+if __name__ == "__main__":
+    data = load_file(file_path)
+    print_trigger_ids(data)
@@ -1,7 +1,39 @@
 # All sub-components to load. Please note, this is not an execution order.
 # Pulumi will load all files first and then will build the dependency graph.
-import management
-import network
-import security
-import storage
-import analytics
+# Services that are disabled in the platform config are never imported, along
+# with the provider SDKs only they use.
+from ingenii_azure_data_platform.iam import role_assignment_planner
+from ingenii_azure_data_platform.services import ServiceRegistry
+
+from project_config import platform_config
+from platform_shared import (
+    cluster_created,
+    datafactory_runtime_config,
+    jupyterlab_config,
+)
+
+services = ServiceRegistry()
+
+services.register("management")
+services.register("network")
+services.register("security")
+services.register("storage")
+services.register("analytics")
+services.register("analytics.datafactory")
+services.register(
+    "analytics.datafactory.integrated_integration_runtime",
+    enabled=datafactory_runtime_config["enabled"],
+)
+services.register("analytics.databricks")
+services.register("analytics.dbt")
+services.register("analytics.kubernetes", enabled=cluster_created)
+services.register("analytics.jupyterlab.deployment", enabled=jupyterlab_config["enabled"])
+services.register(
+    "logs.diagnostic_policies",
+    enabled=platform_config["logs"].get("mode", "resource") == "policy",
+)
+
+services.load()
+
+# Role assignments requested by the services, deduplicated
+role_assignment_planner.emit()
@@ -3,8 +3,4 @@ from project_config import platform_outputs
 
 platform_outputs["analytics"] = {}
 
-from . import datafactory
-from . import databricks
-from . import dbt
-from . import jupyterlab
-from . import kubernetes
+# Sub-modules are loaded through the service registry in __main__.py
@@ -4,11 +4,12 @@ import pulumi_azure_native as azure_native
 import pulumi_azuread as azuread
 import pulumi_databricks as databricks
 
-from ingenii_azure_data_platform.databricks import create_cluster
+from ingenii_azure_data_platform.databricks import create_cluster, plan_instance_pools
 from ingenii_azure_data_platform.iam import (
     GroupRoleAssignment,
     RoleAssignment,
     ServicePrincipalRoleAssignment,
+    role_assignment_planner,
 )
 from ingenii_azure_data_platform.logs import log_diagnostic_settings
 from ingenii_azure_data_platform.network import PlatformFirewall
@@ -86,7 +87,7 @@ workspace = azure_native.databricks.Workspace(
     ),
 )
 if platform_config.resource_protection:
-    lock_resource(workspace_name, workspace.id)
+    lock_resource(workspace_name, workspace.id, parents=[resource_groups["infra"]])
 
 outputs.update({
     "hostname": workspace.workspace_url,
@@ -121,11 +122,13 @@ for assignment in workspace_config.get("iam", {}).get("role_assignments", []):
     # User Group Assignment
     user_group_ref_key = assignment.get("user_group_ref_key")
     if user_group_ref_key is not None:
-        GroupRoleAssignment(
+        role_assignment_planner.request(
+            GroupRoleAssignment,
+            workspace,
+            parents=[resource_groups["infra"]],
             principal_id=user_groups[user_group_ref_key]["object_id"],
             principal_name=user_group_ref_key,
             role_name=assignment["role_definition_name"],
-            scope=workspace.id,
             scope_description="analytics-workspace",
         )
 
@@ -208,8 +211,11 @@ secret_scope = databricks.SecretScope(
 # ----------------------------------------------------------------------------------------------------------------------
 # ANALYTICS DATABRICKS WORKSPACE -> INSTANCE POOLS
 # ----------------------------------------------------------------------------------------------------------------------
+# Pools for the node types of the clusters, and the clusters using them
+auto_instance_pools, cluster_configs = plan_instance_pools(workspace_config)
+
 instance_pools = {}
-for ref_key, config in workspace_config.get("instance_pools", {}).items():
+for ref_key, config in {**auto_instance_pools, **workspace_config.get("instance_pools", {})}.items():
 
     instance_pool_resource_name = generate_resource_name(
         resource_type="databricks_instance_pool",
@@ -239,6 +245,7 @@ for ref_key, config in workspace_config.get("instance_pools", {}).items():
             "idle_instance_auto_termination_minutes", 0
         ),
         custom_tags=config.get("custom_tags", None),
+        preloaded_spark_versions=config.get("preloaded_spark_versions") or None,
         opts=ResourceOptions(
             provider=databricks_provider,
             delete_before_replace=True,
@@ -278,7 +285,7 @@ cluster_default_tags = {"x_" + k: v for k, v in platform_config.tags.items()}
 
 # If no clusters are defined in the YAML files, we'll not attempt to create any.
 clusters = {}
-for ref_key, cluster_config in workspace_config.get("clusters", {}).items():
+for ref_key, cluster_config in cluster_configs.items():
     cluster_defaults = {
         "autotermination_minutes": 10,
         "spark_env_vars": {
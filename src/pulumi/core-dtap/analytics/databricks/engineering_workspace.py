@@ -1,3 +1,4 @@
+import json
 from os import getenv
 
 import pulumi_azure_native as azure_native
@@ -5,10 +6,11 @@ import pulumi_azuread as azuread
 from pulumi import FileAsset, Output, ResourceOptions
 import pulumi_databricks as databricks
 
-from ingenii_azure_data_platform.databricks import create_cluster
+from ingenii_azure_data_platform.databricks import create_cluster, plan_instance_pools
 from ingenii_azure_data_platform.iam import (
     GroupRoleAssignment,
     ServicePrincipalRoleAssignment,
+    role_assignment_planner,
 )
 from ingenii_azure_data_platform.logs import log_diagnostic_settings
 from ingenii_azure_data_platform.network import PlatformFirewall
@@ -86,7 +88,7 @@ workspace = azure_native.databricks.Workspace(
     ),
 )
 if platform_config.resource_protection:
-    lock_resource(workspace_name, workspace.id)
+    lock_resource(workspace_name, workspace.id, parents=[resource_groups["infra"]])
 
 outputs.update({
     "hostname": workspace.workspace_url,
@@ -121,11 +123,13 @@ for assignment in workspace_config.get("iam", {}).get("role_assignments", []):
     # User Group Assignment
     user_group_ref_key = assignment.get("user_group_ref_key")
     if user_group_ref_key is not None:
-        GroupRoleAssignment(
+        role_assignment_planner.request(
+            GroupRoleAssignment,
+            workspace,
+            parents=[resource_groups["infra"]],
             principal_id=user_groups[user_group_ref_key]["object_id"],
             principal_name=user_group_ref_key,
             role_name=assignment["role_definition_name"],
-            scope=workspace.id,
             scope_description="engineering-workspace",
         )
 
@@ -242,8 +246,11 @@ datafactory_token = databricks.Token(
 # ----------------------------------------------------------------------------------------------------------------------
 # ENGINEERING DATABRICKS WORKSPACE -> INSTANCE POOLS
 # ----------------------------------------------------------------------------------------------------------------------
+# Pools for the node types of the clusters, and the clusters using them
+auto_instance_pools, cluster_configs = plan_instance_pools(workspace_config)
+
 instance_pools = {}
-for ref_key, config in workspace_config.get("instance_pools", {}).items():
+for ref_key, config in {**auto_instance_pools, **workspace_config.get("instance_pools", {})}.items():
 
     instance_pool_resource_name = generate_resource_name(
         resource_type="databricks_instance_pool",
@@ -273,6 +280,7 @@ for ref_key, config in workspace_config.get("instance_pools", {}).items():
             "idle_instance_auto_termination_minutes", 0
         ),
         custom_tags=config.get("custom_tags", None),
+        preloaded_spark_versions=config.get("preloaded_spark_versions") or None,
         opts=ResourceOptions(
             provider=databricks_provider,
             delete_before_replace=True,
@@ -313,7 +321,7 @@ cluster_default_tags = {"x_" + k: v for k, v in platform_config.tags.items()}
 system_cluster = create_cluster(
     databricks_provider=databricks_provider, platform_config=platform_config, 
     resource_name=f"{workspace_short_name}-system",
-    cluster_config=workspace_config["clusters"]["system"],
+    cluster_config=cluster_configs["system"],
     cluster_defaults={
         "spark_conf": {
             "spark.databricks.cluster.profile": "singleNode",
@@ -462,11 +470,23 @@ pre_processing_blob = azure_native.storage.Blob(
 # ENGINEERING DATABRICKS WORKSPACE -> CLUSTERS
 # ----------------------------------------------------------------------------------------------------------------------
 
+# What the file ingestion notebook needs, on the 'default' cluster or on the
+# job clusters Data Factory starts for it
+ingestion_libraries = {"whl": [f"dbfs:/mnt/preprocess/{blob_name}"]}
+ingestion_spark_env_vars = {
+    "PYSPARK_PYTHON": "/databricks/python3/bin/python3",
+    "DATABRICKS_WORKSPACE_HOSTNAME": workspace.workspace_url,
+    "DBT_TOKEN_SCOPE": secret_scope_name,
+    "DBT_TOKEN_NAME": dbt_token_name,
+    "DBT_ROOT_FOLDER": "/dbfs/mnt/dbt",
+    "DBT_LOGS_FOLDER": "/dbfs/mnt/dbt-logs",
+}
+
 # A dict of all clusters that are deployed.
 clusters = {}
 
 # If no clusters are defined in the YAML files, we'll not attempt to create any.
-for ref_key, cluster_config in workspace_config.get("clusters", {}).items():
+for ref_key, cluster_config in cluster_configs.items():
     if ref_key == "system":
         continue
 
@@ -479,23 +499,11 @@ for ref_key, cluster_config in workspace_config.get("clusters", {}).items():
 
     # Cluster for file ingestion
     if ref_key == "default":
-        if "libraries" not in cluster_defaults:
-            cluster_defaults["libraries"] = {}
-        if "whl" not in cluster_defaults["libraries"]:
-            cluster_defaults["libraries"]["whl"] = []
-        cluster_defaults["libraries"]["whl"].append(
-            "dbfs:/mnt/preprocess/pre_process-1.0.0-py3-none-any.whl"
-        )
-        cluster_defaults["spark_env_vars"].update(
-            {
-                "DATABRICKS_WORKSPACE_HOSTNAME": workspace.workspace_url,
-                "DATABRICKS_CLUSTER_NAME": cluster_config["display_name"],
-                "DBT_TOKEN_SCOPE": secret_scope_name,
-                "DBT_TOKEN_NAME": dbt_token_name,
-                "DBT_ROOT_FOLDER": "/dbfs/mnt/dbt",
-                "DBT_LOGS_FOLDER": "/dbfs/mnt/dbt-logs",
-            }
-        )
+        cluster_defaults["libraries"] = ingestion_libraries
+        cluster_defaults["spark_env_vars"].update(ingestion_spark_env_vars)
+        # Job clusters are named when they start, so the notebook falls back
+        # to the name of the cluster it runs on
+        cluster_defaults["spark_env_vars"]["DATABRICKS_CLUSTER_NAME"] = cluster_config["display_name"]
 
     # Single Node Cluster Type
     if cluster_config["type"] == "single_node":
@@ -544,6 +552,72 @@ for ref_key, cluster_config in clusters.items():
         opts=ResourceOptions(provider=databricks_provider),
     )
 
+# ----------------------------------------------------------------------------------------------------------------------
+# ENGINEERING DATABRICKS WORKSPACE -> TABLE MAINTENANCE JOB
+# ----------------------------------------------------------------------------------------------------------------------
+
+# Optimizes, vacuums and analyzes the Delta tables only once their thresholds
+# are crossed, rather than after every file ingested. Tables can override the
+# thresholds under 'meta: maintenance:' in their dbt schema yml.
+table_maintenance_config = workspace_config.get("table_maintenance", {})
+
+if table_maintenance_config.get("enabled", False):
+    maintenance_cluster_config = cluster_configs["default"]
+    if maintenance_cluster_config.get("instance_pool_ref_key"):
+        maintenance_compute = {
+            "instance_pool_id": instance_pools[maintenance_cluster_config["instance_pool_ref_key"]].id
+        }
+    else:
+        maintenance_compute = {"node_type_id": maintenance_cluster_config["node_type_id"]}
+
+    table_maintenance_job = databricks.Job(
+        resource_name=generate_resource_name(
+            resource_type="databricks_job",
+            resource_name=f"{workspace_short_name}-table-maintenance",
+            platform_config=platform_config,
+        ),
+        name="Table maintenance",
+        max_concurrent_runs=1,
+        new_cluster=databricks.JobNewClusterArgs(
+            spark_version=maintenance_cluster_config["spark_version"],
+            num_workers=0,
+            spark_conf={
+                "spark.databricks.cluster.profile": "singleNode",
+                "spark.master": "local[*]",
+                "spark.databricks.delta.preview.enabled": "true",
+            },
+            spark_env_vars={
+                "PYSPARK_PYTHON": "/databricks/python3/bin/python3",
+                "DBT_ROOT_FOLDER": "/dbfs/mnt/dbt",
+            },
+            custom_tags={"ResourceClass": "SingleNode", **cluster_default_tags},
+            **maintenance_compute,
+        ),
+        notebook_task=databricks.JobNotebookTaskArgs(
+            notebook_path="/Shared/Ingenii Engineering/table_maintenance",
+            base_parameters={
+                "databases": ",".join(table_maintenance_config.get("databases", [])),
+                "defaults": json.dumps(
+                    {
+                        "optimize_min_files": table_maintenance_config.get("optimize_min_files", 50),
+                        "optimize_min_average_file_mb": table_maintenance_config.get(
+                            "optimize_min_average_file_mb", 32
+                        ),
+                        "optimize_interval_hours": table_maintenance_config.get("optimize_interval_hours", 24),
+                        "vacuum_interval_hours": table_maintenance_config.get("vacuum_interval_hours", 168),
+                        "vacuum_retain_hours": table_maintenance_config.get("vacuum_retain_hours", 168),
+                        "analyze": table_maintenance_config.get("analyze", True),
+                    }
+                ),
+            },
+        ),
+        schedule=databricks.JobScheduleArgs(
+            quartz_cron_expression=table_maintenance_config.get("schedule", "0 0 2 * * ?"),
+            timezone_id=table_maintenance_config.get("timezone", "UTC"),
+        ),
+        opts=ResourceOptions(provider=databricks_provider, depends_on=list(storage_mounts.values())),
+    )
+
 # ----------------------------------------------------------------------------------------------------------------------
 # DEVOPS ASSIGNMENT
 # ----------------------------------------------------------------------------------------------------------------------
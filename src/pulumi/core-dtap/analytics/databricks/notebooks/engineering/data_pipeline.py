@@ -11,12 +11,15 @@ from ingenii_databricks.pipeline import add_to_source_table, archive_file, \
     create_file_table, move_rows_to_review, prepare_individual_table_yml, \
     pre_process_file, propagate_source_data, remove_file_table, \
     revert_individual_table_yml, test_file_table
-from ingenii_databricks.orchestration import ImportFileEntry
 from ingenii_databricks.validation import check_parameters, \
     check_source_schema, compare_schema_and_table
 
 # COMMAND ----------
 
+# MAGIC %run ./entry_buffer
+
+# COMMAND ----------
+
 
 def get_parameter(parameter_name: str) -> Union[str, None]:
     """
@@ -44,11 +47,19 @@ def get_parameter(parameter_name: str) -> Union[str, None]:
 # Obtain parameters
 dbt_root_folder = environ["DBT_ROOT_FOLDER"]
 log_target_folder = environ["DBT_LOGS_FOLDER"]
+# dbt runs on the cluster the notebook runs on. Job clusters are named when
+# they start, so they don't have the name set
+environ.setdefault(
+    "DATABRICKS_CLUSTER_NAME",
+    spark.conf.get("spark.databricks.clusterUsageTags.clusterName"))
 file_name = get_parameter("file_name")
 increment = get_parameter("increment")
 source = get_parameter("source")
 table_name = get_parameter("table")
 file_path = get_parameter("file_path")
+# 'buffered' writes the entry's updates at checkpoints, 'immediate' on every
+# update
+entry_mode = get_parameter("entry_mode") or "buffered"
 
 if (source is None or table_name is None) and file_path is not None:
     source, table_name = \
@@ -78,9 +89,11 @@ table_schema = source_details["tables"][table_name]
 # COMMAND ----------
 
 # Find or create the orchestration entry
-import_entry = ImportFileEntry(spark, source_name=source,
-                               table_name=table_name, file_name=file_name,
-                               increment=increment)
+import_entry = BufferedImportFileEntry(spark, source_name=source,
+                                       table_name=table_name,
+                                       file_name=file_name,
+                                       increment=increment,
+                                       buffered=entry_mode == "buffered")
 
 # Check that the current table schema will accept this new data
 compare_schema_and_table(spark, import_entry, table_schema)
@@ -91,6 +104,9 @@ if import_entry.is_stage(Stage.NEW):
     archive_file(import_entry)
     import_entry.update_status(Stage.ARCHIVED)
 
+    # Checkpoint: the file has left raw, and can't be archived again
+    import_entry.flush()
+
 # COMMAND ----------
 
 # Pre-process and stage the file
@@ -102,6 +118,9 @@ if import_entry.is_stage(Stage.ARCHIVED):
     import_entry.update_rows_read(n_rows)
     import_entry.update_status(Stage.STAGED)
 
+# Checkpoint: the file table exists
+import_entry.flush()
+
 # COMMAND ----------
 
 # Create temporary .yml to identify this as a source, including tests
@@ -149,6 +168,9 @@ if import_entry.is_stage(Stage.CLEANED):
     add_to_source_table(spark, import_entry, table_schema)
     import_entry.update_status(Stage.INSERTED)
 
+# Checkpoint: the rows are in the source table, and mustn't be added again
+import_entry.flush()
+
 # COMMAND ----------
 
 # Tidying
@@ -156,8 +178,8 @@ if import_entry.is_stage(Stage.INSERTED):
     remove_file_table(spark, dbutils, import_entry)
     import_entry.update_status(Stage.COMPLETED)
 
-    # Optimize table to keep it performant
-    spark.sql("OPTIMIZE orchestration.import_file ZORDER BY (source, table)")
+# Checkpoint: also keeps the stage reached if the tests failed
+import_entry.flush()
 
 # COMMAND ----------
 
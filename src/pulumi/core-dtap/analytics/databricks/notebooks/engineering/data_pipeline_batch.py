@@ -0,0 +1,334 @@
+# Databricks notebook source
+
+from datetime import datetime
+from os import environ
+from py4j.protocol import Py4JJavaError
+from pyspark.sql.functions import col
+from pyspark.sql.utils import AnalysisException
+from typing import Dict, List, Tuple, Union
+
+from ingenii_data_engineering.dbt_schema import get_project_config, get_source
+
+from ingenii_databricks.enums import Stage
+from ingenii_databricks.pipeline import add_to_source_table, archive_file, \
+    create_file_table, move_rows_to_review, prepare_individual_table_yml, \
+    pre_process_file, propagate_source_data, remove_file_table, \
+    revert_individual_table_yml, test_file_table
+from ingenii_databricks.validation import check_source_schema, \
+    compare_schema_and_table
+
+# COMMAND ----------
+
+# MAGIC %run ./entry_buffer
+
+# COMMAND ----------
+
+
+def get_parameter(parameter_name: str) -> Union[str, None]:
+    """
+    Obtain a parameter of the pipeline. If it hasn't been passed, return None
+
+    Parameters
+    ----------
+    parameter_name : str
+        The name of the parameter to get
+
+    Returns
+    -------
+    Union[str, None]
+        Either the parameter value, or None
+    """
+
+    try:
+        return dbutils.widgets.get(parameter_name)
+    except Py4JJavaError:
+        return
+
+
+def to_milliseconds(timestamp: str) -> int:
+    """
+    Convert a Data Factory timestamp, e.g. 2022-01-01T00:15:00Z, to
+    milliseconds since the epoch, as file modification times are
+    """
+    return int(
+        datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+        * 1000)
+
+
+def table_exists(full_table_name: str) -> bool:
+    try:
+        spark.table(full_table_name)
+        return True
+    except AnalysisException:
+        return False
+
+
+def find_pending_files(window_end: int, increment: int
+                       ) -> Dict[Tuple[str, str], List[Tuple[str, int]]]:
+    """
+    Find every file still to ingest: the files in /mnt/raw/<source>/<table>/
+    written before the end of the window, as archiving moves them out of raw,
+    and the files of orchestration.import_file entries not completed yet,
+    e.g. left mid-stage by a failed run. Not only the files written within
+    the window, so files of a table that failed, or that became visible
+    late, are picked up by the next window. The stages make re-running safe
+
+    Parameters
+    ----------
+    window_end : int
+        End of the window in milliseconds, exclusive
+    increment : int
+        The increment of the files in raw
+
+    Returns
+    -------
+    Dict[Tuple[str, str], List[Tuple[str, int]]]
+        The file names and increments, by source and table
+    """
+    pending_files = {}
+    for source_info in dbutils.fs.ls("/mnt/raw"):
+        if not source_info.isDir():
+            continue
+        for table_info in dbutils.fs.ls(source_info.path):
+            if not table_info.isDir():
+                continue
+            for file_info in dbutils.fs.ls(table_info.path):
+                if file_info.isFile() \
+                        and file_info.modificationTime < window_end:
+                    pending_files.setdefault(
+                        (source_info.name.strip("/"),
+                         table_info.name.strip("/")), set()
+                    ).add((file_info.name, increment))
+
+    incomplete = spark.table("orchestration.import_file") \
+        .where(col("date_completed").isNull()) \
+        .select("source", "table", "file_name", "increment").collect()
+    for row in incomplete:
+        pending_files.setdefault((row.source, row.table), set()) \
+            .add((row.file_name, int(row.increment)))
+
+    return {
+        source_table: sorted(files)
+        for source_table, files in pending_files.items()
+    }
+
+
+def combine_file_tables(entries: List[ImportFileEntry]) -> ImportFileEntry:
+    """
+    Move the rows of every entry's file table into the first one that still
+    exists, and drop the others, so the batch is tested and merged once.
+    Entries whose file table is already gone were combined by an earlier run
+
+    Parameters
+    ----------
+    entries : List[ImportFileEntry]
+        The entries of the batch at the same stage
+
+    Returns
+    -------
+    ImportFileEntry
+        The entry whose file table holds the rows of the whole batch
+    """
+    with_tables = [
+        entry for entry in entries
+        if table_exists(entry.get_full_file_table_name())
+    ]
+    if not with_tables:
+        raise Exception(
+            "No file table found for the batch of files "
+            f"{[entry.file_name for entry in entries]}!")
+
+    batch_entry, others = with_tables[0], with_tables[1:]
+    for entry in others:
+        spark.sql(
+            f"INSERT INTO {batch_entry.get_full_file_table_name()} "
+            f"SELECT * FROM {entry.get_full_file_table_name()}")
+        remove_file_table(spark, dbutils, entry)
+    return batch_entry
+
+
+# COMMAND ----------
+
+# Obtain parameters
+dbt_root_folder = environ["DBT_ROOT_FOLDER"]
+log_target_folder = environ["DBT_LOGS_FOLDER"]
+# dbt runs on the cluster the notebook runs on. Job clusters are named when
+# they start, so they don't have the name set
+environ.setdefault(
+    "DATABRICKS_CLUSTER_NAME",
+    spark.conf.get("spark.databricks.clusterUsageTags.clusterName"))
+increment = int(get_parameter("increment") or 0)
+window_start = get_parameter("window_start")
+window_end = get_parameter("window_end")
+# 'buffered' writes the entries' updates at checkpoints, 'immediate' on every
+# update
+entry_mode = get_parameter("entry_mode") or "buffered"
+
+if window_start is None or window_end is None:
+    raise Exception("Parameters 'window_start' and 'window_end' are required!")
+
+pending_files = find_pending_files(to_milliseconds(window_end), increment)
+print(f"Found {sum(len(files) for files in pending_files.values())} files "
+      f"to ingest for {len(pending_files)} tables, for the window "
+      f"{window_start} to {window_end}")
+
+databricks_dbt_token = \
+    dbutils.secrets.get(scope=environ["DBT_TOKEN_SCOPE"],
+                        key=environ["DBT_TOKEN_NAME"])
+project_name = get_project_config(dbt_root_folder)["name"]
+
+# COMMAND ----------
+
+
+def ingest_batch(source: str, table_name: str,
+                 files: List[Tuple[str, int]]) -> None:
+    """
+    Ingest all pending files of one table. Every file keeps its own
+    orchestration entry and stages, but the files are tested and merged as
+    one file table
+
+    Parameters
+    ----------
+    source : str
+        The name of the source
+    table_name : str
+        The name of the table
+    files : List[Tuple[str, int]]
+        The names and increments of the files to ingest
+    """
+    source_details = get_source(dbt_root_folder, source)
+
+    # Check that the schema for this particular source is acceptable
+    check_source_schema(source_details)
+
+    if table_name not in source_details["tables"]:
+        raise Exception(
+            f"Table schema '{table_name}' not found for source '{source}'"
+        )
+    table_schema = source_details["tables"][table_name]
+
+    # Find or create the orchestration entries
+    entries = [
+        BufferedImportFileEntry(spark, source_name=source,
+                                table_name=table_name, file_name=file_name,
+                                increment=file_increment,
+                                buffered=entry_mode == "buffered")
+        for file_name, file_increment in files
+    ]
+
+    # Check that the current table schema will accept this new data
+    for import_entry in entries:
+        compare_schema_and_table(spark, import_entry, table_schema)
+
+    # Archive every file
+    try:
+        for import_entry in entries:
+            if import_entry.is_stage(Stage.NEW):
+                archive_file(import_entry)
+                import_entry.update_status(Stage.ARCHIVED)
+    finally:
+        # Checkpoint: the files have left raw, and can't be archived again,
+        # even if archiving a later file failed
+        flush_entries(spark, entries)
+
+    # Pre-process and stage every file
+    for import_entry in entries:
+        if import_entry.is_stage(Stage.ARCHIVED):
+            pre_process_file(import_entry)
+
+            n_rows = create_file_table(spark, import_entry, table_schema)
+            import_entry.update_rows_read(n_rows)
+            import_entry.update_status(Stage.STAGED)
+
+    # Checkpoint: the file tables exist
+    flush_entries(spark, entries)
+
+    # Test all staged files at once
+    staged = [entry for entry in entries if entry.is_stage(Stage.STAGED)]
+    if staged:
+        batch_entry = combine_file_tables(staged)
+
+        prepare_individual_table_yml(table_schema["file_name"], batch_entry)
+        testing_result = \
+            test_file_table(batch_entry, databricks_dbt_token,
+                            dbt_root_folder, log_target_folder)
+        revert_individual_table_yml(table_schema["file_name"])
+
+        if not testing_result["success"]:
+            print("Errors found while testing:")
+            for error_message in testing_result["error_messages"]:
+                print(f"    - {error_message}")
+
+            if testing_result["error_sql_files"]:
+                move_rows_to_review(
+                    spark, batch_entry, table_schema,
+                    dbt_root_folder, testing_result["error_sql_files"])
+
+                print(f"Rows with problems have been moved to review table "
+                      f"{batch_entry.get_full_review_table_name()}")
+            else:
+                raise Exception("\n".join([
+                    "stdout:", testing_result["stdout"],
+                    "stderr:", testing_result["stderr"]
+                    ]))
+        else:
+            batch_entry.update_status(Stage.CLEANED)
+
+        # The other files' rows were tested with the batch entry's
+        if batch_entry.is_stage(Stage.CLEANED):
+            for import_entry in staged:
+                if import_entry is not batch_entry:
+                    import_entry.update_status(Stage.CLEANED)
+
+    # Append / Merge into main table once
+    cleaned = [entry for entry in entries if entry.is_stage(Stage.CLEANED)]
+    if cleaned:
+        batch_entry = combine_file_tables(cleaned)
+        add_to_source_table(spark, batch_entry, table_schema)
+        for import_entry in cleaned:
+            import_entry.update_status(Stage.INSERTED)
+
+    # Checkpoint: the rows are in the source table, and mustn't be added again
+    flush_entries(spark, entries)
+
+    # Tidying
+    for import_entry in entries:
+        if import_entry.is_stage(Stage.INSERTED):
+            if table_exists(import_entry.get_full_file_table_name()):
+                remove_file_table(spark, dbutils, import_entry)
+            import_entry.update_status(Stage.COMPLETED)
+
+    # Checkpoint: also keeps the stages reached if the tests failed
+    flush_entries(spark, entries)
+
+    # Check pipeline did complete as expected
+    incomplete = {
+        import_entry.file_name: import_entry.get_current_stage()
+        for import_entry in entries
+        if import_entry.get_current_stage() != Stage.COMPLETED
+    }
+    if incomplete:
+        raise Exception(
+            f"Pipeline didn't make it to completion for some files! "
+            f"Stages reached: {incomplete}"
+        )
+
+    # Propagate this source data to downstream models and snapshots
+    propagate_source_data(
+        databricks_dbt_token, project_name, source, table_name)
+
+
+# COMMAND ----------
+
+# A failing table doesn't stop the others
+failures = {}
+for (source, table_name), files in pending_files.items():
+    print(f"Ingesting {len(files)} files for {source}.{table_name}")
+    try:
+        ingest_batch(source, table_name, files)
+    except Exception as e:
+        failures[f"{source}.{table_name}"] = str(e)
+
+if failures:
+    raise Exception("\n".join(
+        f"{table}: {message}" for table, message in failures.items()))
@@ -0,0 +1,162 @@
+# Databricks notebook source
+
+from datetime import datetime
+from typing import Callable, List, Set
+
+from delta.tables import DeltaTable
+from pyspark.sql import SparkSession
+from pyspark.sql.functions import coalesce, col, lit
+from pyspark.sql.types import StructType
+
+from ingenii_databricks.enums import Stage
+from ingenii_databricks.orchestration import ImportFileEntry
+
+IMPORT_FILE_TABLE = "orchestration.import_file"
+KEY_COLUMNS = ("source", "table", "file_name", "increment")
+
+# The columns of orchestration.import_file, read from its schema once per run
+_import_file_columns = set()
+
+
+def import_file_columns(spark: SparkSession) -> Set[str]:
+    """ The columns of orchestration.import_file """
+    if not _import_file_columns:
+        _import_file_columns.update(spark.table(IMPORT_FILE_TABLE).columns)
+    return _import_file_columns
+
+# COMMAND ----------
+
+
+class BufferedImportFileEntry(ImportFileEntry):
+    """
+    An ImportFileEntry that keeps its stage transitions and rows read in
+    memory, and writes them to orchestration.import_file with one MERGE when
+    flushed, rather than one Delta commit per update. Flush at the points a
+    run needs to resume from, i.e. after any step that can't be repeated.
+
+    A stage is buffered as the 'status' column set to the stage's value and
+    the 'date_<stage>' column, if there is one, set to the time, and the rows
+    read as the 'rows_read' column. Updates are only buffered if the
+    import_file schema has these columns, otherwise, or if buffered is False,
+    they are written by ImportFileEntry as before
+
+    Parameters
+    ----------
+    spark : SparkSession
+        The Spark session
+    source_name : str
+        The name of the source
+    table_name : str
+        The name of the table
+    file_name : str
+        The name of the file
+    increment : int
+        The increment of the file
+    buffered : bool
+        Whether to buffer the updates
+    """
+
+    def __init__(self, spark: SparkSession, source_name: str, table_name: str,
+                 file_name: str, increment: int = 0,
+                 buffered: bool = True) -> None:
+        super().__init__(spark, source_name=source_name, table_name=table_name,
+                         file_name=file_name, increment=increment)
+        self._spark = spark
+        self._key = {
+            "source": source_name, "table": table_name,
+            "file_name": file_name, "increment": increment,
+        }
+        self._columns = import_file_columns(spark)
+        self._buffered = buffered
+        self._stage = super().get_current_stage()
+        self._pending = {}
+
+    def _update(self, columns: dict, write: Callable, *args) -> None:
+        if self._buffers(columns):
+            self._pending.update(columns)
+        else:
+            write(*args)
+
+    def _buffers(self, columns) -> bool:
+        return self._buffered and set(columns).issubset(self._columns)
+
+    def get_current_stage(self) -> Stage:
+        if self._buffers({"status"}):
+            return self._stage
+        return super().get_current_stage()
+
+    def is_stage(self, stage: Stage) -> bool:
+        if self._buffers({"status"}):
+            return self._stage == stage
+        return super().is_stage(stage)
+
+    def update_status(self, stage: Stage) -> None:
+        columns = {"status": stage.value}
+        date_column = f"date_{stage.name.lower()}"
+        if date_column in self._columns:
+            columns[date_column] = datetime.utcnow()
+        self._update(columns, super().update_status, stage)
+        self._stage = stage
+
+    def update_rows_read(self, n_rows: int) -> None:
+        self._update({"rows_read": n_rows}, super().update_rows_read, n_rows)
+
+    def flush(self) -> None:
+        """ Write the buffered updates, see flush_entries() """
+        flush_entries(self._spark, [self])
+
+
+def flush_entries(spark: SparkSession,
+                  entries: List[BufferedImportFileEntry]) -> None:
+    """
+    Write the buffered updates of all entries with one MERGE. The condition
+    names the sources and tables of the entries, so Delta can skip files by
+    their statistics, which table maintenance Z-orders by source and table.
+    The table isn't partitioned, so MERGEs running at the same time can still
+    conflict, even for different sources, and the run then fails and is
+    retried
+
+    Parameters
+    ----------
+    spark : SparkSession
+        The Spark session
+    entries : List[BufferedImportFileEntry]
+        The entries to write the updates of
+    """
+    entries = [entry for entry in entries if entry._pending]
+    if not entries:
+        return
+
+    import_file_table = DeltaTable.forName(spark, IMPORT_FILE_TABLE)
+    target_schema = import_file_table.toDF().schema
+
+    columns = sorted({column for entry in entries for column in entry._pending})
+    updates = spark.createDataFrame(
+        [
+            tuple(entry._key[column] for column in KEY_COLUMNS)
+            + tuple(entry._pending.get(column) for column in columns)
+            for entry in entries
+        ],
+        StructType([target_schema[column]
+                    for column in KEY_COLUMNS + tuple(columns)]),
+    )
+
+    condition = lit(True)
+    for column in ("source", "table"):
+        values = sorted({entry._key[column] for entry in entries})
+        condition = condition & col(f"target.{column}").isin(values)
+    for column in KEY_COLUMNS:
+        condition = condition & \
+            (col(f"target.{column}") == col(f"updates.{column}"))
+
+    import_file_table.alias("target") \
+        .merge(updates.alias("updates"), condition) \
+        .whenMatchedUpdate(set={
+            column: coalesce(col(f"updates.{column}"),
+                             col(f"target.{column}"))
+            for column in columns
+        }) \
+        .execute()
+
+    for entry in entries:
+        entry._pending = {}
@@ -0,0 +1,201 @@
+# Databricks notebook source
+
+import json
+from datetime import datetime
+from glob import glob
+from os import environ, path
+from py4j.protocol import Py4JJavaError
+from typing import Dict, Tuple, Union
+
+import yaml
+
+# COMMAND ----------
+
+
+def get_parameter(parameter_name: str) -> Union[str, None]:
+    """
+    Obtain a parameter of the job. If it hasn't been passed, return None
+
+    Parameters
+    ----------
+    parameter_name : str
+        The name of the parameter to get
+
+    Returns
+    -------
+    Union[str, None]
+        Either the parameter value, or None
+    """
+
+    try:
+        return dbutils.widgets.get(parameter_name)
+    except Py4JJavaError:
+        return
+
+
+def get_table_settings(dbt_root_folder: str) -> Dict[Tuple[str, str], dict]:
+    """
+    Read the maintenance settings from the dbt schema yml files, under
+    'meta: maintenance:' of every source table, model and snapshot
+
+    Parameters
+    ----------
+    dbt_root_folder : str
+        The root folder of the dbt project
+
+    Returns
+    -------
+    Dict[Tuple[str, str], dict]
+        The settings by database and table. Models and snapshots are under
+        the database None, as their database depends on the dbt target
+    """
+    table_settings = {}
+    for yml_path in glob(path.join(dbt_root_folder, "**", "*.yml"),
+                         recursive=True):
+        with open(yml_path, "r") as yml_file:
+            try:
+                schema = yaml.safe_load(yml_file) or {}
+            except yaml.YAMLError:
+                continue
+        if not isinstance(schema, dict):
+            continue
+
+        for source in schema.get("sources", []) or []:
+            for table in source.get("tables", []) or []:
+                maintenance = (table.get("meta") or {}).get("maintenance")
+                if maintenance:
+                    database = source.get("schema") or source["name"]
+                    table_settings[(database, table["name"])] = maintenance
+        for node_type in ("models", "snapshots"):
+            for node in schema.get(node_type, []) or []:
+                maintenance = (node.get("meta") or {}).get("maintenance")
+                if maintenance:
+                    table_settings[(None, node["name"])] = maintenance
+    return table_settings
+
+
+def hours_since(timestamp: Union[datetime, None]) -> float:
+    if timestamp is None:
+        return float("inf")
+    return (datetime.now() - timestamp).total_seconds() / 3600
+
+
+def maintain_table(full_table_name: str, settings: dict) -> Dict[str, str]:
+    """
+    Inspect a Delta table's details and history, and run OPTIMIZE, VACUUM and
+    ANALYZE only when their thresholds are crossed
+
+    Parameters
+    ----------
+    full_table_name : str
+        The table, as <database>.<table>
+    settings : dict
+        The thresholds, see the job's 'defaults' parameter
+
+    Returns
+    -------
+    Dict[str, str]
+        The operations run and why
+    """
+    detail = spark.sql(f"DESCRIBE DETAIL {full_table_name}").first()
+    if detail["format"] != "delta":
+        return {}
+
+    # Latest first
+    history = spark.sql(
+        f"DESCRIBE HISTORY {full_table_name} LIMIT 1000"
+    ).select("timestamp", "operation").collect()
+
+    def last_operation(*operations):
+        for entry in history:
+            if entry["operation"] in operations:
+                return entry["timestamp"]
+
+    last_optimize = last_operation("OPTIMIZE")
+    last_vacuum = last_operation("VACUUM END")
+    writes_since_optimize = sum(
+        1 for entry in history
+        if entry["operation"] not in ("OPTIMIZE", "VACUUM START", "VACUUM END")
+        and (last_optimize is None or entry["timestamp"] > last_optimize)
+    )
+
+    num_files = detail["numFiles"] or 0
+    average_file_mb = \
+        (detail["sizeInBytes"] or 0) / num_files / 1024 / 1024 \
+        if num_files else 0
+
+    operations = {}
+
+    if num_files >= settings["optimize_min_files"] and writes_since_optimize \
+            and (average_file_mb < settings["optimize_min_average_file_mb"]
+                 or hours_since(last_optimize)
+                 >= settings["optimize_interval_hours"]):
+        zorder_by = settings.get("zorder_by") or []
+        spark.sql(
+            f"OPTIMIZE {full_table_name}"
+            + (f" ZORDER BY ({', '.join(zorder_by)})" if zorder_by else "")
+        )
+        operations["optimize"] = \
+            f"{num_files} files averaging {average_file_mb:.1f}MB, " \
+            f"{writes_since_optimize} writes since the last optimize"
+
+        # The layout changed, so refresh the statistics
+        if settings["analyze"]:
+            spark.sql(
+                f"ANALYZE TABLE {full_table_name} COMPUTE STATISTICS")
+            operations["analyze"] = "after optimize"
+
+    if hours_since(last_vacuum) >= settings["vacuum_interval_hours"]:
+        spark.sql(
+            f"VACUUM {full_table_name} "
+            f"RETAIN {settings['vacuum_retain_hours']} HOURS")
+        operations["vacuum"] = \
+            f"last vacuumed {hours_since(last_vacuum):.0f} hours ago"
+
+    return operations
+
+
+# COMMAND ----------
+
+# Obtain parameters
+dbt_root_folder = environ["DBT_ROOT_FOLDER"]
+default_settings = json.loads(get_parameter("defaults") or "{}")
+databases = [
+    database.strip()
+    for database in (get_parameter("databases") or "").split(",")
+    if database.strip()
+] or [database.name for database in spark.catalog.listDatabases()
+      if database.name != "default"]
+
+table_settings = get_table_settings(dbt_root_folder)
+
+# The orchestration table is queried by source and table
+table_settings[("orchestration", "import_file")] = {
+    "zorder_by": ["source", "table"],
+    **table_settings.get(("orchestration", "import_file"), {}),
+}
+
+# COMMAND ----------
+
+failures = {}
+for database in databases:
+    for table in spark.catalog.listTables(database):
+        if table.isTemporary or table.tableType == "VIEW":
+            continue
+        full_table_name = f"{database}.{table.name}"
+        settings = {
+            **default_settings,
+            **table_settings.get((None, table.name), {}),
+            **table_settings.get((database, table.name), {}),
+        }
+        try:
+            operations = maintain_table(full_table_name, settings)
+        except Exception as e:
+            failures[full_table_name] = str(e)
+            continue
+        for operation, reason in operations.items():
+            print(f"{full_table_name}: {operation.upper()} ({reason})")
+
+if failures:
+    raise Exception("\n".join(
+        f"{table}: {message}" for table, message in failures.items()))
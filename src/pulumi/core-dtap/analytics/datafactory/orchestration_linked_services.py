@@ -4,7 +4,7 @@ from ingenii_azure_data_platform.iam import ServicePrincipalRoleAssignment
 
 from analytics.databricks import analytics_workspace as databricks_analytics, \
     engineering_workspace as databricks_engineering
-from analytics.datafactory.orchestration import datafactory, datafactory_name
+from analytics.datafactory.orchestration import datafactory, datafactory_config, datafactory_name
 from management import resource_groups
 from security import credentials_store
 from storage.datalake import datalake
@@ -98,7 +98,8 @@ def linked_service_cluster(resource_name, linked_service_name, workspace, cluste
         resource_group_name=resource_groups["infra"].name,
     )  # type: ignore
 
-def linked_service_instance_pool(resource_name, linked_service_name, workspace, instance_pool_id):
+def linked_service_instance_pool(resource_name, linked_service_name, workspace, instance_pool_id,
+                                 **new_cluster_settings):
     return adf.LinkedService(
         resource_name=resource_name.replace(" ", "-").lower(),
         factory_name=datafactory.name,
@@ -108,6 +109,7 @@ def linked_service_instance_pool(resource_name, linked_service_name, workspace,
             domain=workspace.workspace_url.apply(lambda url: f"https://{url}"),
             instance_pool_id=instance_pool_id,
             workspace_resource_id=workspace.id,
+            **new_cluster_settings,
             description="Managed by Ingenii Data Platform",
             type="AzureDatabricks",
         ),
@@ -134,6 +136,60 @@ databricks_engineering_compute_linked_service = \
         databricks_engineering.clusters["default"].id
     )
 
+# ----------------------------------------------------------------------------------------------------------------------
+# DATA FACTORY -> DATABRICKS -> ENGINEERING -> FILE INGESTION
+# ----------------------------------------------------------------------------------------------------------------------
+
+ingestion_compute_config = datafactory_config.get("ingestion_compute", {})
+
+if ingestion_compute_config.get("mode", "cluster") == "job_cluster":
+    default_cluster_config = databricks_engineering.cluster_configs["default"]
+
+    instance_pool_ref_key = ingestion_compute_config.get(
+        "instance_pool_ref_key", default_cluster_config.get("instance_pool_ref_key"))
+    if instance_pool_ref_key not in databricks_engineering.instance_pools:
+        raise Exception(
+            "Job clusters for file ingestion need an instance pool of the engineering workspace, "
+            f"'{instance_pool_ref_key}' is not one. Set 'ingestion_compute.instance_pool_ref_key' "
+            "or enable 'auto_instance_pools'."
+        )
+
+    if ingestion_compute_config.get("auto_scale_min_workers") and \
+            ingestion_compute_config.get("auto_scale_max_workers"):
+        num_of_workers = f"{ingestion_compute_config['auto_scale_min_workers']}:" \
+                         f"{ingestion_compute_config['auto_scale_max_workers']}"
+    else:
+        num_of_workers = str(ingestion_compute_config.get("num_workers", 0))
+
+    if num_of_workers == "0":
+        spark_conf = {
+            "spark.databricks.cluster.profile": "singleNode",
+            "spark.master": "local[*]",
+            "spark.databricks.delta.preview.enabled": "true",
+        }
+        custom_tags = {"ResourceClass": "SingleNode"}
+    else:
+        spark_conf = {"spark.databricks.delta.preview.enabled": "true"}
+        custom_tags = {}
+
+    # A job cluster per file, started from the pool and terminated when the
+    # notebook finishes
+    databricks_engineering_ingestion_linked_service = \
+        linked_service_instance_pool(
+            f"{datafactory_name}-link-to-databricks-engineering-job-compute",
+            "Databricks Engineering Job Compute",
+            databricks_engineering.workspace,
+            databricks_engineering.instance_pools[instance_pool_ref_key].id,
+            new_cluster_version=ingestion_compute_config.get(
+                "spark_version", default_cluster_config["spark_version"]),
+            new_cluster_num_of_worker=num_of_workers,
+            new_cluster_spark_conf=spark_conf,
+            new_cluster_spark_env_vars=databricks_engineering.ingestion_spark_env_vars,
+            new_cluster_custom_tags={**custom_tags, **databricks_engineering.cluster_default_tags},
+        )
+else:
+    databricks_engineering_ingestion_linked_service = databricks_engineering_compute_linked_service
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 # DATA FACTORY -> DATABRICKS -> ANALYTICS
@@ -1,11 +1,14 @@
+from datetime import datetime, timedelta, timezone
+
 from pulumi import ResourceOptions
 from pulumi_azure_native import datafactory as adf
 
 from analytics.datafactory.orchestration import datafactory, \
-    datafactory_config, datafactory_name
+    datafactory_config, datafactory_name, outputs
 from analytics.datafactory.orchestration_datasets import data_lake_folder
+from analytics.databricks import engineering_workspace as databricks_engineering
 from analytics.datafactory.orchestration_linked_services import databricks_analytics_compute_linked_service, \
-    databricks_engineering_compute_linked_service, datalake_linked_service
+    databricks_engineering_ingestion_linked_service, datalake_linked_service, ingestion_compute_config
 from management import resource_groups
 from storage.datalake import datalake
 
@@ -21,14 +24,35 @@ def minutes_to_string(n_mins):
 # DATA FACTORY -> INGESTION PIPELINE AND TRIGGER
 # ----------------------------------------------------------------------------------------------------------------------
 
-ingestion_policy = datafactory_config.get("ingestion_policy", {})
+ingestion_policy = dict(datafactory_config.get("ingestion_policy", {}))
+
+if ingestion_compute_config.get("mode", "cluster") == "job_cluster":
+    # Every file gets its own job cluster, so many can run at once
+    ingestion_concurrency = ingestion_compute_config.get("concurrency", 10)
+    # Files of the same table merge into the same Delta tables at once, and
+    # the losers of a conflict fail. Their stages make a rerun resume
+    ingestion_policy.setdefault("retry", 3)
+    ingestion_policy.setdefault("retry_interval", 60)
+    # Job clusters start without the libraries of the 'default' cluster
+    job_cluster_libraries = ingestion_compute_config.get("libraries", {})
+    ingestion_libraries = [
+        {"whl": whl}
+        for whl in databricks_engineering.ingestion_libraries["whl"] + job_cluster_libraries.get("whl", [])
+    ] + [
+        {"pypi": {key: value for key, value in lib.items() if key in ("package", "repo")}}
+        for lib in job_cluster_libraries.get("pypi", [])
+    ]
+else:
+    # One file at a time on the shared 'default' cluster
+    ingestion_concurrency = 1
+    ingestion_libraries = None
 
 databricks_file_ingestion_pipeline = adf.Pipeline(
     resource_name=f"{datafactory_name}-raw-databricks-file-ingestion",
     factory_name=datafactory.name,
     pipeline_name="Trigger ingest file notebook",
     description="Managed by Ingenii Data Platform",
-    concurrency=1,
+    concurrency=ingestion_concurrency,
     parameters={
         "fileName": adf.ParameterSpecificationArgs(type="String"),
         "filePath": adf.ParameterSpecificationArgs(type="String"),
@@ -39,9 +63,10 @@ databricks_file_ingestion_pipeline = adf.Pipeline(
             notebook_path="/Shared/Ingenii Engineering/data_pipeline",
             type="DatabricksNotebook",
             linked_service_name=adf.LinkedServiceReferenceArgs(
-                reference_name=databricks_engineering_compute_linked_service.name,
+                reference_name=databricks_engineering_ingestion_linked_service.name,
                 type="LinkedServiceReference",
             ),
+            libraries=ingestion_libraries,
             depends_on=[],
             base_parameters={
                 "file_path": {
@@ -70,33 +95,128 @@ databricks_file_ingestion_pipeline = adf.Pipeline(
     resource_group_name=resource_groups["infra"].name,
 )
 
-databricks_file_ingestion_trigger = adf.Trigger(
-    resource_name=f"{datafactory_name}-raw-databricks-file-ingestion",
-    factory_name=datafactory.name,
-    trigger_name="Raw file created",
-    properties=adf.BlobEventsTriggerArgs(
-        type="BlobEventsTrigger",
-        scope=datalake.id,
-        events=[adf.BlobEventTypes.MICROSOFT_STORAGE_BLOB_CREATED],
-        blob_path_begins_with="/raw/blobs/",
-        ignore_empty_blobs=True,
-        pipelines=[
-            adf.TriggerPipelineReferenceArgs(
-                pipeline_reference=adf.PipelineReferenceArgs(
-                    reference_name=databricks_file_ingestion_pipeline.name,
-                    type="PipelineReference",
+ingestion_batch = datafactory_config.get("ingestion_batch", {})
+
+if ingestion_batch.get("enabled"):
+    # All files of a window at once, tested and merged once per table. The
+    # pipeline above stays available to ingest single files by hand.
+    databricks_batch_ingestion_pipeline = adf.Pipeline(
+        resource_name=f"{datafactory_name}-raw-databricks-batch-ingestion",
+        factory_name=datafactory.name,
+        pipeline_name="Trigger ingest batch notebook",
+        description="Managed by Ingenii Data Platform",
+        concurrency=1,
+        parameters={
+            "windowStart": adf.ParameterSpecificationArgs(type="String"),
+            "windowEnd": adf.ParameterSpecificationArgs(type="String"),
+        },
+        activities=[
+            adf.DatabricksNotebookActivityArgs(
+                name="Trigger ingest batch notebook",
+                notebook_path="/Shared/Ingenii Engineering/data_pipeline_batch",
+                type="DatabricksNotebook",
+                linked_service_name=adf.LinkedServiceReferenceArgs(
+                    reference_name=databricks_engineering_ingestion_linked_service.name,
+                    type="LinkedServiceReference",
                 ),
-                parameters={
-                    "fileName": "@trigger().outputs.body.fileName",
-                    "filePath": "@trigger().outputs.body.folderPath",
+                libraries=ingestion_libraries,
+                depends_on=[],
+                base_parameters={
+                    "window_start": {
+                        "value": "@pipeline().parameters.windowStart",
+                        "type": "Expression",
+                    },
+                    "window_end": {
+                        "value": "@pipeline().parameters.windowEnd",
+                        "type": "Expression",
+                    },
+                    "increment": "0",
                 },
+                policy=adf.ActivityPolicyArgs(
+                    timeout=minutes_to_string(ingestion_batch.get("timeout", 120)),
+                    retry=ingestion_policy.get("retry", 0),
+                    retry_interval_in_seconds=ingestion_policy.get("retry_interval", 30),
+                    secure_output=False,
+                    secure_input=False,
+                ),
+                user_properties=[],
             )
         ],
+        policy=adf.PipelinePolicyArgs(),
         annotations=["Created by Ingenii"],
-    ),
-    opts=ResourceOptions(ignore_changes=["properties.annotations"]),
-    resource_group_name=resource_groups["infra"].name,
-)
+        opts=ResourceOptions(ignore_changes=["annotations"]),
+        resource_group_name=resource_groups["infra"].name,
+    )
+
+    # Without a start time, the windows start from the next window boundary
+    # after the trigger is first deployed, rather than catching up on windows
+    # in the past. Later deployments keep the deployed start time.
+    window_minutes = ingestion_batch.get("window_minutes", 15)
+    batch_start_time = ingestion_batch.get("start_time")
+    if not batch_start_time:
+        now = datetime.now(timezone.utc)
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        minutes_today = (now - midnight) // timedelta(minutes=1)
+        batch_start_time = (
+            midnight + timedelta(minutes=minutes_today - minutes_today % window_minutes + window_minutes)
+        ).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    databricks_batch_ingestion_trigger = adf.Trigger(
+        resource_name=f"{datafactory_name}-raw-databricks-batch-ingestion",
+        factory_name=datafactory.name,
+        trigger_name="Raw files window",
+        properties=adf.TumblingWindowTriggerArgs(
+            type="TumblingWindowTrigger",
+            frequency=adf.TumblingWindowFrequency.MINUTE,
+            interval=window_minutes,
+            start_time=batch_start_time,
+            delay=minutes_to_string(ingestion_batch.get("delay_minutes", 5)),
+            max_concurrency=1,
+            pipeline=adf.TriggerPipelineReferenceArgs(
+                pipeline_reference=adf.PipelineReferenceArgs(
+                    reference_name=databricks_batch_ingestion_pipeline.name,
+                    type="PipelineReference",
+                ),
+                parameters={
+                    "windowStart": "@trigger().outputs.windowStartTime",
+                    "windowEnd": "@trigger().outputs.windowEndTime",
+                },
+            ),
+            annotations=["Created by Ingenii"],
+        ),
+        opts=ResourceOptions(ignore_changes=["properties.annotations", "properties.startTime"]),
+        resource_group_name=resource_groups["infra"].name,
+    )
+    ingestion_trigger = databricks_batch_ingestion_trigger
+else:
+    databricks_file_ingestion_trigger = adf.Trigger(
+        resource_name=f"{datafactory_name}-raw-databricks-file-ingestion",
+        factory_name=datafactory.name,
+        trigger_name="Raw file created",
+        properties=adf.BlobEventsTriggerArgs(
+            type="BlobEventsTrigger",
+            scope=datalake.id,
+            events=[adf.BlobEventTypes.MICROSOFT_STORAGE_BLOB_CREATED],
+            blob_path_begins_with="/raw/blobs/",
+            ignore_empty_blobs=True,
+            pipelines=[
+                adf.TriggerPipelineReferenceArgs(
+                    pipeline_reference=adf.PipelineReferenceArgs(
+                        reference_name=databricks_file_ingestion_pipeline.name,
+                        type="PipelineReference",
+                    ),
+                    parameters={
+                        "fileName": "@trigger().outputs.body.fileName",
+                        "filePath": "@trigger().outputs.body.folderPath",
+                    },
+                )
+            ],
+            annotations=["Created by Ingenii"],
+        ),
+        opts=ResourceOptions(ignore_changes=["properties.annotations"]),
+        resource_group_name=resource_groups["infra"].name,
+    )
+    ingestion_trigger = databricks_file_ingestion_trigger
 
 # ----------------------------------------------------------------------------------------------------------------------
 # DATA FACTORY -> WORKSPACE SYNCING
@@ -320,4 +440,7 @@ databricks_sync_workspaces_trigger = adf.Trigger(
     ),
     opts=ResourceOptions(ignore_changes=["properties.annotations"]),
     resource_group_name=resource_groups["infra"].name,
-)
\ No newline at end of file
+)
+
+# Triggers are created stopped, the deployment starts these
+outputs["triggers"] = [ingestion_trigger.name, databricks_sync_workspaces_trigger.name]
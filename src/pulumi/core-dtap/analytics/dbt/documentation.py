@@ -55,7 +55,11 @@ if docs_enabled:
         opts=ResourceOptions(ignore_changes=["branch", "repository_url"]),
     )
     if platform_config.resource_protection:
-        lock_resource(site_resource_name, static_site.id)
+        lock_resource(
+            site_resource_name,
+            static_site.id,
+            parents=[resource_groups["infra"]],
+        )
 
     outputs["name"] = static_site.name
     outputs["url"] = static_site.default_hostname
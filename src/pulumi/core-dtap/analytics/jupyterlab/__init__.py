@@ -1,4 +0,0 @@
-from platform_shared import jupyterlab_config
-
-if jupyterlab_config["enabled"]:
-    from . import deployment
@@ -34,7 +34,11 @@ storage_account = storage.StorageAccount(
     ),
 )
 if platform_config.resource_protection:
-    lock_resource(storage_account.name, storage_account.id)
+    lock_resource(
+        storage_account.name,
+        storage_account.id,
+        parents=[resource_groups["infra"]],
+    )
 
 outputs["storage"] = {
     "id": storage_account.id,
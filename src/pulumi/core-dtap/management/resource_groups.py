@@ -2,7 +2,10 @@ from os import getenv
 
 from project_config import platform_config, platform_outputs
 from ingenii_azure_data_platform.management import ResourceGroup
-from ingenii_azure_data_platform.iam import GroupRoleAssignment
+from ingenii_azure_data_platform.iam import (
+    GroupRoleAssignment,
+    role_assignment_planner,
+)
 
 from .user_groups import user_groups
 
@@ -33,10 +36,11 @@ for ref_key, config in resource_groups_config.items():
         user_group_ref_key = assignment.get("user_group_ref_key")
 
         if user_group_ref_key is not None:
-            GroupRoleAssignment(
+            role_assignment_planner.request(
+                GroupRoleAssignment,
+                resource_groups[ref_key],
                 principal_id=user_groups[user_group_ref_key]["object_id"],
                 principal_name=user_group_ref_key,
                 role_name=assignment["role_definition_name"],
-                scope=resource_groups[ref_key].id,
                 scope_description=f"resource-group-{ref_key}",
             )
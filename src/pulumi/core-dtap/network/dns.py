@@ -19,7 +19,11 @@ storage_blob_private_dns_zone = net.PrivateZone(
     tags=platform_config.tags,
 )
 if platform_config.resource_protection:
-    lock_resource("privatelink-blob-core-windows-net", storage_blob_private_dns_zone.id)
+    lock_resource(
+        "privatelink-blob-core-windows-net",
+        storage_blob_private_dns_zone.id,
+        parents=[resource_groups["infra"]],
+    )
 
 storage_blob_private_dns_zone_link = net.VirtualNetworkLink(
     resource_name="privatelink-blob-core-windows-net",
@@ -35,7 +39,9 @@ storage_blob_private_dns_zone_link = net.VirtualNetworkLink(
 )
 if platform_config.resource_protection:
     lock_resource(
-        "privatelink-blob-core-windows-net-link", storage_blob_private_dns_zone_link.id
+        "privatelink-blob-core-windows-net-link",
+        storage_blob_private_dns_zone_link.id,
+        parents=[storage_blob_private_dns_zone, resource_groups["infra"]],
     )
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -49,7 +55,11 @@ storage_dfs_private_dns_zone = net.PrivateZone(
     tags=platform_config.tags,
 )
 if platform_config.resource_protection:
-    lock_resource("privatelink-dfs-core-windows-net", storage_dfs_private_dns_zone.id)
+    lock_resource(
+        "privatelink-dfs-core-windows-net",
+        storage_dfs_private_dns_zone.id,
+        parents=[resource_groups["infra"]],
+    )
 
 storage_dfs_private_dns_zone_link = net.VirtualNetworkLink(
     resource_name="privatelink-dfs-core-windows-net",
@@ -66,7 +76,9 @@ storage_dfs_private_dns_zone_link = net.VirtualNetworkLink(
 
 if platform_config.resource_protection:
     lock_resource(
-        "privatelink-dfs-core-windows-net-link", storage_dfs_private_dns_zone_link.id
+        "privatelink-dfs-core-windows-net-link",
+        storage_dfs_private_dns_zone_link.id,
+        parents=[storage_dfs_private_dns_zone, resource_groups["infra"]],
     )
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -80,7 +92,11 @@ key_vault_private_dns_zone = net.PrivateZone(
     tags=platform_config.tags,
 )
 if platform_config.resource_protection:
-    lock_resource("privatelink-vaultcore-azure-net", key_vault_private_dns_zone.id)
+    lock_resource(
+        "privatelink-vaultcore-azure-net",
+        key_vault_private_dns_zone.id,
+        parents=[resource_groups["infra"]],
+    )
 
 key_vault_private_dns_zone_link = net.VirtualNetworkLink(
     resource_name="privatelink-vaultcore-azure-net",
@@ -97,7 +113,9 @@ key_vault_private_dns_zone_link = net.VirtualNetworkLink(
 
 if platform_config.resource_protection:
     lock_resource(
-        "privatelink-vaultcore-azure-net-link", key_vault_private_dns_zone_link.id
+        "privatelink-vaultcore-azure-net-link",
+        key_vault_private_dns_zone_link.id,
+        parents=[key_vault_private_dns_zone, resource_groups["infra"]],
     )
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -117,7 +135,11 @@ if container_registry_private_endpoint_configs:
         tags=platform_config.tags,
     )
     if platform_config.resource_protection:
-        lock_resource("privatelink-azurecr-io", container_registry_dns_zone.id)
+        lock_resource(
+            "privatelink-azurecr-io",
+            container_registry_dns_zone.id,
+            parents=[resource_groups["infra"]],
+        )
 
     container_registry_dns_zone_link = net.VirtualNetworkLink(
         resource_name="privatelink-azurecr-io",
@@ -132,7 +154,11 @@ if container_registry_private_endpoint_configs:
         ),
     )
     if platform_config.resource_protection:
-        lock_resource("privatelink-azurecr-io-link", container_registry_dns_zone_link.id)
+        lock_resource(
+            "privatelink-azurecr-io-link",
+            container_registry_dns_zone_link.id,
+            parents=[container_registry_dns_zone, resource_groups["infra"]],
+        )
 else:
     container_registry_dns_zone = None
     container_registry_dns_zone_link = None
@@ -31,7 +31,11 @@ databricks_engineering = azure_native.network.NetworkSecurityGroup(
     opts=pulumi.ResourceOptions(ignore_changes=["security_rules", "tags"]),
 )
 if platform_config.resource_protection:
-    lock_resource(databricks_engineering_resource_name, databricks_engineering.id)
+    lock_resource(
+        databricks_engineering_resource_name,
+        databricks_engineering.id,
+        parents=[resource_groups["infra"]],
+    )
 
 # Export NSG metadata
 outputs["databricks_engineering"] = {
@@ -57,7 +61,11 @@ databricks_analytics = azure_native.network.NetworkSecurityGroup(
     opts=pulumi.ResourceOptions(ignore_changes=["security_rules", "tags"]),
 )
 if platform_config.resource_protection:
-    lock_resource(databricks_analytics_resource_name, databricks_analytics.id)
+    lock_resource(
+        databricks_analytics_resource_name,
+        databricks_analytics.id,
+        parents=[resource_groups["infra"]],
+    )
 
 # Export NSG metadata
 outputs["databricks_analytics"] = {
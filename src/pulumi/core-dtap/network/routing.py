@@ -18,7 +18,11 @@ main_route_table = azure_native.network.RouteTable(
     tags=platform_config.tags,
 )
 if platform_config.resource_protection:
-    lock_resource(main_route_table_resource_name, main_route_table.id)
+    lock_resource(
+        main_route_table_resource_name,
+        main_route_table.id,
+        parents=[resource_groups["infra"]],
+    )
 
 # Export route table metadata
 outputs["main"] = {
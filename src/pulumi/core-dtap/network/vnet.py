@@ -1,11 +1,12 @@
 import pulumi_azure_native.network as net
 from pulumi import ResourceOptions
 
-from ingenii_azure_data_platform.utils import (
-    generate_cidr,
-    generate_resource_name,
-    lock_resource,
+from ingenii_azure_data_platform.network import (
+    SubnetPlanningException,
+    plan_subnets,
+    subnet_resource_options,
 )
+from ingenii_azure_data_platform.utils import generate_resource_name, lock_resource
 
 from management import resource_groups
 from project_config import platform_config, platform_outputs
@@ -17,8 +18,8 @@ outputs = platform_outputs["network"]
 # ----------------------------------------------------------------------------------------------------------------------
 # VNET
 # ----------------------------------------------------------------------------------------------------------------------
-vnet_config = platform_config.from_yml["network"]["virtual_network"]
-vnet_address_space = vnet_config["address_space"]
+vnet_config = platform_config.model.network.virtual_network
+vnet_address_space = vnet_config.address_space
 vnet_name = generate_resource_name(
     resource_type="virtual_network",
     resource_name="main",
@@ -41,7 +42,7 @@ vnet = net.VirtualNetwork(
 )
 
 if platform_config.resource_protection:
-    lock_resource(vnet_name, vnet.id)
+    lock_resource(vnet_name, vnet.id, parents=[resource_groups["infra"]])
 
 # Export VNET metadata
 outputs["virtual_network"] = {
@@ -56,7 +57,53 @@ outputs["virtual_network"] = {
 
 # TODO: Remove duplication. Keep it DRY.
 
+# The default position of every subnet, as (prefix, subnet number)
+SUBNET_LAYOUT = {
+    "gateway": (24, 0),
+    "privatelink": (24, 1),
+    "hosted_services": (24, 2),
+    "databricks_engineering_hosts": (22, 1),
+    "databricks_engineering_containers": (22, 2),
+    "databricks_analytics_hosts": (22, 3),
+    "databricks_analytics_containers": (22, 4),
+}
+
+subnet_capacity = {
+    name: {"address_prefix": subnet.address_prefix, "hosts": subnet.hosts}
+    for name, subnet in (vnet_config.subnets or {}).items()
+}
+
+# Every Databricks node takes one address in the hosts and one in the
+# containers subnet of its workspace.
+databricks_workspaces = platform_config.model.analytics_services.databricks.workspaces
+for workspace_name, workspace in databricks_workspaces.items():
+    if workspace.network is None or workspace.network.max_nodes is None:
+        continue
+    for subnet_name in (
+        f"databricks_{workspace_name}_hosts",
+        f"databricks_{workspace_name}_containers",
+    ):
+        if subnet_name in SUBNET_LAYOUT:
+            subnet_capacity.setdefault(
+                subnet_name, {"hosts": workspace.network.max_nodes}
+            )
+
+# The NAT gateway can not be attached to the gateway or private link subnets
+invalid_nat_subnets = [
+    name
+    for name in nat.nat_subnets
+    if name not in SUBNET_LAYOUT or name in ("gateway", "privatelink")
+]
+if invalid_nat_subnets:
+    raise SubnetPlanningException(
+        f"The NAT gateway can not be attached to subnets {invalid_nat_subnets}."
+    )
+
+subnet_plan = plan_subnets(vnet_address_space, SUBNET_LAYOUT, subnet_capacity)
+sequential_subnets = vnet_config.subnet_provisioning != "parallel"
+
 subnet_outputs = outputs["virtual_network"]["subnets"] = {}
+outputs["virtual_network"]["headroom"] = subnet_plan.headroom()
 
 # GATEWAY SUBNET
 gateway_subnet = net.Subnet(
@@ -66,7 +113,7 @@ gateway_subnet = net.Subnet(
     subnet_name="Gateway",  # Microsoft requires the Gateway subnet to be called "Gateway"
     resource_group_name=resource_groups["infra"].name,
     virtual_network_name=vnet.name,
-    address_prefix=generate_cidr(vnet_address_space, 24, 0),
+    address_prefix=subnet_plan.cidr("gateway"),
     route_table=net.RouteTableArgs(id=routing.main_route_table.id),
 )
 
@@ -86,10 +133,10 @@ privatelink_subnet = net.Subnet(
     subnet_name=privatelink_subnet_name,
     resource_group_name=resource_groups["infra"].name,
     virtual_network_name=vnet.name,
-    address_prefix=generate_cidr(vnet_address_space, 24, 1),
+    address_prefix=subnet_plan.cidr("privatelink"),
     private_endpoint_network_policies=net.VirtualNetworkPrivateEndpointNetworkPolicies.DISABLED,
     route_table=net.RouteTableArgs(id=routing.main_route_table.id),
-    opts=ResourceOptions(depends_on=[gateway_subnet]),
+    opts=subnet_resource_options(gateway_subnet, sequential_subnets),
 )
 
 # Export subnet metadata
@@ -110,9 +157,9 @@ hosted_services_subnet = net.Subnet(
     subnet_name=hosted_services_subnet_name,
     resource_group_name=resource_groups["infra"].name,
     virtual_network_name=vnet.name,
-    address_prefix=generate_cidr(vnet_address_space, 24, 2),
+    address_prefix=subnet_plan.cidr("hosted_services"),
     route_table=net.RouteTableArgs(id=routing.main_route_table.id),
-    nat_gateway=net.SubResourceArgs(id=nat.gateway.id),
+    nat_gateway=nat.subnet_nat_gateway("hosted_services"),
     service_endpoints=[
         net.ServiceEndpointPropertiesFormatArgs(service=service)
         for service in [
@@ -122,7 +169,7 @@ hosted_services_subnet = net.Subnet(
             "Microsoft.SQL",
         ]
     ],
-    opts=ResourceOptions(depends_on=[privatelink_subnet]),
+    opts=subnet_resource_options(privatelink_subnet, sequential_subnets),
 )
 
 # Export subnet metadata
@@ -143,12 +190,12 @@ dbw_engineering_hosts_subnet = net.Subnet(
     subnet_name=dbw_engineering_hosts_subnet_name,
     resource_group_name=resource_groups["infra"].name,
     virtual_network_name=vnet.name,
-    address_prefix=generate_cidr(vnet_address_space, 22, 1),
+    address_prefix=subnet_plan.cidr("databricks_engineering_hosts"),
     route_table=net.RouteTableArgs(id=routing.main_route_table.id),
     network_security_group=net.NetworkSecurityGroupArgs(
         id=nsg.databricks_engineering.id
     ),
-    nat_gateway=net.SubResourceArgs(id=nat.gateway.id),
+    nat_gateway=nat.subnet_nat_gateway("databricks_engineering_hosts"),
     service_endpoints=[
         net.ServiceEndpointPropertiesFormatArgs(service=service)
         for service in [
@@ -163,7 +210,7 @@ dbw_engineering_hosts_subnet = net.Subnet(
             name="databricks", service_name="Microsoft.Databricks/workspaces"
         )
     ],
-    opts=ResourceOptions(depends_on=[hosted_services_subnet]),
+    opts=subnet_resource_options(hosted_services_subnet, sequential_subnets),
 )
 
 # Export subnet metadata
@@ -184,12 +231,12 @@ dbw_engineering_containers_subnet = net.Subnet(
     subnet_name=dbw_engineering_containers_subnet_name,
     resource_group_name=resource_groups["infra"].name,
     virtual_network_name=vnet.name,
-    address_prefix=generate_cidr(vnet_address_space, 22, 2),
+    address_prefix=subnet_plan.cidr("databricks_engineering_containers"),
     route_table=net.RouteTableArgs(id=routing.main_route_table.id),
     network_security_group=net.NetworkSecurityGroupArgs(
         id=nsg.databricks_engineering.id
     ),
-    nat_gateway=net.SubResourceArgs(id=nat.gateway.id),
+    nat_gateway=nat.subnet_nat_gateway("databricks_engineering_containers"),
     service_endpoints=[
         net.ServiceEndpointPropertiesFormatArgs(service=service)
         for service in [
@@ -204,7 +251,7 @@ dbw_engineering_containers_subnet = net.Subnet(
             name="databricks", service_name="Microsoft.Databricks/workspaces"
         )
     ],
-    opts=ResourceOptions(depends_on=[dbw_engineering_hosts_subnet]),
+    opts=subnet_resource_options(dbw_engineering_hosts_subnet, sequential_subnets),
 )
 
 # Export subnet metadata
@@ -225,10 +272,10 @@ dbw_analytics_hosts_subnet = net.Subnet(
     subnet_name=dbw_analytics_hosts_subnet_name,
     resource_group_name=resource_groups["infra"].name,
     virtual_network_name=vnet.name,
-    address_prefix=generate_cidr(vnet_address_space, 22, 3),
+    address_prefix=subnet_plan.cidr("databricks_analytics_hosts"),
     route_table=net.RouteTableArgs(id=routing.main_route_table.id),
     network_security_group=net.NetworkSecurityGroupArgs(id=nsg.databricks_analytics.id),
-    nat_gateway=net.SubResourceArgs(id=nat.gateway.id),
+    nat_gateway=nat.subnet_nat_gateway("databricks_analytics_hosts"),
     service_endpoints=[
         net.ServiceEndpointPropertiesFormatArgs(service=service)
         for service in [
@@ -243,7 +290,7 @@ dbw_analytics_hosts_subnet = net.Subnet(
             name="databricks", service_name="Microsoft.Databricks/workspaces"
         )
     ],
-    opts=ResourceOptions(depends_on=[dbw_engineering_containers_subnet]),
+    opts=subnet_resource_options(dbw_engineering_containers_subnet, sequential_subnets),
 )
 
 # Export subnet metadata
@@ -264,10 +311,10 @@ dbw_analytics_containers_subnet = net.Subnet(
     subnet_name=dbw_analytics_containers_subnet_name,
     resource_group_name=resource_groups["infra"].name,
     virtual_network_name=vnet.name,
-    address_prefix=generate_cidr(vnet_address_space, 22, 4),
+    address_prefix=subnet_plan.cidr("databricks_analytics_containers"),
     route_table=net.RouteTableArgs(id=routing.main_route_table.id),
     network_security_group=net.NetworkSecurityGroupArgs(id=nsg.databricks_analytics.id),
-    nat_gateway=net.SubResourceArgs(id=nat.gateway.id),
+    nat_gateway=nat.subnet_nat_gateway("databricks_analytics_containers"),
     service_endpoints=[
         net.ServiceEndpointPropertiesFormatArgs(service=service)
         for service in [
@@ -282,7 +329,7 @@ dbw_analytics_containers_subnet = net.Subnet(
             name="databricks", service_name="Microsoft.Databricks/workspaces"
         )
     ],
-    opts=ResourceOptions(depends_on=[dbw_analytics_hosts_subnet]),
+    opts=subnet_resource_options(dbw_analytics_hosts_subnet, sequential_subnets),
 )
 
 subnet_outputs["databricks_analytics_containers"] = {
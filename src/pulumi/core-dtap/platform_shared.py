@@ -4,7 +4,6 @@ from os import getenv
 from pulumi import InvokeOptions, ResourceOptions
 from pulumi_azure_native import containerservice, Provider, keyvault
 from pulumi_azure_native.authorization import get_client_config
-from pulumi_kubernetes import Provider as KubernetesProvider
 
 from ingenii_azure_data_platform.config import PlatformConfiguration
 from ingenii_azure_data_platform.kubernetes import get_cluster_config
@@ -112,6 +111,9 @@ jupyterlab_config = cluster_config["configs"]["jupyterlab"]
 
 # Only create if required
 if cluster_created:
+    # Only load the Kubernetes SDK when the cluster is needed
+    from pulumi_kubernetes import Provider as KubernetesProvider
+
     # Use the admin credential as it's static
     # TODO: Don't do this - add Pulumi service principal as Azure Kubernetes Service RBAC Cluster Admin
 
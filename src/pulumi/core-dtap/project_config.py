@@ -3,6 +3,8 @@ import pulumi
 from pulumi_azure_native import authorization, Provider
 
 from ingenii_azure_data_platform.config import PlatformConfiguration, SharedOutput
+from ingenii_azure_data_platform.naming import configured_resource_names, naming_engine
+from ingenii_azure_data_platform.utils import lock_registry
 
 CURRENT_STACK_NAME = pulumi.get_stack()
 ENV = CURRENT_STACK_NAME.split(".")[-1]
@@ -19,6 +21,10 @@ platform_config = PlatformConfiguration(
     metadata_file_path=getenv("ADP_METADATA_FILE_PATH"),
     custom_config_file_path=getenv("ADP_CUSTOM_CONFIGS_FILE_PATH"),
 )
+lock_registry.strategy = platform_config.lock_strategy
+
+# Fail on names that break Azure's rules before any resource is declared
+naming_engine(platform_config).resolve(configured_resource_names(platform_config))
 
 # Load the current Azure auth session metadata
 azure_client = authorization.get_client_config()
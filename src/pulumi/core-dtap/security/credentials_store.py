@@ -78,7 +78,7 @@ key_vault = keyvault.Vault(
 )
 
 if platform_config.resource_protection:
-    lock_resource(key_vault_name, key_vault.id)
+    lock_resource(key_vault_name, key_vault.id, parents=[resource_groups["security"]])
 
 outputs["key_vault_id"] = key_vault.id
 outputs["key_vault_name"] = key_vault.name
@@ -6,9 +6,11 @@ from ingenii_azure_data_platform.defaults import STORAGE_ACCOUNT_DEFAULT_FIREWAL
 from ingenii_azure_data_platform.iam import (
     GroupRoleAssignment,
     ServicePrincipalRoleAssignment,
+    role_assignment_planner,
 )
 from ingenii_azure_data_platform.logs import log_diagnostic_settings
 from ingenii_azure_data_platform.network import PlatformFirewall
+from ingenii_azure_data_platform.storage import TableEntitySet, lifecycle_rules
 from ingenii_azure_data_platform.utils import generate_resource_name, lock_resource
 
 from logs import log_analytics_workspace
@@ -28,6 +30,56 @@ firewall_ip_access_list = [
         "ip_access_list", [])
 ]
 
+# ----------------------------------------------------------------------------------------------------------------------
+# LIFECYCLE MANAGEMENT
+# ----------------------------------------------------------------------------------------------------------------------
+
+def lifecycle_rule(name, details, prefixes=None, after_last_access=False):
+    """
+    A lifecycle rule tiering and deleting the block blobs under 'prefixes',
+    all of them when empty, 'details' days after their last modification or,
+    with 'after_last_access', their last access. Blobs tiered to cool on
+    access time go back to hot when read. See lifecycle_rules() for the rules
+    of a storage account.
+    """
+    if after_last_access:
+        base_blob = storage.ManagementPolicyBaseBlobArgs(
+            enable_auto_tier_to_hot_from_cool=True if "tier_to_cool" in details else None,
+            **{
+                k: storage.DateAfterModificationArgs(days_after_last_access_time_greater_than=v)
+                for k, v in details.items()
+            },
+        )
+    else:
+        base_blob = storage.ManagementPolicyBaseBlobArgs(**{
+            k: storage.DateAfterModificationArgs(days_after_modification_greater_than=v)
+            for k, v in details.items()
+        })
+
+    return storage.ManagementPolicyRuleArgs(
+        definition=storage.ManagementPolicyDefinitionArgs(
+            actions=storage.ManagementPolicyActionArgs(
+                base_blob=base_blob,
+                snapshot=storage.ManagementPolicySnapShotArgs(**{
+                    k: storage.DateAfterCreationArgs(days_after_creation_greater_than=v)
+                    for k, v in details.items()
+                }),
+                version=storage.ManagementPolicyVersionArgs(**{
+                    k: storage.DateAfterCreationArgs(days_after_creation_greater_than=v)
+                    for k, v in details.items()
+                }),
+            ),
+            filters=storage.ManagementPolicyFilterArgs(
+                blob_types=["blockBlob"],
+                prefix_match=prefixes or None,
+            ),
+        ),
+        enabled=True,
+        name=name,
+        type="Lifecycle",
+    )
+
+
 # ----------------------------------------------------------------------------------------------------------------------
 # DATA LAKE
 # ----------------------------------------------------------------------------------------------------------------------
@@ -99,7 +151,7 @@ def create_storage_account(storage_ref_key, datalake_resource_group):
         ),
     )
     if platform_config.resource_protection:
-        lock_resource(datalake_name, datalake.id)
+        lock_resource(datalake_name, datalake.id, parents=[datalake_resource_group])
 
     outputs["id"] = datalake.id
     outputs["name"] = datalake.name
@@ -178,11 +230,13 @@ def create_storage_account(storage_ref_key, datalake_resource_group):
         # User Group Assignment
         user_group_ref_key = assignment.get("user_group_ref_key")
         if user_group_ref_key is not None:
-            GroupRoleAssignment(
+            role_assignment_planner.request(
+                GroupRoleAssignment,
+                datalake,
+                parents=[datalake_resource_group],
                 principal_id=user_groups[user_group_ref_key]["object_id"],
                 principal_name=user_group_ref_key,
                 role_name=assignment["role_definition_name"],
-                scope=datalake.id,
                 scope_description=storage_ref_key,
             )
 
@@ -199,19 +253,28 @@ def create_storage_account(storage_ref_key, datalake_resource_group):
     # DATA LAKE -> LIFECYCLE MANAGEMENT
     # ----------------------------------------------------------------------------------------------------------------------
 
-    if datalake_config.get("lifecycle_management") and any(
-        val is not None for val in datalake_config["lifecycle_management"].values()
-    ):
+    lm_config = datalake_config.get("lifecycle_management", {})
+    lm_rules = [lifecycle_rule(**rule) for rule in lifecycle_rules(datalake_config)]
 
-        lm_config = datalake_config["lifecycle_management"]
-        details = {}
-        if lm_config.get("archive_after") is not None:
-            details["tier_to_archive"] = lm_config["archive_after"]
-        if lm_config.get("cool_after") is not None:
-            details["tier_to_cool"] = lm_config["cool_after"]
-        if lm_config.get("delete_after") is not None:
-            details["delete"] = lm_config["delete_after"]
+    if lm_config.get("track_last_access"):
+        storage.BlobServiceProperties(
+            generate_resource_name(
+                resource_type="storage_blob",
+                resource_name=f"{storage_ref_key}-service-properties",
+                platform_config=platform_config,
+            ),
+            account_name=datalake.name,
+            blob_services_name="default",
+            last_access_time_tracking_policy=storage.LastAccessTimeTrackingPolicyArgs(
+                blob_type=["blockBlob"],
+                enable=True,
+                name="AccessTimeTracking",
+                tracking_granularity_in_days=1,
+            ),
+            resource_group_name=datalake_resource_group.name,
+        )
 
+    if lm_rules:
         storage.ManagementPolicy(
         generate_resource_name(
             resource_type="storage_management_policy",
@@ -220,40 +283,7 @@ def create_storage_account(storage_ref_key, datalake_resource_group):
         ),
         account_name=datalake.name,
         management_policy_name="default",
-        policy=storage.ManagementPolicySchemaArgs(
-            rules=[
-                storage.ManagementPolicyRuleArgs(
-                    definition=storage.ManagementPolicyDefinitionArgs(
-                        actions=storage.ManagementPolicyActionArgs(
-                            base_blob=storage.ManagementPolicyBaseBlobArgs(**{
-                                k: storage.DateAfterModificationArgs(
-                                    days_after_modification_greater_than=v
-                                )
-                                for k, v in details.items()
-                            }),
-                            snapshot=storage.ManagementPolicySnapShotArgs(**{
-                                k: storage.DateAfterCreationArgs(
-                                    days_after_creation_greater_than=v
-                                )
-                                for k, v in details.items()
-                            }),
-                            version=storage.ManagementPolicyVersionArgs(**{
-                                k: storage.DateAfterCreationArgs(
-                                    days_after_creation_greater_than=v
-                                )
-                                for k, v in details.items()
-                            }),
-                        ),
-                        filters=storage.ManagementPolicyFilterArgs(
-                            blob_types=["blockBlob"],
-                        ),
-                    ),
-                    enabled=True,
-                    name="All Blob Management",
-                    type="Lifecycle",
-                ),
-            ],
-        ),
+        policy=storage.ManagementPolicySchemaArgs(rules=lm_rules),
         resource_group_name=datalake_resource_group.name)
 
 
@@ -286,7 +316,11 @@ def create_storage_account(storage_ref_key, datalake_resource_group):
             ),
         )
         if platform_config.resource_protection:
-            lock_resource(datalake_container_name, datalake_containers[ref_key].id)
+            lock_resource(
+                datalake_container_name,
+                datalake_containers[ref_key].id,
+                parents=[datalake, datalake_resource_group],
+            )
 
         # Container Role Assignments
         role_assignments = container_config.get("iam", {}).get("role_assignments", [])
@@ -294,11 +328,13 @@ def create_storage_account(storage_ref_key, datalake_resource_group):
             # User Group Role Assignment
             if assignment.get("user_group_ref_key") is not None:
                 user_group_ref_key = assignment.get("user_group_ref_key")
-                GroupRoleAssignment(
+                role_assignment_planner.request(
+                    GroupRoleAssignment,
+                    datalake_containers[ref_key],
+                    parents=[datalake, datalake_resource_group],
                     principal_id=user_groups[user_group_ref_key]["object_id"],
                     principal_name=user_group_ref_key,
                     role_name=assignment["role_definition_name"],
-                    scope=datalake_containers[ref_key].id,
                     scope_description=f"{storage_ref_key}-container-{ref_key}",
                 )
 
@@ -324,10 +360,36 @@ def create_storage_account(storage_ref_key, datalake_resource_group):
             table_name=table_name,
         )
         if platform_config.resource_protection:
-            lock_resource(datalake_table_resource_name, datalake_tables[ref_key].id)
+            lock_resource(
+                datalake_table_resource_name,
+                datalake_tables[ref_key].id,
+                parents=[datalake, datalake_resource_group],
+            )
 
         entities = table_config.get("entities", {})
 
+        # All entities of the table as one resource, synced in transactions
+        if entities and table_config.get("entity_sync") == "batch":
+            TableEntitySet(
+                resource_name=f"{datalake_name}-{table_name}-entities".lower(),
+                account_name=datalake.name,
+                account_key=storage.list_storage_account_keys_output(
+                    account_name=datalake.name,
+                    resource_group_name=datalake_resource_group.name,
+                ).keys[0].value,
+                table_name=datalake_tables[ref_key].name,
+                entities=[
+                    dict(
+                        entity_config.get("entity", {}),
+                        PartitionKey=entity_config["partition_key"],
+                        RowKey=entity_config["row_key"],
+                    )
+                    for entity_config in entities.values()
+                ],
+                opts=ResourceOptions(retain_on_delete=table_config.get("retain_entities", False)),
+            )
+            continue
+
         for entity_ref_key, entity_config in entities.items():
             azure_classic.storage.TableEntity(
                 resource_name=f"{datalake_name}-{table_name}-{entity_ref_key}".lower(),
@@ -336,6 +398,7 @@ def create_storage_account(storage_ref_key, datalake_resource_group):
                 partition_key=entity_config.get("partition_key"),
                 row_key=entity_config.get("row_key"),
                 entity=entity_config.get("entity", {}),
+                opts=ResourceOptions(retain_on_delete=table_config.get("retain_entities", False)),
             )
 
     return {
@@ -1,7 +1,10 @@
 from pulumi import Output
 from pulumi_azure_native import keyvault, storage
 
-from ingenii_azure_data_platform.iam import UserAssignedIdentityRoleAssignment
+from ingenii_azure_data_platform.iam import (
+    UserAssignedIdentityRoleAssignment,
+    role_assignment_planner,
+)
 
 from management import resource_groups
 from platform_shared import (
@@ -62,11 +65,13 @@ keyvault.Secret(
 devops_principal_id = get_devops_principal_id()
 devops_principal_name = "deployment-user-identity"
 for container in ["dbt", "preprocess"]:
-    UserAssignedIdentityRoleAssignment(
+    role_assignment_planner.request(
+        UserAssignedIdentityRoleAssignment,
+        datalake_details["containers"][container],
+        parents=[datalake, resource_groups["data"]],
         principal_id=devops_principal_id,
         principal_name=devops_principal_name,
         role_name="Storage Blob Data Contributor",
-        scope=datalake_details["containers"][container].id,
         scope_description=f"datalake-container-{container}",
     )
 
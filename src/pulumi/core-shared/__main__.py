@@ -1,10 +1,29 @@
 # All sub-components to load. Please note, this is not an execution order.
 # Pulumi will load all files first and then will build the dependency graph.
-import iam
-import analytics
-import automation
-import kubernetes
-import management
-import network
-import storage
-import security
+# Services that are disabled in the platform config are never imported, along
+# with the provider SDKs only they use.
+from ingenii_azure_data_platform.kubernetes import get_cluster_config
+from ingenii_azure_data_platform.iam import role_assignment_planner
+from ingenii_azure_data_platform.services import ServiceRegistry
+
+from project_config import platform_config
+
+services = ServiceRegistry()
+
+services.register("iam")
+services.register("analytics")
+services.register("automation")
+services.register("kubernetes", enabled=get_cluster_config(platform_config)["enabled"])
+services.register("management")
+services.register("network")
+services.register("storage")
+services.register("security")
+services.register(
+    "logs.diagnostic_policies",
+    enabled=platform_config["logs"].get("mode", "resource") == "policy",
+)
+
+services.load()
+
+# Role assignments requested by the services, deduplicated
+role_assignment_planner.emit()
@@ -131,7 +131,11 @@ if cluster_config["enabled"]:
         ),
     )
     if platform_config.resource_protection:
-        lock_resource("shared_kubernetes_cluster", kubernetes_cluster.id)
+        lock_resource(
+            "shared_kubernetes_cluster",
+            kubernetes_cluster.id,
+            parents=[resource_groups["infra"]],
+        )
 
     # TODO: Potentially implement
     #    identity_profile: Optional[Mapping[str, ManagedClusterPropertiesIdentityProfileArgs]] = None,
@@ -0,0 +1,12 @@
+from ingenii_azure_data_platform.logs import diagnostic_settings_policy
+
+from management import resource_groups
+from project_config import platform_config
+
+from .log_analytics_workspace import log_analytics_workspace
+
+# Loaded after all other services, so that the resources with their own
+# diagnostic settings are excluded from the assignments.
+diagnostic_settings_policy.assign(
+    platform_config, log_analytics_workspace.id, resource_groups
+)
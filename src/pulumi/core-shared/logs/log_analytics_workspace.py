@@ -17,14 +17,18 @@ log_analytics_workspace = operationalinsights.Workspace(
     resource_name=workspace_name,
     location=platform_config.region.long_name,
     resource_group_name=resource_groups["security"].name,
-    retention_in_days=platform_config["logs"]["retention"],
+    retention_in_days=platform_config.model.logs.retention,
     sku=operationalinsights.WorkspaceSkuArgs(name="PerGB2018"),
     workspace_name=workspace_name,
     tags=platform_config.tags,
     opts=ResourceOptions(protect=platform_config.resource_protection),
 )
 if platform_config.resource_protection:
-    lock_resource(workspace_name, log_analytics_workspace.id)
+    lock_resource(
+        workspace_name,
+        log_analytics_workspace.id,
+        parents=[resource_groups["security"]],
+    )
 
 outputs["name"] = log_analytics_workspace.name
 outputs["id"] = log_analytics_workspace.id
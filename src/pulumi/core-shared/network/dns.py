@@ -21,7 +21,11 @@ key_vault_private_dns_zone = azure_native.network.PrivateZone(
 )
 
 if platform_config.resource_protection:
-    lock_resource("privatelink-vaultcore-azure-net", key_vault_private_dns_zone.id)
+    lock_resource(
+        "privatelink-vaultcore-azure-net",
+        key_vault_private_dns_zone.id,
+        parents=[resource_groups["infra"]],
+    )
 
 outputs["private_zones"]["key_vault"] = {
     "id": key_vault_private_dns_zone.id,
@@ -42,5 +46,7 @@ key_vault_private_dns_zone_link = azure_native.network.VirtualNetworkLink(
 )
 if platform_config.resource_protection:
     lock_resource(
-    "privatelink-vaultcore-azure-net-zone-link", key_vault_private_dns_zone_link.id
-)
+        "privatelink-vaultcore-azure-net-zone-link",
+        key_vault_private_dns_zone_link.id,
+        parents=[key_vault_private_dns_zone, resource_groups["infra"]],
+    )
@@ -1,12 +1,18 @@
 import pulumi_azure_native as azure_native
-from pulumi.resource import ResourceOptions
+from pulumi import ResourceOptions, log
 
+from ingenii_azure_data_platform.kubernetes import get_cluster_config
 from ingenii_azure_data_platform.logs import log_diagnostic_settings
+from ingenii_azure_data_platform.network import (
+    DEFAULT_SNAT_PORTS_PER_NODE,
+    estimate_snat_capacity,
+    nat_gateway_public_ip_count,
+)
 from ingenii_azure_data_platform.utils import generate_resource_name, lock_resource
 
 from logs import log_analytics_workspace
-from project_config import platform_config, platform_outputs
 from management import resource_groups
+from project_config import platform_config, platform_outputs
 
 gateway_config = platform_config.from_yml["network"]["nat_gateway"]
 
@@ -14,43 +20,108 @@ outputs = platform_outputs["network"]["nat"] = {}
 
 is_gateway_enabled = gateway_config.get("enabled", False)
 
+# Subnets sending their outbound traffic through the gateway, unless
+# configured otherwise.
+DEFAULT_NAT_SUBNETS = ["hosted_services"]
+nat_subnets = gateway_config.get("subnets", DEFAULT_NAT_SUBNETS)
+
+
+def subnet_nat_gateway(subnet_name: str):
+    """The NAT gateway for the subnet, or None if it should not use it."""
+    if is_gateway_enabled and subnet_name in nat_subnets:
+        return azure_native.network.SubResourceArgs(id=gateway.id)
+    return None
+
+
 if is_gateway_enabled:
 
-    gateway_public_ip_resource_name = generate_resource_name(
-        resource_type="public_ip",
-        resource_name="for-ngw-main",
-        platform_config=platform_config,
-    )
+    public_ip_count = gateway_config.get("public_ip_count", 1)
+    public_ip_prefix_length = gateway_config.get("public_ip_prefix_length")
+    total_public_ip_count = nat_gateway_public_ip_count(public_ip_count, public_ip_prefix_length)
 
-    gateway_public_ip = azure_native.network.PublicIPAddress(
-        gateway_public_ip_resource_name,
-        idle_timeout_in_minutes=10,
-        public_ip_address_name=gateway_public_ip_resource_name,
-        public_ip_address_version=azure_native.network.IPVersion.I_PV4,
-        public_ip_allocation_method=azure_native.network.IPAllocationMethod.STATIC,
-        resource_group_name=resource_groups["infra"].name,
-        sku=azure_native.network.PublicIPAddressSkuArgs(name="Standard"),
-        opts=ResourceOptions(
-            protect=platform_config.resource_protection,
-            ignore_changes=["nat_gateway"],
-        ),
-    )
-    if platform_config.resource_protection:
-        lock_resource(gateway_public_ip_resource_name, gateway_public_ip.id)
+    # ----------------------------------------------------------------------------------------------------------------------
+    # NAT GATEWAY -> PUBLIC IPS
+    # ----------------------------------------------------------------------------------------------------------------------
 
-    # Send diagnostic logs to Log Analytics Workspace
     public_ip_details = gateway_config.get("public_ip", {})
-    log_diagnostic_settings(
-        platform_config,
-        log_analytics_workspace.id,
-        gateway_public_ip.type,
-        gateway_public_ip.id,
-        gateway_public_ip_resource_name,
-        logs_config=public_ip_details.get("logs", {}),
-        metrics_config=public_ip_details.get("metrics", {}),
-    )
+    gateway_public_ips = []
+    for idx in range(public_ip_count):
+        gateway_public_ip_resource_name = generate_resource_name(
+            resource_type="public_ip",
+            resource_name="for-ngw-main" if idx == 0 else f"for-ngw-main-{idx}",
+            platform_config=platform_config,
+        )
 
-    outputs["public_ip_address"] = gateway_public_ip.ip_address
+        gateway_public_ip = azure_native.network.PublicIPAddress(
+            gateway_public_ip_resource_name,
+            idle_timeout_in_minutes=10,
+            public_ip_address_name=gateway_public_ip_resource_name,
+            public_ip_address_version=azure_native.network.IPVersion.I_PV4,
+            public_ip_allocation_method=azure_native.network.IPAllocationMethod.STATIC,
+            resource_group_name=resource_groups["infra"].name,
+            sku=azure_native.network.PublicIPAddressSkuArgs(name="Standard"),
+            opts=ResourceOptions(
+                protect=platform_config.resource_protection,
+                ignore_changes=["nat_gateway"],
+            ),
+        )
+        if platform_config.resource_protection:
+            lock_resource(
+                gateway_public_ip_resource_name,
+                gateway_public_ip.id,
+                parents=[resource_groups["infra"]],
+            )
+
+        # Send diagnostic logs to Log Analytics Workspace
+        log_diagnostic_settings(
+            platform_config,
+            log_analytics_workspace.id,
+            gateway_public_ip.type,
+            gateway_public_ip.id,
+            gateway_public_ip_resource_name,
+            logs_config=public_ip_details.get("logs", {}),
+            metrics_config=public_ip_details.get("metrics", {}),
+        )
+
+        gateway_public_ips.append(gateway_public_ip)
+
+    # None when the gateway only uses a prefix
+    if gateway_public_ips:
+        outputs["public_ip_address"] = gateway_public_ips[0].ip_address
+    outputs["public_ip_addresses"] = [ip.ip_address for ip in gateway_public_ips]
+
+    gateway_public_ip_prefixes = []
+    if public_ip_prefix_length is not None:
+        gateway_public_ip_prefix_resource_name = generate_resource_name(
+            resource_type="public_ip_prefix",
+            resource_name="for-ngw-main",
+            platform_config=platform_config,
+        )
+        gateway_public_ip_prefix = azure_native.network.PublicIPPrefix(
+            gateway_public_ip_prefix_resource_name,
+            prefix_length=public_ip_prefix_length,
+            public_ip_address_version=azure_native.network.IPVersion.I_PV4,
+            public_ip_prefix_name=gateway_public_ip_prefix_resource_name,
+            resource_group_name=resource_groups["infra"].name,
+            sku=azure_native.network.PublicIPPrefixSkuArgs(name="Standard"),
+            tags=platform_config.tags,
+            opts=ResourceOptions(
+                protect=platform_config.resource_protection,
+                ignore_changes=["nat_gateway"],
+            ),
+        )
+        if platform_config.resource_protection:
+            lock_resource(
+                gateway_public_ip_prefix_resource_name,
+                gateway_public_ip_prefix.id,
+                parents=[resource_groups["infra"]],
+            )
+        gateway_public_ip_prefixes.append(gateway_public_ip_prefix)
+        outputs["public_ip_prefix"] = gateway_public_ip_prefix.ip_prefix
+
+    # ----------------------------------------------------------------------------------------------------------------------
+    # NAT GATEWAY
+    # ----------------------------------------------------------------------------------------------------------------------
 
     gateway_resource_name = generate_resource_name(
         resource_type="nat_gateway",
@@ -62,9 +133,12 @@ if is_gateway_enabled:
         gateway_resource_name,
         nat_gateway_name=gateway_resource_name,
         public_ip_addresses=[
-            azure_native.network.SubResourceArgs(
-                id=gateway_public_ip.id,
-            )
+            azure_native.network.SubResourceArgs(id=public_ip.id)
+            for public_ip in gateway_public_ips
+        ],
+        public_ip_prefixes=[
+            azure_native.network.SubResourceArgs(id=public_ip_prefix.id)
+            for public_ip_prefix in gateway_public_ip_prefixes
         ],
         resource_group_name=resource_groups["infra"].name,
         sku=azure_native.network.NatGatewaySkuArgs(
@@ -72,8 +146,40 @@ if is_gateway_enabled:
         ),
     )
     if platform_config.resource_protection:
-        lock_resource(gateway_resource_name, gateway.id)
+        lock_resource(
+            gateway_resource_name,
+            gateway.id,
+            parents=[resource_groups["infra"]],
+        )
 
     outputs["gateway"] = {"id": gateway.id, "name": gateway.name}
 
+    # ----------------------------------------------------------------------------------------------------------------------
+    # NAT GATEWAY -> SNAT CAPACITY
+    # ----------------------------------------------------------------------------------------------------------------------
+
+    # Every node of the shared Kubernetes cluster at its maximum size, the
+    # system pool and the agent pools, all in the hosted services subnet.
+    snat_nodes = {}
+    if get_cluster_config(platform_config)["enabled"] and "hosted_services" in nat_subnets:
+        shared_cluster_config = platform_config["shared_kubernetes_cluster"]["cluster"]
+        snat_nodes["kubernetes"] = 1 + sum(
+            pool.get("max_count", 1)
+            for pool in shared_cluster_config.get("linux_agent_pools", [])
+            + shared_cluster_config.get("windows_agent_pools", [])
+        )
+
+    snat_capacity = estimate_snat_capacity(
+        snat_nodes,
+        total_public_ip_count,
+        gateway_config.get("snat_ports_per_node", DEFAULT_SNAT_PORTS_PER_NODE),
+    )
+    outputs["snat_capacity"] = snat_capacity
+    if snat_capacity["demand"] > snat_capacity["capacity"]:
+        log.warn(
+            f"The NAT gateway's estimated SNAT port demand of {snat_capacity['demand']} exceeds "
+            f"its {snat_capacity['capacity']} ports, it needs "
+            f"{snat_capacity['required_public_ips']} public IP addresses."
+        )
+
 outputs["is_gateway_enabled"] = is_gateway_enabled
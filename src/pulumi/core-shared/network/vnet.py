@@ -1,11 +1,12 @@
 import pulumi_azure_native.network as net
 from pulumi import ResourceOptions
 
-from ingenii_azure_data_platform.utils import (
-    generate_cidr,
-    generate_resource_name,
-    lock_resource,
+from ingenii_azure_data_platform.network import (
+    SubnetPlanningException,
+    plan_subnets,
+    subnet_resource_options,
 )
+from ingenii_azure_data_platform.utils import generate_resource_name, lock_resource
 
 from management import resource_groups
 from project_config import platform_config, platform_outputs
@@ -17,8 +18,8 @@ outputs = platform_outputs["network"]
 # ----------------------------------------------------------------------------------------------------------------------
 # VNET
 # ----------------------------------------------------------------------------------------------------------------------
-vnet_config = platform_config.from_yml["network"]["virtual_network"]
-vnet_address_space = vnet_config["address_space"]
+vnet_config = platform_config.model.network.virtual_network
+vnet_address_space = vnet_config.address_space
 vnet_name = generate_resource_name(
     resource_type="virtual_network",
     resource_name="main",
@@ -41,7 +42,7 @@ vnet = net.VirtualNetwork(
 )
 
 if platform_config.resource_protection:
-    lock_resource(vnet_name, vnet.id)
+    lock_resource(vnet_name, vnet.id, parents=[resource_groups["infra"]])
 
 # Export VNET metadata
 outputs["virtual_network"] = {
@@ -57,7 +58,35 @@ outputs["virtual_network"] = {
 
 # TODO: Remove duplication. Keep it DRY.
 
+# The default position of every subnet, as (prefix, subnet number)
+SUBNET_LAYOUT = {
+    "gateway": (24, 0),
+    "privatelink": (24, 1),
+    "hosted_services": (24, 2),
+    "devops_deployment": (24, 3),
+}
+
+subnet_capacity = {
+    name: {"address_prefix": subnet.address_prefix, "hosts": subnet.hosts}
+    for name, subnet in (vnet_config.subnets or {}).items()
+}
+
+# The NAT gateway can not be attached to the gateway or private link subnets
+invalid_nat_subnets = [
+    name
+    for name in nat.nat_subnets
+    if name not in SUBNET_LAYOUT or name in ("gateway", "privatelink")
+]
+if invalid_nat_subnets:
+    raise SubnetPlanningException(
+        f"The NAT gateway can not be attached to subnets {invalid_nat_subnets}."
+    )
+
+subnet_plan = plan_subnets(vnet_address_space, SUBNET_LAYOUT, subnet_capacity)
+sequential_subnets = vnet_config.subnet_provisioning != "parallel"
+
 subnet_outputs = outputs["virtual_network"]["subnets"] = {}
+outputs["virtual_network"]["headroom"] = subnet_plan.headroom()
 
 # GATEWAY SUBNET
 gateway_subnet = net.Subnet(
@@ -67,7 +96,7 @@ gateway_subnet = net.Subnet(
     subnet_name="Gateway",  # Microsoft requires the Gateway subnet to be called "Gateway"
     resource_group_name=resource_groups["infra"].name,
     virtual_network_name=vnet.name,
-    address_prefix=generate_cidr(vnet_address_space, 24, 0),
+    address_prefix=subnet_plan.cidr("gateway"),
     route_table=net.RouteTableArgs(id=routing.main_route_table.id),
 )
 
@@ -87,10 +116,10 @@ privatelink_subnet = net.Subnet(
     subnet_name=privatelink_subnet_name,
     resource_group_name=resource_groups["infra"].name,
     virtual_network_name=vnet.name,
-    address_prefix=generate_cidr(vnet_address_space, 24, 1),
+    address_prefix=subnet_plan.cidr("privatelink"),
     private_endpoint_network_policies=net.VirtualNetworkPrivateEndpointNetworkPolicies.DISABLED,
     route_table=net.RouteTableArgs(id=routing.main_route_table.id),
-    opts=ResourceOptions(depends_on=[gateway_subnet]),
+    opts=subnet_resource_options(gateway_subnet, sequential_subnets),
 )
 
 # Export subnet metadata
@@ -111,9 +140,9 @@ hosted_services_subnet = net.Subnet(
     subnet_name=hosted_services_subnet_name,
     resource_group_name=resource_groups["infra"].name,
     virtual_network_name=vnet.name,
-    address_prefix=generate_cidr(vnet_address_space, 24, 2),
+    address_prefix=subnet_plan.cidr("hosted_services"),
     route_table=net.RouteTableArgs(id=routing.main_route_table.id),
-    nat_gateway=net.SubResourceArgs(id=nat.gateway.id),
+    nat_gateway=nat.subnet_nat_gateway("hosted_services"),
     service_endpoints=[
         net.ServiceEndpointPropertiesFormatArgs(service=service)
         for service in [
@@ -123,7 +152,7 @@ hosted_services_subnet = net.Subnet(
             "Microsoft.SQL",
         ]
     ],
-    opts=ResourceOptions(depends_on=[privatelink_subnet]),
+    opts=subnet_resource_options(privatelink_subnet, sequential_subnets),
 )
 
 # Export subnet metadata
@@ -144,8 +173,9 @@ devops_deployment_subnet = net.Subnet(
     subnet_name=devops_deployment_subnet_name,
     resource_group_name=resource_groups["infra"].name,
     virtual_network_name=vnet.name,
-    address_prefix=generate_cidr(vnet_address_space, 24, 3),
+    address_prefix=subnet_plan.cidr("devops_deployment"),
     route_table=net.RouteTableArgs(id=routing.main_route_table.id),
+    nat_gateway=nat.subnet_nat_gateway("devops_deployment"),
     service_endpoints=[
         net.ServiceEndpointPropertiesFormatArgs(service=service)
         for service in [
@@ -155,7 +185,7 @@ devops_deployment_subnet = net.Subnet(
             "Microsoft.SQL",
         ]
     ],
-    opts=ResourceOptions(depends_on=[hosted_services_subnet]),
+    opts=subnet_resource_options(hosted_services_subnet, sequential_subnets),
 )
 
 # Export subnet metadata
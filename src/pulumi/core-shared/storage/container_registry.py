@@ -75,7 +75,7 @@ for ref_key, config in registry_config.items():
         ),
     )
     if platform_config.resource_protection:
-        lock_resource(resource_name, registry.id)
+        lock_resource(resource_name, registry.id, parents=[resource_group])
 
     registries[ref_key] = registry
 
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import Dict, Iterable, Set, Tuple, Union
 
 import pulumi
 from pulumi_azure_native import keyvault
@@ -20,10 +20,23 @@ class ConfigRegistryBaseClient(ABC):
     get_value(key):
         Retrieves the value of the provided key.
 
+    get_many(keys):
+        Retrieves the values of the provided keys.
+
     set_value(key, value):
         Stores the value under the provided key.
     """
 
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Returns the values of the requested keys, as a dictionary.
+
+        Parameters
+        ----------
+            keys (Iterable[str]): The key names of the stored values.
+        """
+        return {key: self.get_value(key) for key in keys}
+
     @abstractmethod
     def get_value(self, key: str) -> str:
         """
@@ -54,6 +67,201 @@ class ConfigRegistryKeyVaultClient(ConfigRegistryBaseClient):
     """
     Config registry client that uses the Azure Key Vault as underlying storage engine.
 
+    Values read from the vault are cached in-process for the run, and shared
+    between clients of the same vault. Values stored with set_value in the
+    same run take precedence over cached reads.
+
+    In bulk mode the names of the vault's secrets are listed once, and each
+    value is read on its first use. Later reads, and reads of keys that are
+    not in the vault, do not reach the vault.
+
+    Attributes
+    ----------
+
+    Methods
+    -------
+    get_value(key):
+        Retrieves the value of the provided key.
+
+    get_many(keys):
+        Retrieves the values of the provided keys.
+
+    set_value(key, value)
+        Stores the value under the provided key.
+    """
+
+    _values = {}
+
+    # The caches are keyed by the vault resource id as passed to the client,
+    # the string or the Output, e.g. the same vault.id for every client.
+    # (vault, key) -> value
+    _secrets_cache: Dict[Tuple[Union[str, pulumi.Output], str], str] = {}
+
+    # vault -> names of the secrets in the vault
+    _secret_names_cache: Dict[Union[str, pulumi.Output], Set[str]] = {}
+
+    # TODO: Use regex or another approach to extract the values.
+    @classmethod
+    def _parse_key_vault_resource_id(cls, resource_id: str) -> dict[str, str]:
+        _split = list(filter(None, resource_id.split("/")))
+
+        return {"id": resource_id, "name": _split[7], "resource_group_name": _split[3]}
+
+    @staticmethod
+    def _is_missing_vault_error(ex: Exception) -> bool:
+        return "KeyVault" in str(ex) and "does not exist" in str(ex)
+
+    @staticmethod
+    def _is_missing_secret_error(ex: Exception) -> bool:
+        return "SecretNotFound" in str(ex) or "was not found in this key vault" in str(ex)
+
+    def __init__(
+        self,
+        key_vault_resource_id: Union[str, pulumi.Output],
+        bulk: bool = False,
+    ):
+        """
+        Constructs a config registry client.
+
+        Parameters
+        ----------
+        key_vault_resource_id: str or pulumi.Output
+            The resource id of the Azure Key Vault tha will be used as a storage engine.
+            It can be provided directly as a string or from a Pulumi KeyVault
+            resource (e.g. vault.id)
+        bulk: bool
+            Whether to list the vault's secrets on the first read, so keys not in the vault are not read.
+        """
+        self._bulk = bulk
+        # Indexing an Output returns a new Output every time, so it can't key the caches
+        self._vault_key = key_vault_resource_id
+
+        if isinstance(key_vault_resource_id, pulumi.Output):
+            self._kv = key_vault_resource_id.apply(
+                lambda id: self._parse_key_vault_resource_id(resource_id=id)
+            )
+        elif isinstance(key_vault_resource_id, str):
+            self._kv = self._parse_key_vault_resource_id(
+                resource_id=key_vault_resource_id
+            )
+        else:
+            raise TypeError(
+                "key_vault_resource_id should be of type 'pulumi.Output' or 'str'."
+            )
+
+    def _list_secret_names(self) -> Set[str]:
+        if self._vault_key not in self._secret_names_cache:
+            try:
+                names = keyvault_classic.get_secrets(key_vault_id=self._kv["id"]).names
+            except Exception as ex:
+                if not self._is_missing_vault_error(ex):
+                    raise ex
+                names = []
+            self._secret_names_cache[self._vault_key] = set(names)
+        return self._secret_names_cache[self._vault_key]
+
+    def _read_secret(self, key: str) -> None:
+        secret = keyvault_classic.get_secret(key_vault_id=self._kv["id"], name=key)
+        self._secrets_cache[(self._vault_key, key)] = secret.value
+
+    def _prefetch(self, keys: Iterable[str]) -> None:
+        """
+        Reads the secrets of the requested keys that are in the vault and not
+        cached yet. Pulumi invokes are read one after another, as they are
+        not safe to call from other threads.
+        """
+        for key in dict.fromkeys(keys):
+            if key in self._list_secret_names() and (self._vault_key, key) not in self._secrets_cache:
+                self._read_secret(key)
+
+    def get_value(self, key: str) -> str:
+        """
+        Returns the value of the requested key parameter.
+
+        Parameters
+        ----------
+            key (str): The key name of the stored value.
+
+        Returns
+        -------
+            A string representation of the value.
+
+        Raises
+        ------
+        KeyError
+            If the key is not found in memory or in the Azure Key Vault, a KeyError will be raised.
+        """
+        if key in self._values:
+            return self._values[key]
+
+        if self._bulk:
+            self._prefetch([key])
+            try:
+                return self._secrets_cache[(self._vault_key, key)]
+            except KeyError:
+                raise KeyError(
+                    f"The key '{key}' not found in the config registry vault."
+                ) from None
+
+        if (self._vault_key, key) in self._secrets_cache:
+            return self._secrets_cache[(self._vault_key, key)]
+
+        try:
+            self._read_secret(key)
+            return self._secrets_cache[(self._vault_key, key)]
+        except Exception as ex:
+            if self._is_missing_vault_error(ex) or self._is_missing_secret_error(ex):
+                raise KeyError(
+                    f"The key '{key}' not found in the config registry vault."
+                ) from ex
+            raise ex
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Returns the values of the requested keys, as a dictionary. The
+        vault's secret names are listed once, and each key that is in the
+        vault and not cached yet is read with its own request.
+
+        Parameters
+        ----------
+            keys (Iterable[str]): The key names of the stored values.
+
+        Raises
+        ------
+        KeyError
+            If any key is not found in memory or in the Azure Key Vault, a KeyError will be raised.
+        """
+        keys = list(keys)
+        self._prefetch(key for key in keys if key not in self._values)
+        return {key: self.get_value(key) for key in keys}
+
+    def set_value(self, key: str, value: str) -> None:
+        """
+         Stores a value under a specified key.
+
+        Parameters
+        ----------
+            key (str): The key under which to store the value.
+            value (str): The value to store.
+
+        Returns
+        -------
+            None
+        """
+
+
+class ConfigRegistryKeyVaultClient(ConfigRegistryBaseClient):
+    """
+    Config registry client that uses the Azure Key Vault as underlying storage engine.
+
+    Values read from the vault are cached in-process for the run, and shared
+    between clients of the same vault. Values stored with set_value in the
+    same run take precedence over cached reads.
+
+    In bulk mode the names of the vault's secrets are listed once, and each
+    value is read on its first use. Later reads, and reads of keys that are
+    not in the vault, do not reach the vault.
+
     Attributes
     ----------
 
@@ -62,12 +270,23 @@ class ConfigRegistryKeyVaultClient(ConfigRegistryBaseClient):
     get_value(key):
         Retrieves the value of the provided key.
 
+    get_many(keys):
+        Retrieves the values of the provided keys.
+
     set_value(key, value)
         Stores the value under the provided key.
     """
 
     _values = {}
 
+    # The caches are keyed by the vault resource id as passed to the client,
+    # the string or the Output, e.g. the same vault.id for every client.
+    # (vault, key) -> value
+    _secrets_cache: Dict[Tuple[Union[str, pulumi.Output], str], str] = {}
+
+    # vault -> names of the secrets in the vault
+    _secret_names_cache: Dict[Union[str, pulumi.Output], Set[str]] = {}
+
     # TODO: Use regex or another approach to extract the values.
     @classmethod
     def _parse_key_vault_resource_id(cls, resource_id: str) -> dict[str, str]:
@@ -75,9 +294,18 @@ class ConfigRegistryKeyVaultClient(ConfigRegistryBaseClient):
 
         return {"id": resource_id, "name": _split[7], "resource_group_name": _split[3]}
 
+    @staticmethod
+    def _is_missing_vault_error(ex: Exception) -> bool:
+        return "KeyVault" in str(ex) and "does not exist" in str(ex)
+
+    @staticmethod
+    def _is_missing_secret_error(ex: Exception) -> bool:
+        return "SecretNotFound" in str(ex) or "was not found in this key vault" in str(ex)
+
     def __init__(
         self,
         key_vault_resource_id: Union[str, pulumi.Output],
+        bulk: bool = False,
     ):
         """
         Constructs a config registry client.
@@ -88,7 +316,13 @@ class ConfigRegistryKeyVaultClient(ConfigRegistryBaseClient):
             The resource id of the Azure Key Vault tha will be used as a storage engine.
             It can be provided directly as a string or from a Pulumi KeyVault
             resource (e.g. vault.id)
+        bulk: bool
+            Whether to list the vault's secrets on the first read, so keys not in the vault are not read.
         """
+        self._bulk = bulk
+        # Indexing an Output returns a new Output every time, so it can't key the caches
+        self._vault_key = key_vault_resource_id
+
         if isinstance(key_vault_resource_id, pulumi.Output):
             self._kv = key_vault_resource_id.apply(
                 lambda id: self._parse_key_vault_resource_id(resource_id=id)
@@ -102,6 +336,31 @@ class ConfigRegistryKeyVaultClient(ConfigRegistryBaseClient):
                 "key_vault_resource_id should be of type 'pulumi.Output' or 'str'."
             )
 
+    def _list_secret_names(self) -> Set[str]:
+        if self._vault_key not in self._secret_names_cache:
+            try:
+                names = keyvault_classic.get_secrets(key_vault_id=self._kv["id"]).names
+            except Exception as ex:
+                if not self._is_missing_vault_error(ex):
+                    raise ex
+                names = []
+            self._secret_names_cache[self._vault_key] = set(names)
+        return self._secret_names_cache[self._vault_key]
+
+    def _read_secret(self, key: str) -> None:
+        secret = keyvault_classic.get_secret(key_vault_id=self._kv["id"], name=key)
+        self._secrets_cache[(self._vault_key, key)] = secret.value
+
+    def _prefetch(self, keys: Iterable[str]) -> None:
+        """
+        Reads the secrets of the requested keys that are in the vault and not
+        cached yet. Pulumi invokes are read one after another, as they are
+        not safe to call from other threads.
+        """
+        for key in dict.fromkeys(keys):
+            if key in self._list_secret_names() and (self._vault_key, key) not in self._secrets_cache:
+                self._read_secret(key)
+
     def get_value(self, key: str) -> str:
         """
         Returns the value of the requested key parameter.
@@ -119,23 +378,62 @@ class ConfigRegistryKeyVaultClient(ConfigRegistryBaseClient):
         KeyError
             If the key is not found in memory or in the Azure Key Vault, a KeyError will be raised.
         """
+        if key in self._values:
+            return self._values[key]
+
+        if self._bulk:
+            self._prefetch([key])
+            try:
+                return self._secrets_cache[(self._vault_key, key)]
+            except KeyError:
+                raise KeyError(
+                    f"The key '{key}' not found in the config registry vault."
+                ) from None
+
+        if (self._vault_key, key) in self._secrets_cache:
+            return self._secrets_cache[(self._vault_key, key)]
+
         try:
-            return keyvault_classic.get_secret(self._kv["id"], key).value
+            self._read_secret(key)
+            return self._secrets_cache[(self._vault_key, key)]
         except Exception as ex:
-            print(self._kv)
-            print(ex)
-            if (
-                str(ex).find("KeyVault") is not -1
-                and str(ex).find("does not exist") is not -1
-            ):
-                try:
-                    return self._values[key]
-                except KeyError:
-                    raise KeyError(
-                        f"The key '{key}' not found in the config registry vault."
-                    ) from ex
+            if self._is_missing_vault_error(ex) or self._is_missing_secret_error(ex):
+                raise KeyError(
+                    f"The key '{key}' not found in the config registry vault."
+                ) from ex
             raise ex
 
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Returns the values of the requested keys, as a dictionary. The
+        vault's secret names are listed once, and each key that is in the
+        vault and not cached yet is read with its own request.
+
+        Parameters
+        ----------
+            keys (Iterable[str]): The key names of the stored values.
+
+        Raises
+        ------
+        KeyError
+            If any key is not found in memory or in the Azure Key Vault, a KeyError will be raised.
+        """
+        keys = list(keys)
+        self._prefetch(key for key in keys if key not in self._values)
+        return {key: self.get_value(key) for key in keys}
+
+    def get_version(self, key: str) -> Union[str, None]:
+        """
+        Returns the secret version the cached value of the key was read from,
+        or None if the key has not been read from the vault in this run.
+
+        Parameters
+        ----------
+            key (str): The key name of the stored value.
+        """
+        cached = self._secrets_cache.get((self._vault_key, key))
+        return cached[0] if cached else None
+
     def set_value(self, key: str, value: str) -> None:
         """
          Stores a value under a specified key.
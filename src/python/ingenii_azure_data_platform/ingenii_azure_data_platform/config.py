@@ -1,6 +1,11 @@
+import json
 import yaml
-from os import getenv, path
-from typing import Any, cast, Union
+from hashlib import sha256
+from os import getenv, makedirs, path, remove, replace
+from functools import lru_cache
+from tempfile import NamedTemporaryFile
+from time import perf_counter
+from typing import Any, List, Tuple, cast, Union
 
 import yamale
 import hiyapyco as hco
@@ -8,6 +13,7 @@ import hiyapyco as hco
 from pulumi import runtime, StackReference, Output, UNKNOWN
 from pulumi.output import Unknown
 
+from .config_model import PlatformConfigModel
 from .network import PlatformFirewall
 
 
@@ -109,15 +115,34 @@ class PlatformConfiguration:
     * tags          - the global tags (extracted from the YML configs)
     * unique_id     - the unique string id (extracted from the YML configs)
     * yml_config    - the yml config dictionary
+    * model         - the yml config as a typed, read-only object (see config_model.py)
+
+    Caching
+    -------
+
+    The merged and validated configuration is cached on disk, keyed by the hash of all input files and
+    the schema. The cache location is set with ADP_CONFIG_CACHE_DIR and can be turned off by setting
+    ADP_CONFIG_CACHE_DISABLED=1.
     """
 
+    # Increase when the shape of the cached entries changes, to invalidate old ones.
+    _CACHE_FORMAT_VERSION = 1
+
     def _load_yml(self, file_path: str) -> Any:
         with open(file_path, "r") as f:
             return yaml.safe_load(f)
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _load_schema(schema_file_path: str) -> yamale.schema.Schema:
+        # Parsed once per process, as some programs build several configurations.
+        return yamale.make_schema(schema_file_path)
+
     def _validate_schema(self, schema_file_path: str, yml_config: dict):
-        schema = yamale.make_schema(schema_file_path)
-        data = yamale.make_data(content=hco.dump(yml_config))
+        schema = self._load_schema(schema_file_path)
+        # Validate the merged dictionary directly, yamale only needs
+        # (data, path) pairs, so there is no need to dump and re-parse it.
+        data = [(yml_config, schema_file_path)]
         try:
             yamale.validate(schema, data)
             print("The configuration schema is valid. ✅")
@@ -125,6 +150,90 @@ class PlatformConfiguration:
             print(f"The configuration schema is NOT valid! ❌\n{e}")
             exit(1)
 
+    def _cache_file_path(self, input_file_paths: List[str]) -> Union[str, None]:
+        """
+        Returns the path of the cache entry for the merged and validated config.
+        The entry is addressed by the hash of the contents of every input file,
+        so any change to the defaults, the custom config or the schema results
+        in a new entry. Returns None if caching is disabled.
+        """
+        if bool(int(getenv("ADP_CONFIG_CACHE_DISABLED", 0))):
+            return None
+
+        cache_dir = getenv(
+            "ADP_CONFIG_CACHE_DIR",
+            path.join(path.expanduser("~"), ".cache", "ingenii_azure_data_platform"),
+        )
+
+        content_hash = sha256(str(self._CACHE_FORMAT_VERSION).encode("utf-8"))
+        for file_path in input_file_paths:
+            with open(file_path, "rb") as f:
+                content_hash.update(f.read())
+
+        return path.join(cache_dir, f"config-{content_hash.hexdigest()}.json")
+
+    def _load_cached_config(self, cache_file_path: Union[str, None]) -> Union[dict, None]:
+        if cache_file_path is None or not path.isfile(cache_file_path):
+            return None
+
+        start_time = perf_counter()
+        try:
+            with open(cache_file_path, "r") as f:
+                cached = json.load(f)
+            build_seconds, config = cached["build_seconds"], cached["config"]
+        except (OSError, ValueError, KeyError, TypeError):
+            # A corrupt, unreadable or foreign entry is rebuilt from the source files.
+            return None
+
+        saved_ms = (build_seconds - (perf_counter() - start_time)) * 1000
+        print(
+            "The configuration schema is valid (cached). ✅ "
+            f"Skipped merging and validation, saving {saved_ms:.0f}ms."
+        )
+        return config
+
+    @classmethod
+    def _json_safe(cls, value: Any) -> bool:
+        """
+        Whether the value comes back the same from JSON, i.e. there are no
+        non-string keys, dates or other types that JSON changes or can't hold.
+        """
+        if isinstance(value, dict):
+            return all(isinstance(key, str) and cls._json_safe(item) for key, item in value.items())
+        if isinstance(value, list):
+            return all(cls._json_safe(item) for item in value)
+        return value is None or isinstance(value, (str, int, float, bool))
+
+    def _save_cached_config(
+        self, cache_file_path: Union[str, None], yml_config: dict, build_seconds: float
+    ) -> None:
+        if cache_file_path is None:
+            return
+
+        if not self._json_safe(yml_config):
+            # A cache hit would give a different configuration from a miss.
+            print(
+                "Unable to cache the merged configuration, continuing without it: "
+                "it has non-string keys or values JSON can't hold."
+            )
+            return
+
+        temp_file_path = None
+        try:
+            makedirs(path.dirname(cache_file_path), exist_ok=True)
+            # Write to a temporary file first, so stacks running in parallel
+            # never read a partially written entry.
+            with NamedTemporaryFile(
+                "w", dir=path.dirname(cache_file_path), delete=False
+            ) as f:
+                temp_file_path = f.name
+                json.dump({"build_seconds": build_seconds, "config": yml_config}, f)
+            replace(temp_file_path, cache_file_path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Unable to cache the merged configuration, continuing without it: {e}")
+            if temp_file_path is not None and path.isfile(temp_file_path):
+                remove(temp_file_path)
+
     def __init__(
         self,
         stack: str,
@@ -160,16 +269,30 @@ class PlatformConfiguration:
         if custom_config_file_path:
             merge_files += [custom_config_file_path]
 
-        self._from_yml = dict(
-            hco.load(
-                merge_files,
-                method=hco.METHOD_MERGE,
-                mergelists=False,
-            )
-        )  # type: ignore
+        # Merging and validating is the slowest part of the program start, so
+        # reuse a previous result if none of the input files have changed.
+        cache_file_path = self._cache_file_path(
+            merge_files + [config_schema_file_path]
+        )
+        self._from_yml = self._load_cached_config(cache_file_path)
 
-        # Validate the schema
-        self._validate_schema(config_schema_file_path, self._from_yml)
+        if self._from_yml is None:
+            start_time = perf_counter()
+
+            self._from_yml = dict(
+                hco.load(
+                    merge_files,
+                    method=hco.METHOD_MERGE,
+                    mergelists=False,
+                )
+            )  # type: ignore
+
+            # Validate the schema
+            self._validate_schema(config_schema_file_path, self._from_yml)
+
+            self._save_cached_config(
+                cache_file_path, self._from_yml, perf_counter() - start_time
+            )
 
         ########
         # General
@@ -180,6 +303,7 @@ class PlatformConfiguration:
         self._tags = general_config["tags"]
         self._unique_id = general_config["unique_id"]
         self._use_legacy_naming = general_config["use_legacy_naming"]
+        self._lock_strategy = general_config.get("lock_strategy", "resource")
 
         # Default here, not in .yml, so a set list replaces and not merges
         if self._stack == "shared" and not general_config.get("environments"):
@@ -206,10 +330,19 @@ class PlatformConfiguration:
         # Load metadata
         self._metadata = self._load_yml(metadata_file_path)
 
+        # Built on first use
+        self._model = None
+
     @property
     def from_yml(self):
         return self._from_yml
 
+    @property
+    def model(self) -> PlatformConfigModel:
+        if self._model is None:
+            self._model = PlatformConfigModel.from_dict(self._from_yml)
+        return self._model
+
     @property
     def prefix(self):
         return self._prefix
@@ -247,6 +380,10 @@ class PlatformConfiguration:
     def use_legacy_naming(self):
         return self._use_legacy_naming
 
+    @property
+    def lock_strategy(self):
+        return self._lock_strategy
+
     @property
     def metadata(self):
         return self._metadata
@@ -263,17 +400,29 @@ class PlatformConfiguration:
 
 
 class SharedOutput:
+    """
+    Read access to the 'root' output of another stack.
+
+    Every key path is resolved from the output of its parent path, and each
+    path is only ever built once. Repeated lookups, and lookups sharing a
+    prefix, reuse the same Output objects instead of building a new chain of
+    apply callbacks every time.
+    """
+
     def __init__(self, stack_name: str):
 
         shared_stack_reference = StackReference(name=stack_name)
 
         self.outputs = shared_stack_reference.get_output("root")
 
-    def get(self, *keys, preview=None):
-        def handle_preview_values(value):
-            if value == {} and runtime.is_dry_run():
-                return preview
-            return value
+        # Key path -> Output of the value at that path
+        self._paths = {(): self.outputs}
+        # (key path, preview) -> Output returned by get()
+        self._results = {}
+
+    def _get_path(self, keys: Tuple[str, ...]) -> Output:
+        if keys in self._paths:
+            return self._paths[keys]
 
         def lift(val, key_to_get):
             # Derived from Output.__getitem__
@@ -282,10 +431,26 @@ class SharedOutput:
 
             return cast(Any, val).get(key_to_get, {})
 
-        curr_output = self.outputs
-        for key in keys:
-            curr_output = Output.all(co=curr_output, key=key).apply(
-                lambda args: lift(args["co"], args["key"]), True
-            )
+        key = keys[-1]
+        self._paths[keys] = self._get_path(keys[:-1]).apply(
+            lambda val: lift(val, key), True
+        )
+        return self._paths[keys]
 
-        return curr_output.apply(handle_preview_values)
+    def get(self, *keys, preview=None):
+        def handle_preview_values(value):
+            if value == {} and runtime.is_dry_run():
+                return preview
+            return value
+
+        try:
+            result_key = (keys, preview)
+            return self._results[result_key]
+        except TypeError:
+            # Unhashable preview values are not memoized
+            return self._get_path(keys).apply(handle_preview_values)
+        except KeyError:
+            pass
+
+        self._results[result_key] = self._get_path(keys).apply(handle_preview_values)
+        return self._results[result_key]
@@ -0,0 +1,1492 @@
+"""
+Typed model of the platform configuration.
+
+Generated by src/scripts/generate_config_model.py from
+src/platform-config/schema.yml. Do not edit by hand.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Literal, Mapping, Optional, Tuple, Union
+
+
+def _tuple(value: Any, convert: Optional[Callable] = None) -> Optional[tuple]:
+    if value is None:
+        return None
+    if convert is None:
+        return tuple(value)
+    return tuple(convert(item) for item in value)
+
+
+def _mapping(value: Any, convert: Optional[Callable] = None) -> Optional[Mapping]:
+    if value is None:
+        return None
+    if convert is None:
+        return MappingProxyType(dict(value))
+    return MappingProxyType({key: convert(item) for key, item in value.items()})
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class General:
+    prefix: str
+    unique_id: str
+    use_legacy_naming: bool
+    region: str
+    tags: Mapping[str, Any]
+    environments: Optional[Tuple[str, ...]] = None
+    lock_strategy: Optional[Literal['resource', 'covering', 'resource_group']] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["General"]:
+        if data is None:
+            return None
+        return cls(
+            prefix=data.get("prefix"),
+            unique_id=data.get("unique_id"),
+            use_legacy_naming=data.get("use_legacy_naming"),
+            region=data.get("region"),
+            tags=_mapping(data.get("tags")),
+            environments=_tuple(data.get("environments")),
+            lock_strategy=data.get("lock_strategy"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class UserGroup:
+    display_name: str
+    object_id: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["UserGroup"]:
+        if data is None:
+            return None
+        return cls(
+            display_name=data.get("display_name"),
+            object_id=data.get("object_id"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class IamRoleAssignment:
+    role_definition_name: str
+    object_id: Optional[str] = None
+    user_group_ref_key: Optional[str] = None
+    azure_devops_project_group_name: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["IamRoleAssignment"]:
+        if data is None:
+            return None
+        return cls(
+            role_definition_name=data.get("role_definition_name"),
+            object_id=data.get("object_id"),
+            user_group_ref_key=data.get("user_group_ref_key"),
+            azure_devops_project_group_name=data.get("azure_devops_project_group_name"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Iam:
+    role_assignments: Tuple[IamRoleAssignment, ...]
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["Iam"]:
+        if data is None:
+            return None
+        return cls(
+            role_assignments=_tuple(data.get("role_assignments"), IamRoleAssignment.from_dict),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ResourceGroup:
+    display_name: str
+    enable_delete_protection: Optional[bool] = None
+    iam: Optional[Iam] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["ResourceGroup"]:
+        if data is None:
+            return None
+        return cls(
+            display_name=data.get("display_name"),
+            enable_delete_protection=data.get("enable_delete_protection"),
+            iam=Iam.from_dict(data.get("iam")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ActionGroup:
+    display_name: str
+    short_name: str
+    enabled: bool
+    email_addresses: Tuple[str, ...]
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["ActionGroup"]:
+        if data is None:
+            return None
+        return cls(
+            display_name=data.get("display_name"),
+            short_name=data.get("short_name"),
+            enabled=data.get("enabled"),
+            email_addresses=_tuple(data.get("email_addresses")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Management:
+    user_groups: Mapping[str, UserGroup]
+    resource_groups: Mapping[str, ResourceGroup]
+    resource_providers: Optional[Tuple[Union[str, None], ...]] = None
+    action_groups: Optional[Mapping[str, ActionGroup]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["Management"]:
+        if data is None:
+            return None
+        return cls(
+            user_groups=_mapping(data.get("user_groups"), UserGroup.from_dict),
+            resource_groups=_mapping(data.get("resource_groups"), ResourceGroup.from_dict),
+            resource_providers=_tuple(data.get("resource_providers")),
+            action_groups=_mapping(data.get("action_groups"), ActionGroup.from_dict),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Logs:
+    retention: int
+    resource_types: Mapping[str, bool]
+    mode: Optional[Literal['resource', 'policy']] = None
+    prepare_policy_mode: Optional[bool] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["Logs"]:
+        if data is None:
+            return None
+        return cls(
+            retention=data.get("retention"),
+            resource_types=_mapping(data.get("resource_types")),
+            mode=data.get("mode"),
+            prepare_policy_mode=data.get("prepare_policy_mode"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class NetworkFirewallResourceAccess:
+    resource_id: str
+    tenant_id: str
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["NetworkFirewallResourceAccess"]:
+        if data is None:
+            return None
+        return cls(
+            resource_id=data.get("resource_id"),
+            tenant_id=data.get("tenant_id"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class NetworkFirewall:
+    enabled: bool
+    ip_access_list: Optional[Tuple[str, ...]] = None
+    vnet_access_list: Optional[Tuple[str, ...]] = None
+    resource_access_list: Optional[Tuple[NetworkFirewallResourceAccess, ...]] = None
+    trust_azure_services: Optional[bool] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["NetworkFirewall"]:
+        if data is None:
+            return None
+        return cls(
+            enabled=data.get("enabled"),
+            ip_access_list=_tuple(data.get("ip_access_list")),
+            vnet_access_list=_tuple(data.get("vnet_access_list")),
+            resource_access_list=_tuple(data.get("resource_access_list"), NetworkFirewallResourceAccess.from_dict),
+            trust_azure_services=data.get("trust_azure_services"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class LogsSettings:
+    enabled: Optional[bool] = None
+    categories: Optional[Tuple[str, ...]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["LogsSettings"]:
+        if data is None:
+            return None
+        return cls(
+            enabled=data.get("enabled"),
+            categories=_tuple(data.get("categories")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Metrics:
+    enabled: Optional[bool] = None
+    categories: Optional[Tuple[str, ...]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["Metrics"]:
+        if data is None:
+            return None
+        return cls(
+            enabled=data.get("enabled"),
+            categories=_tuple(data.get("categories")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class LogsAndMetrics:
+    logs: Optional[LogsSettings] = None
+    metrics: Optional[Metrics] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["LogsAndMetrics"]:
+        if data is None:
+            return None
+        return cls(
+            logs=LogsSettings.from_dict(data.get("logs")),
+            metrics=Metrics.from_dict(data.get("metrics")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class NetworkNatGateway:
+    enabled: bool
+    public_ip: Optional[LogsAndMetrics] = None
+    public_ip_count: Optional[int] = None
+    public_ip_prefix_length: Optional[int] = None
+    subnets: Optional[Tuple[str, ...]] = None
+    snat_ports_per_node: Optional[int] = None
+    snat_alert_action_groups: Optional[Tuple[str, ...]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["NetworkNatGateway"]:
+        if data is None:
+            return None
+        return cls(
+            enabled=data.get("enabled"),
+            public_ip=LogsAndMetrics.from_dict(data.get("public_ip")),
+            public_ip_count=data.get("public_ip_count"),
+            public_ip_prefix_length=data.get("public_ip_prefix_length"),
+            subnets=_tuple(data.get("subnets")),
+            snat_ports_per_node=data.get("snat_ports_per_node"),
+            snat_alert_action_groups=_tuple(data.get("snat_alert_action_groups")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class NetworkPrivateEndpoints:
+    enabled: bool
+    resource_types: Optional[Tuple[str, ...]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["NetworkPrivateEndpoints"]:
+        if data is None:
+            return None
+        return cls(
+            enabled=data.get("enabled"),
+            resource_types=_tuple(data.get("resource_types")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class NetworkSubnet:
+    address_prefix: Optional[str] = None
+    hosts: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["NetworkSubnet"]:
+        if data is None:
+            return None
+        return cls(
+            address_prefix=data.get("address_prefix"),
+            hosts=data.get("hosts"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class NetworkVirtualNetwork:
+    display_name: str
+    address_space: str
+    subnets: Optional[Mapping[str, NetworkSubnet]] = None
+    subnet_provisioning: Optional[Literal['sequential', 'parallel']] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["NetworkVirtualNetwork"]:
+        if data is None:
+            return None
+        return cls(
+            display_name=data.get("display_name"),
+            address_space=data.get("address_space"),
+            subnets=_mapping(data.get("subnets"), NetworkSubnet.from_dict),
+            subnet_provisioning=data.get("subnet_provisioning"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Network:
+    firewall: NetworkFirewall
+    nat_gateway: NetworkNatGateway
+    private_endpoints: Optional[NetworkPrivateEndpoints] = None
+    virtual_network: NetworkVirtualNetwork
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["Network"]:
+        if data is None:
+            return None
+        return cls(
+            firewall=NetworkFirewall.from_dict(data.get("firewall")),
+            nat_gateway=NetworkNatGateway.from_dict(data.get("nat_gateway")),
+            private_endpoints=NetworkPrivateEndpoints.from_dict(data.get("private_endpoints")),
+            virtual_network=NetworkVirtualNetwork.from_dict(data.get("virtual_network")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class StorageDatalakeContainer:
+    display_name: str
+    iam: Optional[Iam] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["StorageDatalakeContainer"]:
+        if data is None:
+            return None
+        return cls(
+            display_name=data.get("display_name"),
+            iam=Iam.from_dict(data.get("iam")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class StorageDatalakeTableEntity:
+    partition_key: str
+    row_key: str
+    entity: Optional[Mapping[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["StorageDatalakeTableEntity"]:
+        if data is None:
+            return None
+        return cls(
+            partition_key=data.get("partition_key"),
+            row_key=data.get("row_key"),
+            entity=_mapping(data.get("entity")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class StorageDatalakeTable:
+    display_name: str
+    iam: Optional[Iam] = None
+    entities: Optional[Mapping[str, StorageDatalakeTableEntity]] = None
+    entity_sync: Optional[Literal['resource', 'batch']] = None
+    retain_entities: Optional[bool] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["StorageDatalakeTable"]:
+        if data is None:
+            return None
+        return cls(
+            display_name=data.get("display_name"),
+            iam=Iam.from_dict(data.get("iam")),
+            entities=_mapping(data.get("entities"), StorageDatalakeTableEntity.from_dict),
+            entity_sync=data.get("entity_sync"),
+            retain_entities=data.get("retain_entities"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class StorageDatalakeNetworkPrivateEndpoint:
+    blob: Optional[LogsAndMetrics] = None
+    dfs: Optional[LogsAndMetrics] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["StorageDatalakeNetworkPrivateEndpoint"]:
+        if data is None:
+            return None
+        return cls(
+            blob=LogsAndMetrics.from_dict(data.get("blob")),
+            dfs=LogsAndMetrics.from_dict(data.get("dfs")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class StorageDatalakeNetwork:
+    firewall: Optional[NetworkFirewall] = None
+    private_endpoint: Optional[StorageDatalakeNetworkPrivateEndpoint] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["StorageDatalakeNetwork"]:
+        if data is None:
+            return None
+        return cls(
+            firewall=NetworkFirewall.from_dict(data.get("firewall")),
+            private_endpoint=StorageDatalakeNetworkPrivateEndpoint.from_dict(data.get("private_endpoint")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class StorageDatalakeStorageTypeLogging:
+    blob: Optional[LogsAndMetrics] = None
+    table: Optional[LogsAndMetrics] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["StorageDatalakeStorageTypeLogging"]:
+        if data is None:
+            return None
+        return cls(
+            blob=LogsAndMetrics.from_dict(data.get("blob")),
+            table=LogsAndMetrics.from_dict(data.get("table")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class StorageDatalakeLifecycleRule:
+    containers: Tuple[str, ...]
+    prefixes: Optional[Tuple[str, ...]] = None
+    archive_after: Optional[int] = None
+    cool_after: Optional[int] = None
+    delete_after: Optional[int] = None
+    after_last_access: Optional[bool] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["StorageDatalakeLifecycleRule"]:
+        if data is None:
+            return None
+        return cls(
+            containers=_tuple(data.get("containers")),
+            prefixes=_tuple(data.get("prefixes")),
+            archive_after=data.get("archive_after"),
+            cool_after=data.get("cool_after"),
+            delete_after=data.get("delete_after"),
+            after_last_access=data.get("after_last_access"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class StorageDatalakeLifecycleManagement:
+    archive_after: Optional[int] = None
+    cool_after: Optional[int] = None
+    delete_after: Optional[int] = None
+    track_last_access: Optional[bool] = None
+    rules: Optional[Mapping[str, StorageDatalakeLifecycleRule]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["StorageDatalakeLifecycleManagement"]:
+        if data is None:
+            return None
+        return cls(
+            archive_after=data.get("archive_after"),
+            cool_after=data.get("cool_after"),
+            delete_after=data.get("delete_after"),
+            track_last_access=data.get("track_last_access"),
+            rules=_mapping(data.get("rules"), StorageDatalakeLifecycleRule.from_dict),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class StorageDatalake:
+    display_name: str
+    containers: Mapping[str, StorageDatalakeContainer]
+    tables: Optional[Mapping[str, StorageDatalakeTable]] = None
+    network: Optional[StorageDatalakeNetwork] = None
+    iam: Optional[Iam] = None
+    logs: Optional[LogsSettings] = None
+    metrics: Optional[Metrics] = None
+    storage_type_logging: Optional[StorageDatalakeStorageTypeLogging] = None
+    lifecycle_management: Optional[StorageDatalakeLifecycleManagement] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["StorageDatalake"]:
+        if data is None:
+            return None
+        return cls(
+            display_name=data.get("display_name"),
+            containers=_mapping(data.get("containers"), StorageDatalakeContainer.from_dict),
+            tables=_mapping(data.get("tables"), StorageDatalakeTable.from_dict),
+            network=StorageDatalakeNetwork.from_dict(data.get("network")),
+            iam=Iam.from_dict(data.get("iam")),
+            logs=LogsSettings.from_dict(data.get("logs")),
+            metrics=Metrics.from_dict(data.get("metrics")),
+            storage_type_logging=StorageDatalakeStorageTypeLogging.from_dict(data.get("storage_type_logging")),
+            lifecycle_management=StorageDatalakeLifecycleManagement.from_dict(data.get("lifecycle_management")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class StorageContainerRegistryNetworkPrivateEndpoint:
+    enabled_in: Optional[Tuple[Literal['dev', 'test', 'prod'], ...]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["StorageContainerRegistryNetworkPrivateEndpoint"]:
+        if data is None:
+            return None
+        return cls(
+            enabled_in=_tuple(data.get("enabled_in")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class StorageContainerRegistryNetwork:
+    firewall: Optional[NetworkFirewall] = None
+    private_endpoint: Optional[StorageContainerRegistryNetworkPrivateEndpoint] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["StorageContainerRegistryNetwork"]:
+        if data is None:
+            return None
+        return cls(
+            firewall=NetworkFirewall.from_dict(data.get("firewall")),
+            private_endpoint=StorageContainerRegistryNetworkPrivateEndpoint.from_dict(data.get("private_endpoint")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class StorageContainerRegistry:
+    display_name: str
+    sku: Literal['basic', 'standard', 'premium']
+    network: Optional[StorageContainerRegistryNetwork] = None
+    iam: Optional[Iam] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["StorageContainerRegistry"]:
+        if data is None:
+            return None
+        return cls(
+            display_name=data.get("display_name"),
+            sku=data.get("sku"),
+            network=StorageContainerRegistryNetwork.from_dict(data.get("network")),
+            iam=Iam.from_dict(data.get("iam")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Storage:
+    accounts: Mapping[str, StorageDatalake]
+    container_registry: Optional[Mapping[str, StorageContainerRegistry]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["Storage"]:
+        if data is None:
+            return None
+        return cls(
+            accounts=_mapping(data.get("accounts"), StorageDatalake.from_dict),
+            container_registry=_mapping(data.get("container_registry"), StorageContainerRegistry.from_dict),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ConfigRegistryNetwork:
+    firewall: Optional[NetworkFirewall] = None
+    private_endpoint: Optional[LogsAndMetrics] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["ConfigRegistryNetwork"]:
+        if data is None:
+            return None
+        return cls(
+            firewall=NetworkFirewall.from_dict(data.get("firewall")),
+            private_endpoint=LogsAndMetrics.from_dict(data.get("private_endpoint")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ConfigRegistry:
+    network: ConfigRegistryNetwork
+    iam: Optional[Iam] = None
+    logs: Optional[LogsSettings] = None
+    metrics: Optional[Metrics] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["ConfigRegistry"]:
+        if data is None:
+            return None
+        return cls(
+            network=ConfigRegistryNetwork.from_dict(data.get("network")),
+            iam=Iam.from_dict(data.get("iam")),
+            logs=LogsSettings.from_dict(data.get("logs")),
+            metrics=Metrics.from_dict(data.get("metrics")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class CredentialsStoreNetwork:
+    firewall: Optional[NetworkFirewall] = None
+    private_endpoint: Optional[LogsAndMetrics] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["CredentialsStoreNetwork"]:
+        if data is None:
+            return None
+        return cls(
+            firewall=NetworkFirewall.from_dict(data.get("firewall")),
+            private_endpoint=LogsAndMetrics.from_dict(data.get("private_endpoint")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class CredentialsStore:
+    network: CredentialsStoreNetwork
+    iam: Optional[Iam] = None
+    logs: Optional[LogsSettings] = None
+    metrics: Optional[Metrics] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["CredentialsStore"]:
+        if data is None:
+            return None
+        return cls(
+            network=CredentialsStoreNetwork.from_dict(data.get("network")),
+            iam=Iam.from_dict(data.get("iam")),
+            logs=LogsSettings.from_dict(data.get("logs")),
+            metrics=Metrics.from_dict(data.get("metrics")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Security:
+    config_registry: Optional[ConfigRegistry] = None
+    credentials_store: Optional[CredentialsStore] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["Security"]:
+        if data is None:
+            return None
+        return cls(
+            config_registry=ConfigRegistry.from_dict(data.get("config_registry")),
+            credentials_store=CredentialsStore.from_dict(data.get("credentials_store")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class KubernetesPoolDetailsLinux:
+    availability_zones: Optional[Tuple[Literal['1', '2', '3'], ...]] = None
+    auto_scaling: Optional[bool] = None
+    count: Optional[int] = None
+    labels: Optional[Mapping[str, str]] = None
+    max_count: Optional[int] = None
+    min_count: Optional[int] = None
+    name: Optional[str] = None
+    vm_size: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["KubernetesPoolDetailsLinux"]:
+        if data is None:
+            return None
+        return cls(
+            availability_zones=_tuple(data.get("availability_zones")),
+            auto_scaling=data.get("auto_scaling"),
+            count=data.get("count"),
+            labels=_mapping(data.get("labels")),
+            max_count=data.get("max_count"),
+            min_count=data.get("min_count"),
+            name=data.get("name"),
+            vm_size=data.get("vm_size"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class KubernetesPoolDetailsWindows:
+    availability_zones: Optional[Tuple[Literal['1', '2', '3'], ...]] = None
+    auto_scaling: Optional[bool] = None
+    count: Optional[int] = None
+    labels: Optional[Mapping[str, str]] = None
+    max_count: Optional[int] = None
+    min_count: Optional[int] = None
+    name: Optional[str] = None
+    vm_size: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["KubernetesPoolDetailsWindows"]:
+        if data is None:
+            return None
+        return cls(
+            availability_zones=_tuple(data.get("availability_zones")),
+            auto_scaling=data.get("auto_scaling"),
+            count=data.get("count"),
+            labels=_mapping(data.get("labels")),
+            max_count=data.get("max_count"),
+            min_count=data.get("min_count"),
+            name=data.get("name"),
+            vm_size=data.get("vm_size"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class SharedKubernetesClusterCluster:
+    iam: Iam
+    linux_agent_pools: Optional[Tuple[KubernetesPoolDetailsLinux, ...]] = None
+    windows_agent_pools: Optional[Tuple[KubernetesPoolDetailsWindows, ...]] = None
+    oms_agent: Optional[bool] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["SharedKubernetesClusterCluster"]:
+        if data is None:
+            return None
+        return cls(
+            iam=Iam.from_dict(data.get("iam")),
+            linux_agent_pools=_tuple(data.get("linux_agent_pools"), KubernetesPoolDetailsLinux.from_dict),
+            windows_agent_pools=_tuple(data.get("windows_agent_pools"), KubernetesPoolDetailsWindows.from_dict),
+            oms_agent=data.get("oms_agent"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class SharedKubernetesClusterResourceGroup:
+    display_name: str
+    iam: Iam
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["SharedKubernetesClusterResourceGroup"]:
+        if data is None:
+            return None
+        return cls(
+            display_name=data.get("display_name"),
+            iam=Iam.from_dict(data.get("iam")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class SharedKubernetesCluster:
+    cluster: SharedKubernetesClusterCluster
+    resource_group: SharedKubernetesClusterResourceGroup
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["SharedKubernetesCluster"]:
+        if data is None:
+            return None
+        return cls(
+            cluster=SharedKubernetesClusterCluster.from_dict(data.get("cluster")),
+            resource_group=SharedKubernetesClusterResourceGroup.from_dict(data.get("resource_group")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DatabricksAutoInstancePools:
+    enabled: bool
+    min_idle_instances: Optional[int] = None
+    idle_instance_auto_termination_minutes: Optional[int] = None
+    max_capacity: Optional[int] = None
+    spot_pools: Optional[bool] = None
+    preload_spark_versions: Optional[bool] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DatabricksAutoInstancePools"]:
+        if data is None:
+            return None
+        return cls(
+            enabled=data.get("enabled"),
+            min_idle_instances=data.get("min_idle_instances"),
+            idle_instance_auto_termination_minutes=data.get("idle_instance_auto_termination_minutes"),
+            max_capacity=data.get("max_capacity"),
+            spot_pools=data.get("spot_pools"),
+            preload_spark_versions=data.get("preload_spark_versions"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DatabricksClusterLibraryPypi:
+    package: str
+    repo: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DatabricksClusterLibraryPypi"]:
+        if data is None:
+            return None
+        return cls(
+            package=data.get("package"),
+            repo=data.get("repo"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DatabricksClusterLibraries:
+    pypi: Optional[Tuple[DatabricksClusterLibraryPypi, ...]] = None
+    whl: Optional[Tuple[str, ...]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DatabricksClusterLibraries"]:
+        if data is None:
+            return None
+        return cls(
+            pypi=_tuple(data.get("pypi"), DatabricksClusterLibraryPypi.from_dict),
+            whl=_tuple(data.get("whl")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DatabricksCluster:
+    autotermination_minutes: Optional[int] = None
+    auto_scale_min_workers: Optional[int] = None
+    auto_scale_max_workers: Optional[int] = None
+    display_name: Optional[str] = None
+    docker_image_url: Optional[str] = None
+    driver_instance_pool_ref_key: Optional[str] = None
+    instance_pool_ref_key: Optional[str] = None
+    is_pinned: Optional[bool] = None
+    libraries: Optional[DatabricksClusterLibraries] = None
+    node_type_id: Optional[str] = None
+    num_workers: Optional[int] = None
+    spark_conf: Optional[Mapping[str, Any]] = None
+    spark_env_vars: Optional[Mapping[str, Any]] = None
+    spark_version: Optional[str] = None
+    single_user_name: Optional[str] = None
+    type: Literal['high_concurrency', 'single_node', 'standard']
+    use_spot_instances: Optional[Mapping[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DatabricksCluster"]:
+        if data is None:
+            return None
+        return cls(
+            autotermination_minutes=data.get("autotermination_minutes"),
+            auto_scale_min_workers=data.get("auto_scale_min_workers"),
+            auto_scale_max_workers=data.get("auto_scale_max_workers"),
+            display_name=data.get("display_name"),
+            docker_image_url=data.get("docker_image_url"),
+            driver_instance_pool_ref_key=data.get("driver_instance_pool_ref_key"),
+            instance_pool_ref_key=data.get("instance_pool_ref_key"),
+            is_pinned=data.get("is_pinned"),
+            libraries=DatabricksClusterLibraries.from_dict(data.get("libraries")),
+            node_type_id=data.get("node_type_id"),
+            num_workers=data.get("num_workers"),
+            spark_conf=_mapping(data.get("spark_conf")),
+            spark_env_vars=_mapping(data.get("spark_env_vars")),
+            spark_version=data.get("spark_version"),
+            single_user_name=data.get("single_user_name"),
+            type=data.get("type"),
+            use_spot_instances=_mapping(data.get("use_spot_instances")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DatabricksWorkspaceConfig:
+    enable_container_services: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DatabricksWorkspaceConfig"]:
+        if data is None:
+            return None
+        return cls(
+            enable_container_services=data.get("enable_container_services"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DatabricksDevopsRepository:
+    name: str
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DatabricksDevopsRepository"]:
+        if data is None:
+            return None
+        return cls(
+            name=data.get("name"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DatabricksInstancePool:
+    display_name: str
+    node_type_id: str
+    min_idle_instances: Optional[int] = None
+    max_capacity: Optional[int] = None
+    idle_instance_auto_termination_minutes: Optional[int] = None
+    enable_elastic_disk: Optional[bool] = None
+    availability: Optional[str] = None
+    spot_bid_max_price: Optional[int] = None
+    disk_type: Optional[str] = None
+    disk_count: Optional[int] = None
+    disk_size: Optional[int] = None
+    custom_tags: Optional[Mapping[str, Any]] = None
+    preloaded_spark_versions: Optional[Tuple[str, ...]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DatabricksInstancePool"]:
+        if data is None:
+            return None
+        return cls(
+            display_name=data.get("display_name"),
+            node_type_id=data.get("node_type_id"),
+            min_idle_instances=data.get("min_idle_instances"),
+            max_capacity=data.get("max_capacity"),
+            idle_instance_auto_termination_minutes=data.get("idle_instance_auto_termination_minutes"),
+            enable_elastic_disk=data.get("enable_elastic_disk"),
+            availability=data.get("availability"),
+            spot_bid_max_price=data.get("spot_bid_max_price"),
+            disk_type=data.get("disk_type"),
+            disk_count=data.get("disk_count"),
+            disk_size=data.get("disk_size"),
+            custom_tags=_mapping(data.get("custom_tags")),
+            preloaded_spark_versions=_tuple(data.get("preloaded_spark_versions")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DatabricksNetworkConfig:
+    firewall: Optional[NetworkFirewall] = None
+    max_nodes: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DatabricksNetworkConfig"]:
+        if data is None:
+            return None
+        return cls(
+            firewall=NetworkFirewall.from_dict(data.get("firewall")),
+            max_nodes=data.get("max_nodes"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DatabricksStorageMount:
+    type: Literal['mount', 'passthrough']
+    account_ref_key: str
+    mount_name: str
+    container_name: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DatabricksStorageMount"]:
+        if data is None:
+            return None
+        return cls(
+            type=data.get("type"),
+            account_ref_key=data.get("account_ref_key"),
+            mount_name=data.get("mount_name"),
+            container_name=data.get("container_name"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DatabricksTableMaintenance:
+    enabled: bool
+    schedule: Optional[str] = None
+    timezone: Optional[str] = None
+    databases: Optional[Tuple[str, ...]] = None
+    optimize_min_files: Optional[int] = None
+    optimize_min_average_file_mb: Optional[int] = None
+    optimize_interval_hours: Optional[int] = None
+    vacuum_interval_hours: Optional[int] = None
+    vacuum_retain_hours: Optional[int] = None
+    analyze: Optional[bool] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DatabricksTableMaintenance"]:
+        if data is None:
+            return None
+        return cls(
+            enabled=data.get("enabled"),
+            schedule=data.get("schedule"),
+            timezone=data.get("timezone"),
+            databases=_tuple(data.get("databases")),
+            optimize_min_files=data.get("optimize_min_files"),
+            optimize_min_average_file_mb=data.get("optimize_min_average_file_mb"),
+            optimize_interval_hours=data.get("optimize_interval_hours"),
+            vacuum_interval_hours=data.get("vacuum_interval_hours"),
+            vacuum_retain_hours=data.get("vacuum_retain_hours"),
+            analyze=data.get("analyze"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DatabricksUser:
+    active: Optional[bool] = None
+    email_address: str
+    roles: Optional[Tuple[Literal['admin', 'cluster_create', 'instance_pool_create', 'sql_access', 'workspace_access'], ...]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DatabricksUser"]:
+        if data is None:
+            return None
+        return cls(
+            active=data.get("active"),
+            email_address=data.get("email_address"),
+            roles=_tuple(data.get("roles")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DatabricksWorkspace:
+    auto_instance_pools: Optional[DatabricksAutoInstancePools] = None
+    clusters: Optional[Mapping[str, DatabricksCluster]] = None
+    config: Optional[DatabricksWorkspaceConfig] = None
+    devops_repositories: Optional[Tuple[DatabricksDevopsRepository, ...]] = None
+    iam: Optional[Iam] = None
+    instance_pools: Optional[Mapping[str, DatabricksInstancePool]] = None
+    logs: Optional[LogsSettings] = None
+    metrics: Optional[Metrics] = None
+    network: Optional[DatabricksNetworkConfig] = None
+    network_security_groups: Optional[LogsAndMetrics] = None
+    storage_mounts: Optional[Tuple[DatabricksStorageMount, ...]] = None
+    table_maintenance: Optional[DatabricksTableMaintenance] = None
+    users: Optional[Tuple[DatabricksUser, ...]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DatabricksWorkspace"]:
+        if data is None:
+            return None
+        return cls(
+            auto_instance_pools=DatabricksAutoInstancePools.from_dict(data.get("auto_instance_pools")),
+            clusters=_mapping(data.get("clusters"), DatabricksCluster.from_dict),
+            config=DatabricksWorkspaceConfig.from_dict(data.get("config")),
+            devops_repositories=_tuple(data.get("devops_repositories"), DatabricksDevopsRepository.from_dict),
+            iam=Iam.from_dict(data.get("iam")),
+            instance_pools=_mapping(data.get("instance_pools"), DatabricksInstancePool.from_dict),
+            logs=LogsSettings.from_dict(data.get("logs")),
+            metrics=Metrics.from_dict(data.get("metrics")),
+            network=DatabricksNetworkConfig.from_dict(data.get("network")),
+            network_security_groups=LogsAndMetrics.from_dict(data.get("network_security_groups")),
+            storage_mounts=_tuple(data.get("storage_mounts"), DatabricksStorageMount.from_dict),
+            table_maintenance=DatabricksTableMaintenance.from_dict(data.get("table_maintenance")),
+            users=_tuple(data.get("users"), DatabricksUser.from_dict),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Databricks:
+    workspaces: Mapping[str, DatabricksWorkspace]
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["Databricks"]:
+        if data is None:
+            return None
+        return cls(
+            workspaces=_mapping(data.get("workspaces"), DatabricksWorkspace.from_dict),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class IntegratedSelfHostedRuntime:
+    enabled: bool
+    image: str
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["IntegratedSelfHostedRuntime"]:
+        if data is None:
+            return None
+        return cls(
+            enabled=data.get("enabled"),
+            image=data.get("image"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class OrchestrationFactoryIngestionBatch:
+    enabled: bool
+    start_time: Optional[str] = None
+    window_minutes: Optional[int] = None
+    delay_minutes: Optional[int] = None
+    timeout: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["OrchestrationFactoryIngestionBatch"]:
+        if data is None:
+            return None
+        return cls(
+            enabled=data.get("enabled"),
+            start_time=data.get("start_time"),
+            window_minutes=data.get("window_minutes"),
+            delay_minutes=data.get("delay_minutes"),
+            timeout=data.get("timeout"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class OrchestrationFactoryIngestionCompute:
+    mode: Literal['cluster', 'job_cluster']
+    instance_pool_ref_key: Optional[str] = None
+    spark_version: Optional[str] = None
+    num_workers: Optional[int] = None
+    auto_scale_min_workers: Optional[int] = None
+    auto_scale_max_workers: Optional[int] = None
+    concurrency: Optional[int] = None
+    libraries: Optional[DatabricksClusterLibraries] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["OrchestrationFactoryIngestionCompute"]:
+        if data is None:
+            return None
+        return cls(
+            mode=data.get("mode"),
+            instance_pool_ref_key=data.get("instance_pool_ref_key"),
+            spark_version=data.get("spark_version"),
+            num_workers=data.get("num_workers"),
+            auto_scale_min_workers=data.get("auto_scale_min_workers"),
+            auto_scale_max_workers=data.get("auto_scale_max_workers"),
+            concurrency=data.get("concurrency"),
+            libraries=DatabricksClusterLibraries.from_dict(data.get("libraries")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class OrchestrationFactoryIngestionPolicy:
+    timeout: Optional[int] = None
+    retry: Optional[int] = None
+    retry_interval: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["OrchestrationFactoryIngestionPolicy"]:
+        if data is None:
+            return None
+        return cls(
+            timeout=data.get("timeout"),
+            retry=data.get("retry"),
+            retry_interval=data.get("retry_interval"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class OrchestrationFactory:
+    display_name: Optional[str] = None
+    iam: Optional[Iam] = None
+    ingestion_batch: Optional[OrchestrationFactoryIngestionBatch] = None
+    ingestion_compute: Optional[OrchestrationFactoryIngestionCompute] = None
+    ingestion_policy: Optional[OrchestrationFactoryIngestionPolicy] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["OrchestrationFactory"]:
+        if data is None:
+            return None
+        return cls(
+            display_name=data.get("display_name"),
+            iam=Iam.from_dict(data.get("iam")),
+            ingestion_batch=OrchestrationFactoryIngestionBatch.from_dict(data.get("ingestion_batch")),
+            ingestion_compute=OrchestrationFactoryIngestionCompute.from_dict(data.get("ingestion_compute")),
+            ingestion_policy=OrchestrationFactoryIngestionPolicy.from_dict(data.get("ingestion_policy")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class GroupReference:
+    object_id: Optional[str] = None
+    user_group_ref_key: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["GroupReference"]:
+        if data is None:
+            return None
+        return cls(
+            object_id=data.get("object_id"),
+            user_group_ref_key=data.get("user_group_ref_key"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class SharedSelfHostedRuntimeFactory:
+    enabled: bool
+    name: Optional[str] = None
+    runtime_names: Optional[Tuple[str, ...]] = None
+    iam: Iam
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["SharedSelfHostedRuntimeFactory"]:
+        if data is None:
+            return None
+        return cls(
+            enabled=data.get("enabled"),
+            name=data.get("name"),
+            runtime_names=_tuple(data.get("runtime_names")),
+            iam=Iam.from_dict(data.get("iam")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DatafactoryIntegrationRuntime:
+    type: Literal['self-hosted', 'self-hosted-azure-vnet-integrated']
+    name: str
+    description: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DatafactoryIntegrationRuntime"]:
+        if data is None:
+            return None
+        return cls(
+            type=data.get("type"),
+            name=data.get("name"),
+            description=data.get("description"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DatafactoryRepository:
+    devops_integrated: Optional[bool] = None
+    collaboration_branch: Optional[str] = None
+    root_folder: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DatafactoryRepository"]:
+        if data is None:
+            return None
+        return cls(
+            devops_integrated=data.get("devops_integrated"),
+            collaboration_branch=data.get("collaboration_branch"),
+            root_folder=data.get("root_folder"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DatafactoryFactory:
+    display_name: str
+    iam: Optional[Iam] = None
+    integration_runtimes: Optional[Tuple[DatafactoryIntegrationRuntime, ...]] = None
+    logs: Optional[LogsSettings] = None
+    metrics: Optional[Metrics] = None
+    repository: Optional[DatafactoryRepository] = None
+    pipeline_failure_action_groups: Optional[Tuple[str, ...]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DatafactoryFactory"]:
+        if data is None:
+            return None
+        return cls(
+            display_name=data.get("display_name"),
+            iam=Iam.from_dict(data.get("iam")),
+            integration_runtimes=_tuple(data.get("integration_runtimes"), DatafactoryIntegrationRuntime.from_dict),
+            logs=LogsSettings.from_dict(data.get("logs")),
+            metrics=Metrics.from_dict(data.get("metrics")),
+            repository=DatafactoryRepository.from_dict(data.get("repository")),
+            pipeline_failure_action_groups=_tuple(data.get("pipeline_failure_action_groups")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Datafactory:
+    integrated_self_hosted_runtime: Optional[IntegratedSelfHostedRuntime] = None
+    orchestration_factory: Optional[OrchestrationFactory] = None
+    orchestration_factories_contributors: Optional[Tuple[GroupReference, ...]] = None
+    shared_self_hosted_runtime_factory: Optional[SharedSelfHostedRuntimeFactory] = None
+    user_factories: Optional[Mapping[str, DatafactoryFactory]] = None
+    user_factories_contributors: Optional[Tuple[GroupReference, ...]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["Datafactory"]:
+        if data is None:
+            return None
+        return cls(
+            integrated_self_hosted_runtime=IntegratedSelfHostedRuntime.from_dict(data.get("integrated_self_hosted_runtime")),
+            orchestration_factory=OrchestrationFactory.from_dict(data.get("orchestration_factory")),
+            orchestration_factories_contributors=_tuple(data.get("orchestration_factories_contributors"), GroupReference.from_dict),
+            shared_self_hosted_runtime_factory=SharedSelfHostedRuntimeFactory.from_dict(data.get("shared_self_hosted_runtime_factory")),
+            user_factories=_mapping(data.get("user_factories"), DatafactoryFactory.from_dict),
+            user_factories_contributors=_tuple(data.get("user_factories_contributors"), GroupReference.from_dict),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DbtDocumentationCustomDomain:
+    domain: str
+    validation: Optional[Literal['cname-delegation', 'dns-txt-token']] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DbtDocumentationCustomDomain"]:
+        if data is None:
+            return None
+        return cls(
+            domain=data.get("domain"),
+            validation=data.get("validation"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DbtDocumentation:
+    enabled: bool
+    custom_domains: Optional[Tuple[DbtDocumentationCustomDomain, ...]] = None
+    location: Optional[str] = None
+    sku_name: Optional[str] = None
+    sku_tier: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["DbtDocumentation"]:
+        if data is None:
+            return None
+        return cls(
+            enabled=data.get("enabled"),
+            custom_domains=_tuple(data.get("custom_domains"), DbtDocumentationCustomDomain.from_dict),
+            location=data.get("location"),
+            sku_name=data.get("sku_name"),
+            sku_tier=data.get("sku_tier"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Dbt:
+    documentation: Optional[DbtDocumentation] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["Dbt"]:
+        if data is None:
+            return None
+        return cls(
+            documentation=DbtDocumentation.from_dict(data.get("documentation")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class JupyterlabDatabricksConnectUser:
+    email_address: str
+    cluster: Optional[DatabricksCluster] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["JupyterlabDatabricksConnectUser"]:
+        if data is None:
+            return None
+        return cls(
+            email_address=data.get("email_address"),
+            cluster=DatabricksCluster.from_dict(data.get("cluster")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class JupyterlabDatabricksConnect:
+    enabled: Optional[bool] = None
+    users: Optional[Tuple[JupyterlabDatabricksConnectUser, ...]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["JupyterlabDatabricksConnect"]:
+        if data is None:
+            return None
+        return cls(
+            enabled=data.get("enabled"),
+            users=_tuple(data.get("users"), JupyterlabDatabricksConnectUser.from_dict),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class JupyterlabHttps:
+    enabled: Optional[bool] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["JupyterlabHttps"]:
+        if data is None:
+            return None
+        return cls(
+            enabled=data.get("enabled"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Jupyterlab:
+    databricks_connect: Optional[JupyterlabDatabricksConnect] = None
+    enabled: Optional[bool] = None
+    require_assignment: Optional[bool] = None
+    version: Optional[str] = None
+    https: Optional[JupyterlabHttps] = None
+    single_user_image_version: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["Jupyterlab"]:
+        if data is None:
+            return None
+        return cls(
+            databricks_connect=JupyterlabDatabricksConnect.from_dict(data.get("databricks_connect")),
+            enabled=data.get("enabled"),
+            require_assignment=data.get("require_assignment"),
+            version=data.get("version"),
+            https=JupyterlabHttps.from_dict(data.get("https")),
+            single_user_image_version=data.get("single_user_image_version"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class QuantumProvider:
+    id: str
+    sku: str
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["QuantumProvider"]:
+        if data is None:
+            return None
+        return cls(
+            id=data.get("id"),
+            sku=data.get("sku"),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Quantum:
+    enabled: bool
+    providers: Tuple[QuantumProvider, ...]
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["Quantum"]:
+        if data is None:
+            return None
+        return cls(
+            enabled=data.get("enabled"),
+            providers=_tuple(data.get("providers"), QuantumProvider.from_dict),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class AnalyticsServices:
+    databricks: Databricks
+    datafactory: Datafactory
+    dbt: Optional[Dbt] = None
+    jupyterlab: Optional[Jupyterlab] = None
+    quantum: Optional[Quantum] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["AnalyticsServices"]:
+        if data is None:
+            return None
+        return cls(
+            databricks=Databricks.from_dict(data.get("databricks")),
+            datafactory=Datafactory.from_dict(data.get("datafactory")),
+            dbt=Dbt.from_dict(data.get("dbt")),
+            jupyterlab=Jupyterlab.from_dict(data.get("jupyterlab")),
+            quantum=Quantum.from_dict(data.get("quantum")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Package:
+    name: str
+    git: Optional[str] = None
+    pypi: Optional[str] = None
+    local: Optional[str] = None
+    config: Optional[Mapping[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["Package"]:
+        if data is None:
+            return None
+        return cls(
+            name=data.get("name"),
+            git=data.get("git"),
+            pypi=data.get("pypi"),
+            local=data.get("local"),
+            config=_mapping(data.get("config")),
+        )
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class PlatformConfigModel:
+    general: Optional[General] = None
+    management: Optional[Management] = None
+    logs: Optional[Logs] = None
+    network: Optional[Network] = None
+    storage: Optional[Storage] = None
+    security: Optional[Security] = None
+    shared_kubernetes_cluster: Optional[SharedKubernetesCluster] = None
+    analytics_services: Optional[AnalyticsServices] = None
+    packages: Optional[Tuple[Package, ...]] = None
+    automation: Optional[Any] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["PlatformConfigModel"]:
+        if data is None:
+            return None
+        return cls(
+            general=General.from_dict(data.get("general")),
+            management=Management.from_dict(data.get("management")),
+            logs=Logs.from_dict(data.get("logs")),
+            network=Network.from_dict(data.get("network")),
+            storage=Storage.from_dict(data.get("storage")),
+            security=Security.from_dict(data.get("security")),
+            shared_kubernetes_cluster=SharedKubernetesCluster.from_dict(data.get("shared_kubernetes_cluster")),
+            analytics_services=AnalyticsServices.from_dict(data.get("analytics_services")),
+            packages=_tuple(data.get("packages"), Package.from_dict),
+            automation=data.get("automation"),
+        )
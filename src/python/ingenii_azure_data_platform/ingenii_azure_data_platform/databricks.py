@@ -1,3 +1,5 @@
+from typing import Dict, Tuple
+
 from pulumi import ResourceOptions
 import pulumi_databricks as databricks
 
@@ -95,6 +97,8 @@ def create_cluster(
         ].id
         if configuration.get("node_type_id") is not None:
             del configuration["node_type_id"]
+        # The availability comes from the pool
+        configuration.pop("azure_attributes", None)
 
     if get_config("driver_instance_pool_ref_key"):
         configuration["driver_instance_pool_id"] = instance_pools[
@@ -114,3 +118,87 @@ def create_cluster(
             provider=databricks_provider, depends_on=depends_on or []
         ),
     )
+
+
+def plan_instance_pools(workspace_config: dict) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+    """
+    Derives instance pools from the node types of the workspace's clusters,
+    when 'auto_instance_pools' is enabled, so that clusters start from warm
+    instances rather than new VMs.
+
+    Clusters of the same node type share a pool, sized for all of them at
+    their maximum, optionally with the Spark versions they use preloaded.
+    Clusters on spot instances get a spot pool for their workers and an
+    on-demand pool for their driver, or keep starting their own VMs if
+    'spot_pools' is off.
+    Clusters with a pool set by hand are left as they are.
+
+    Returns the configuration of the pools, in the shape of
+    'instance_pools', and of all clusters, with the pools set.
+    """
+    clusters = workspace_config.get("clusters", {})
+    pools_config = workspace_config.get("auto_instance_pools", {})
+    if not pools_config.get("enabled"):
+        return {}, dict(clusters)
+
+    pools: Dict[str, dict] = {}
+
+    def pool_for(node_type_id, spot, cluster_config, nodes):
+        ref_key = f"auto-{node_type_id.lower().replace('_', '-')}" + ("-spot" if spot else "")
+        if ref_key not in pools:
+            pools[ref_key] = {
+                "display_name": f"auto-{node_type_id}" + ("-spot" if spot else ""),
+                "node_type_id": node_type_id,
+                "min_idle_instances": pools_config.get("min_idle_instances", 0),
+                "idle_instance_auto_termination_minutes": pools_config.get(
+                    "idle_instance_auto_termination_minutes", 30
+                ),
+                "availability": "SPOT_AZURE" if spot else "ON_DEMAND_AZURE",
+                "spot_bid_max_price": (
+                    cluster_config["use_spot_instances"].get("spot_bid_max_price", -1) if spot else 0
+                ),
+                "max_capacity": 0,
+                "preloaded_spark_versions": [],
+            }
+        pool = pools[ref_key]
+        pool["max_capacity"] += nodes
+        if pools_config.get("preload_spark_versions") and cluster_config.get("spark_version") and \
+                cluster_config["spark_version"] not in pool["preloaded_spark_versions"]:
+            pool["preloaded_spark_versions"].append(cluster_config["spark_version"])
+        return ref_key
+
+    planned_clusters = {}
+    for ref_key, cluster_config in clusters.items():
+        node_type_id = cluster_config.get("node_type_id")
+        if node_type_id is None or cluster_config.get("instance_pool_ref_key") \
+                or cluster_config.get("driver_instance_pool_ref_key"):
+            planned_clusters[ref_key] = cluster_config
+            continue
+
+        if cluster_config["type"] == "single_node":
+            workers = 0
+        else:
+            workers = cluster_config.get("auto_scale_max_workers") or cluster_config.get("num_workers") or 0
+        spot = bool(cluster_config.get("use_spot_instances")) and cluster_config["type"] != "single_node"
+        if spot and not pools_config.get("spot_pools"):
+            planned_clusters[ref_key] = cluster_config
+            continue
+
+        if spot:
+            planned_clusters[ref_key] = dict(
+                cluster_config,
+                instance_pool_ref_key=pool_for(node_type_id, True, cluster_config, workers),
+                driver_instance_pool_ref_key=pool_for(node_type_id, False, cluster_config, 1),
+            )
+        else:
+            planned_clusters[ref_key] = dict(
+                cluster_config,
+                instance_pool_ref_key=pool_for(node_type_id, False, cluster_config, workers + 1),
+            )
+
+    # Caps set in the configuration
+    if pools_config.get("max_capacity"):
+        for pool in pools.values():
+            pool["max_capacity"] = min(pool["max_capacity"], pools_config["max_capacity"])
+
+    return pools, planned_clusters
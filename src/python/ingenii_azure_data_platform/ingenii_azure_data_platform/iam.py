@@ -1,8 +1,12 @@
-from typing import Union
+import json
+from os import getenv, makedirs, path, replace
+from tempfile import NamedTemporaryFile
+from time import time
+from typing import Dict, List, Set, Type, Union
 
 from azure.core.credentials import AccessToken
 from azure.mgmt.authorization import AuthorizationManagementClient
-from pulumi import Output, ResourceOptions
+from pulumi import Output, Resource, ResourceOptions
 from pulumi_azure_native import authorization
 
 
@@ -12,57 +16,151 @@ class AzureAccessToken(AccessToken):
 
 
 class RoleInfo:
+    """
+    Resolves role definition names to IDs and back.
+
+    All role definitions are fetched in one paged request the first time a
+    role is looked up, and indexed by name and by ID, so stacks with many
+    role assignments do not make a request per role. IDs are indexed in the
+    tenant-level form, '/providers/Microsoft.Authorization/roleDefinitions/<guid>',
+    which existing role assignments were created with. The
+    index is cached on disk (see ADP_CONFIG_CACHE_DIR) for
+    ADP_ROLE_DEFINITIONS_CACHE_TTL seconds, 1 day by default, 0 turns the
+    cache off. Unknown roles, e.g. a custom role created after the index was
+    cached, trigger a single refresh before an error is raised.
+
+    For previews without access to Azure, a map of role names to role
+    definition IDs can be passed as 'role_definitions', or as a JSON file
+    through ADP_ROLE_DEFINITIONS_FILE. Azure is then only contacted for roles
+    missing from the map.
+    """
+
+    def __init__(self, role_definitions: Union[Dict[str, str], None] = None):
+        self._client = None
+        self._subscription_id = None
+        self._fetched = False
+        self._refreshed = False
+        self._by_name: Dict[str, str] = {}
+        self._by_id: Dict[str, str] = {}
 
-    _cache = {}
+        offline_file_path = getenv("ADP_ROLE_DEFINITIONS_FILE")
+        if role_definitions is None and offline_file_path:
+            with open(offline_file_path, "r") as f:
+                role_definitions = json.load(f)
 
-    def __init__(self):
+        self._index(role_definitions or {})
+
+    def _connect(self) -> None:
+        if self._client is not None:
+            return
         config = authorization.get_client_config()
         client_token = authorization.get_client_token()
+        self._subscription_id = config.subscription_id
         self._client = AuthorizationManagementClient(
             AzureAccessToken(token=client_token.token, expires_on=-1),
             config.subscription_id,
         )
 
-    def get_role_id_by_name(self, name: str, scope: str = "") -> str:
-        if name in self._cache:
-            return self._cache[name]
-
-        result = self._client.role_definitions.list(
-            scope, filter=f"roleName eq '{name}'"
+    @staticmethod
+    def _tenant_level_id(id: str) -> str:
+        """
+        '/subscriptions/<sub>/providers/Microsoft.Authorization/roleDefinitions/<guid>'
+        as '/providers/Microsoft.Authorization/roleDefinitions/<guid>', the form
+        existing role assignments were created with.
+        """
+        providers_idx = id.lower().find("/providers/microsoft.authorization/roledefinitions/")
+        return id[providers_idx:] if providers_idx > 0 else id
+
+    def _index(self, role_definitions: Dict[str, str]) -> None:
+        for name, id in role_definitions.items():
+            id = self._tenant_level_id(id)
+            self._by_name[name] = id
+            self._by_id[id.lower()] = name
+            # Allow lookups by the role definition GUID alone
+            self._by_id[id.rsplit("/", 1)[-1].lower()] = name
+
+    def _cache_file_path(self) -> Union[str, None]:
+        if self._cache_ttl() <= 0:
+            return None
+        cache_dir = getenv(
+            "ADP_CONFIG_CACHE_DIR",
+            path.join(path.expanduser("~"), ".cache", "ingenii_azure_data_platform"),
         )
-        err_msg = f"role '{name}' not found at scope '{scope}'"
-        try:
-            role = result.next()
-        except StopIteration:
-            raise Exception(err_msg)
-
-        if role is None:
-            raise Exception(err_msg)
-
-        self._cache[name] = role.id
-        self._cache[role.id] = name
-
-        return role.id
+        return path.join(cache_dir, f"role-definitions-{self._subscription_id}.json")
 
-    def get_role_name_by_id(self, id: str, scope: str = "") -> str:
-        if id in self._cache:
-            return self._cache[id]
+    @staticmethod
+    def _cache_ttl() -> int:
+        return int(getenv("ADP_ROLE_DEFINITIONS_CACHE_TTL", 86400))
 
-        result = self._client.role_definitions.list(scope, filter=f"name eq '{id}'")
-
-        err_msg = f"role id '{id}' not found at scope '{scope}'"
+    def _load_cached_definitions(self) -> Union[Dict[str, str], None]:
+        cache_file_path = self._cache_file_path()
+        if cache_file_path is None or not path.isfile(cache_file_path):
+            return None
         try:
-            role = result.next()
-        except StopIteration:
-            raise Exception(err_msg)
-
-        if role is None:
-            raise Exception(err_msg)
-
-        self._cache[role.role_name] = role.id
-        self._cache[role.id] = role.role_name
-
-        return role.role_name
+            with open(cache_file_path, "r") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time() - cached["fetched_at"] > self._cache_ttl():
+            return None
+        return cached["role_definitions"]
+
+    def _save_cached_definitions(self, role_definitions: Dict[str, str]) -> None:
+        cache_file_path = self._cache_file_path()
+        if cache_file_path is None:
+            return
+        try:
+            makedirs(path.dirname(cache_file_path), exist_ok=True)
+            with NamedTemporaryFile(
+                "w", dir=path.dirname(cache_file_path), delete=False
+            ) as f:
+                json.dump(
+                    {"fetched_at": time(), "role_definitions": role_definitions}, f
+                )
+            replace(f.name, cache_file_path)
+        except OSError as e:
+            print(f"Unable to cache the role definitions, continuing without it: {e}")
+
+    def _fetch(self, use_cache: bool = True) -> None:
+        """
+        Indexes all role definitions, listed at the root scope as role
+        assignments have always referenced them, from the disk cache
+        if it is fresh, otherwise with a single paged request.
+        """
+        self._connect()
+        self._fetched = True
+
+        role_definitions = self._load_cached_definitions() if use_cache else None
+        if role_definitions is None:
+            role_definitions = {
+                role.role_name: role.id
+                for role in self._client.role_definitions.list("")
+            }
+            self._save_cached_definitions(role_definitions)
+            self._refreshed = True
+
+        self._index(role_definitions)
+
+    def _lookup(self, index: Dict[str, str], key: str) -> Union[str, None]:
+        if key not in index and not self._fetched:
+            self._fetch()
+        if key not in index and not self._refreshed:
+            # The role may have been created after the index was cached
+            self._refreshed = True
+            self._fetch(use_cache=False)
+        return index.get(key)
+
+    def get_role_id_by_name(self, name: str) -> str:
+        role_id = self._lookup(self._by_name, name)
+        if role_id is None:
+            raise Exception(f"role '{name}' not found")
+        return role_id
+
+    def get_role_name_by_id(self, id: str) -> str:
+        role_name = self._lookup(self._by_id, self._tenant_level_id(id).lower())
+        if role_name is None:
+            raise Exception(f"role id '{id}' not found")
+        return role_name
 
 
 role_info = RoleInfo()
@@ -225,3 +323,118 @@ class UserAssignedIdentityRoleAssignment(RoleAssignment):
             scope_description=scope_description,
             opts=opts,
         )
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# ROLE ASSIGNMENT PLANNER
+# ----------------------------------------------------------------------------------------------------------------------
+
+# Roles that grant everything the listed roles grant. Only direct inclusions
+# are listed, see _included_roles. Control plane roles never include data
+# plane ones, e.g. Owner does not grant Storage Blob Data Reader.
+ROLE_INCLUDES = {
+    "Owner": {"Contributor"},
+    "Contributor": {"Reader"},
+    "Storage Blob Data Owner": {"Storage Blob Data Contributor"},
+    "Storage Blob Data Contributor": {"Storage Blob Data Reader"},
+    "Key Vault Administrator": {"Key Vault Secrets Officer", "Key Vault Reader"},
+    "Key Vault Secrets Officer": {"Key Vault Secrets User"},
+}
+
+
+def _included_roles(role_name: str) -> Set[str]:
+    included, pending = {role_name}, [role_name]
+    while pending:
+        for role in ROLE_INCLUDES.get(pending.pop(), ()):
+            if role not in included:
+                included.add(role)
+                pending.append(role)
+    return included
+
+
+class RoleAssignmentPlanner:
+    """
+    Collects role assignments while the program is evaluated and creates the
+    minimal set once all of them are known, see emit().
+
+    A requested assignment is dropped when it is an exact duplicate, or when
+    the same principal holds the same or an including role (ROLE_INCLUDES) on
+    one of its parents, the resources above its scope, e.g. the storage
+    account and the resource group of a container. Azure role assignments
+    are inherited by everything below their scope, so access is unchanged.
+    """
+
+    def __init__(self) -> None:
+        self._requests: List[dict] = []
+        self.removed_duplicates = 0
+        self.removed_covered = 0
+        self.created = 0
+
+    def request(
+        self,
+        assignment_class: Type[RoleAssignment],
+        scope_resource: Resource,
+        parents: List[Resource] = None,
+        **kwargs,
+    ) -> None:
+        """
+        Requests an assignment of 'assignment_class', e.g. GroupRoleAssignment,
+        on 'scope_resource'. The keyword arguments are passed on to the class,
+        apart from 'scope', which is the ID of 'scope_resource'.
+        """
+        self._requests.append(
+            {
+                "class": assignment_class,
+                "scope": id(scope_resource),
+                "parents": [id(parent) for parent in parents or []],
+                "principal": (assignment_class.__name__, kwargs["principal_name"]),
+                "role": kwargs.get("role_name") or kwargs.get("role_id"),
+                "kwargs": dict(kwargs, scope=scope_resource.id),
+            }
+        )
+
+    def emit(self) -> List[RoleAssignment]:
+        """
+        Creates the planned role assignments. Call it once, after all other
+        resources are declared.
+        """
+        # (principal, scope) -> roles held there
+        held: Dict[tuple, Set[str]] = {}
+        for request in self._requests:
+            held.setdefault((request["principal"], request["scope"]), set()).add(
+                request["role"]
+            )
+
+        seen = set()
+        assignments = []
+        for request in self._requests:
+            key = (request["principal"], request["scope"], request["role"])
+            if key in seen:
+                self.removed_duplicates += 1
+                continue
+            seen.add(key)
+
+            if any(
+                request["role"] in _included_roles(parent_role)
+                for parent in request["parents"]
+                for parent_role in held.get((request["principal"], parent), ())
+            ):
+                self.removed_covered += 1
+                continue
+
+            assignments.append(request["class"](**request["kwargs"]))
+
+        self.created = len(assignments)
+        self._requests = []
+        if self.removed_duplicates or self.removed_covered:
+            print(self.report())
+        return assignments
+
+    def report(self) -> str:
+        return (
+            f"Role assignments: {self.created} created, {self.removed_duplicates} "
+            f"duplicates and {self.removed_covered} covered by a broader scope removed. 🔑"
+        )
+
+
+role_assignment_planner = RoleAssignmentPlanner()
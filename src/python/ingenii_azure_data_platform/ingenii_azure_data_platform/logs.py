@@ -1,7 +1,454 @@
+import json
+from os import getenv, makedirs, path, replace
+from tempfile import NamedTemporaryFile
+from time import time
+from typing import Dict, List, Tuple, Union
+
 from pulumi import Output
 from pulumi.resource import ResourceOptions
 from pulumi_azure import monitoring
-from pulumi_azure_native import insights
+from pulumi_azure_native import authorization, insights, policyinsights
+
+from ingenii_azure_data_platform.iam import ServicePrincipalRoleAssignment
+from ingenii_azure_data_platform.utils import generate_resource_name
+
+# ----------------------------------------------------------------------------------------------------------------------
+# DIAGNOSTIC CATEGORIES
+# ----------------------------------------------------------------------------------------------------------------------
+
+# Categories of common resource types, so that previews and most deployments
+# need no lookups. Keys are lowercase resource types, including the storage
+# sub-services. Types whose categories depend on the SKU or change often, e.g.
+# Databricks workspaces or Data Factories, are deliberately left out and
+# looked up instead.
+DIAGNOSTIC_CATEGORIES_SNAPSHOT = {
+    "microsoft.keyvault/vaults": {
+        "logs": ["AuditEvent", "AzurePolicyEvaluationDetails"],
+        "metrics": ["AllMetrics"],
+    },
+    "microsoft.network/networkinterfaces": {
+        "logs": [],
+        "metrics": ["AllMetrics"],
+    },
+    "microsoft.network/networksecuritygroups": {
+        "logs": ["NetworkSecurityGroupEvent", "NetworkSecurityGroupRuleCounter"],
+        "metrics": [],
+    },
+    "microsoft.network/publicipaddresses": {
+        "logs": [
+            "DDoSMitigationFlowLogs",
+            "DDoSMitigationReports",
+            "DDoSProtectionNotifications",
+        ],
+        "metrics": ["AllMetrics"],
+    },
+    "microsoft.storage/storageaccounts": {
+        "logs": [],
+        "metrics": ["Transaction"],
+    },
+    **{
+        f"microsoft.storage/storageaccounts/{service}services": {
+            "logs": ["StorageDelete", "StorageRead", "StorageWrite"],
+            "metrics": ["Transaction"],
+        }
+        for service in ("blob", "file", "queue", "table")
+    },
+}
+
+
+def get_resource_type(resource_id: str) -> str:
+    """
+    Returns the lowercase resource type of a resource ID, including any child
+    types, e.g. 'microsoft.storage/storageaccounts/blobservices' for
+    '/subscriptions/.../providers/Microsoft.Storage/storageAccounts/sa/blobServices/default'
+    """
+    segments = resource_id.strip("/").split("/")
+    lower_segments = [segment.lower() for segment in segments]
+    if "providers" not in lower_segments:
+        return resource_id.lower()
+
+    # The last 'providers' segment, as extension resources nest them
+    provider_idx = len(lower_segments) - 1 - lower_segments[::-1].index("providers")
+    namespace, *types_and_names = lower_segments[provider_idx + 1 :]
+    return "/".join([namespace] + types_and_names[::2])
+
+
+class DiagnosticCategories:
+    """
+    Resolves the diagnostic log and metric categories of a resource.
+
+    Categories only depend on the resource type, so each type is looked up at
+    most once per run. Lookups are taken, in order, from memory, from the
+    cache on disk (see ADP_CONFIG_CACHE_DIR) and from
+    DIAGNOSTIC_CATEGORIES_SNAPSHOT, before asking Azure. Cached entries
+    expire after ADP_DIAGNOSTIC_CATEGORIES_CACHE_TTL seconds, 30 days by
+    default, 0 turns the cache on disk off.
+    """
+
+    def __init__(self, snapshot: Union[Dict[str, Dict[str, List[str]]], None] = None):
+        self._snapshot = DIAGNOSTIC_CATEGORIES_SNAPSHOT if snapshot is None else snapshot
+        self._categories: Union[Dict[str, dict], None] = None
+
+    @staticmethod
+    def _cache_ttl() -> int:
+        return int(getenv("ADP_DIAGNOSTIC_CATEGORIES_CACHE_TTL", 30 * 86400))
+
+    def _cache_file_path(self) -> Union[str, None]:
+        if self._cache_ttl() <= 0:
+            return None
+        cache_dir = getenv(
+            "ADP_CONFIG_CACHE_DIR",
+            path.join(path.expanduser("~"), ".cache", "ingenii_azure_data_platform"),
+        )
+        return path.join(cache_dir, "diagnostic-categories.json")
+
+    def _load(self) -> Dict[str, dict]:
+        if self._categories is not None:
+            return self._categories
+
+        self._categories = {}
+        cache_file_path = self._cache_file_path()
+        if cache_file_path is None or not path.isfile(cache_file_path):
+            return self._categories
+
+        try:
+            with open(cache_file_path, "r") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return self._categories
+
+        self._categories = {
+            resource_type: entry
+            for resource_type, entry in cached.items()
+            if time() - entry["fetched_at"] <= self._cache_ttl()
+        }
+        return self._categories
+
+    def _save(self) -> None:
+        cache_file_path = self._cache_file_path()
+        if cache_file_path is None:
+            return
+        try:
+            makedirs(path.dirname(cache_file_path), exist_ok=True)
+            with NamedTemporaryFile(
+                "w", dir=path.dirname(cache_file_path), delete=False
+            ) as f:
+                json.dump(self._categories, f)
+            replace(f.name, cache_file_path)
+        except OSError as e:
+            print(f"Unable to cache the diagnostic categories, continuing without it: {e}")
+
+    def get(self, resource_id: str) -> Tuple[List[str], List[str]]:
+        """
+        Returns the log and metric categories of the resource, as a tuple.
+        """
+        resource_type = get_resource_type(resource_id)
+        categories = self._load()
+
+        if resource_type in categories:
+            entry = categories[resource_type]
+        elif resource_type in self._snapshot:
+            entry = self._snapshot[resource_type]
+        else:
+            result = monitoring.get_diagnostic_categories(resource_id=resource_id)
+            entry = categories[resource_type] = {
+                "logs": list(result.logs),
+                "metrics": list(result.metrics),
+                "fetched_at": time(),
+            }
+            self._save()
+
+        return entry["logs"], entry["metrics"]
+
+
+diagnostic_categories = DiagnosticCategories()
+
+# ----------------------------------------------------------------------------------------------------------------------
+# DIAGNOSTIC SETTINGS POLICY
+# ----------------------------------------------------------------------------------------------------------------------
+
+# Monitoring Contributor and Log Analytics Contributor, the roles the policy
+# needs to deploy diagnostic settings. Role definition IDs are the same in
+# every tenant.
+DIAGNOSTIC_POLICY_ROLE_DEFINITION_IDS = [
+    "/providers/Microsoft.Authorization/roleDefinitions/749f88d5-cbae-40b8-bcfc-e573ddc772fa",
+    "/providers/Microsoft.Authorization/roleDefinitions/92aaf0da-9dab-42b6-94a3-d43ce8d16293",
+]
+
+# The name of the settings deployed per resource when all categories are on,
+# so that switching modes finds the same settings.
+DIAGNOSTIC_SETTING_NAME = "All Logs, All Metrics"
+
+# Switching to 'mode: policy': the DiagnosticSetting resources the policy
+# takes over are retained on delete, so they stay in Azure, already compliant
+# with the policy, rather than leaving resources without diagnostics until
+# the remediation runs. The option only applies from the update that
+# declares it, so run one update with 'logs.prepare_policy_mode' set before
+# switching. In 'resource' mode without it, settings are deleted as before.
+# The flip side is that in policy mode, disabling the logs of a resource type
+# later leaves its settings in place, to be removed by hand.
+
+
+def _category_objects(categories: List[str]) -> List[dict]:
+    return [
+        {
+            "category": category,
+            "enabled": True,
+            "retentionPolicy": {"days": 0, "enabled": False},
+        }
+        for category in sorted(categories)
+    ]
+
+
+class DiagnosticSettingsPolicy:
+    """
+    Deploys diagnostic settings through Azure Policy instead of one
+    DiagnosticSetting resource per Azure resource.
+
+    With 'logs.mode: policy', one DeployIfNotExists policy definition covers
+    every resource type enabled in 'logs.resource_types' whose categories
+    are in DIAGNOSTIC_CATEGORIES_SNAPSHOT. The definition is assigned to each
+    platform resource group, and a remediation brings existing resources in
+    line. log_diagnostic_settings then skips resources of those types in
+    those resource groups.
+
+    Resources with their own 'logs' or 'metrics' settings keep a
+    DiagnosticSetting resource, and are excluded from the assignments. So are
+    other resource types, e.g. the storage sub-services, and resources
+    outside of the platform resource groups.
+
+    What is covered is worked out from the configuration, so covers() gives
+    the same answer whenever it is called, before or after assign(). The
+    exclusions are final once assign() is called, so exclude() raises after.
+    """
+
+    def __init__(self) -> None:
+        self._resource_group_names: Union[List[str], None] = None
+        self._excluded_resource_ids: List[Union[str, Output]] = []
+        self._assigned = False
+
+    @staticmethod
+    def is_enabled(platform_config) -> bool:
+        return platform_config["logs"].get("mode", "resource") == "policy"
+
+    @staticmethod
+    def retains_settings(platform_config) -> bool:
+        """Whether the settings the policy takes over are retained on delete, see DIAGNOSTIC_SETTING_NAME."""
+        return DiagnosticSettingsPolicy.is_enabled(platform_config) or platform_config["logs"].get(
+            "prepare_policy_mode", False
+        )
+
+    @staticmethod
+    def resource_types(platform_config) -> List[str]:
+        return sorted(
+            resource_type
+            for resource_type, enabled in platform_config["logs"]["resource_types"].items()
+            if enabled
+            and DiagnosticSettingsPolicy.eligible(resource_type)
+        )
+
+    def exclude(self, resource_id: Union[str, Output]) -> None:
+        if self._assigned:
+            raise Exception(
+                "Resources can't be excluded from the diagnostic settings policy after it is assigned. "
+                "Declare the resources with their own diagnostic settings before the policy."
+            )
+        self._excluded_resource_ids.append(resource_id)
+
+    @staticmethod
+    def eligible(resource_type: str) -> bool:
+        """Whether the policy can deploy the settings of the resource type."""
+        return resource_type.count("/") == 1 and resource_type.lower() in DIAGNOSTIC_CATEGORIES_SNAPSHOT
+
+    @staticmethod
+    def resource_group_names(platform_config) -> List[str]:
+        """The lowercase names of the platform resource groups, the assignments' scopes."""
+        return [
+            generate_resource_name(
+                resource_type="resource_group",
+                resource_name=config["display_name"],
+                platform_config=platform_config,
+            ).lower()
+            for config in platform_config.from_yml["management"]["resource_groups"].values()
+        ]
+
+    def covers(self, platform_config, resource_id: str) -> bool:
+        if not self.is_enabled(platform_config):
+            return False
+        if self._resource_group_names is None:
+            self._resource_group_names = self.resource_group_names(platform_config)
+
+        segments = resource_id.lower().split("/")
+        resource_group_name = (
+            segments[segments.index("resourcegroups") + 1]
+            if "resourcegroups" in segments
+            else None
+        )
+        return (
+            resource_group_name in self._resource_group_names
+            and get_resource_type(resource_id)
+            in [resource_type.lower() for resource_type in self.resource_types(platform_config)]
+        )
+
+    def _policy_rule(self, resource_types: List[str]) -> dict:
+        template = {
+            "$schema": "https://schema.management.azure.com/schemas/2019-04-01/deploymentTemplate.json#",
+            "contentVersion": "1.0.0.0",
+            "parameters": {
+                "resourceId": {"type": "string"},
+                "resourceType": {"type": "string"},
+                "workspaceId": {"type": "string"},
+                "categories": {"type": "object"},
+            },
+            "resources": [
+                {
+                    "type": "Microsoft.Insights/diagnosticSettings",
+                    "apiVersion": "2021-05-01-preview",
+                    "name": DIAGNOSTIC_SETTING_NAME,
+                    "scope": "[parameters('resourceId')]",
+                    "properties": {
+                        "workspaceId": "[parameters('workspaceId')]",
+                        "logAnalyticsDestinationType": "Dedicated",
+                        "logs": "[parameters('categories')[toLower(parameters('resourceType'))].logs]",
+                        "metrics": "[parameters('categories')[toLower(parameters('resourceType'))].metrics]",
+                    },
+                }
+            ],
+        }
+        return {
+            "if": {"field": "type", "in": resource_types},
+            "then": {
+                "effect": "deployIfNotExists",
+                "details": {
+                    "type": "Microsoft.Insights/diagnosticSettings",
+                    "name": DIAGNOSTIC_SETTING_NAME,
+                    "existenceCondition": {
+                        "field": "Microsoft.Insights/diagnosticSettings/workspaceId",
+                        "equals": "[parameters('workspaceId')]",
+                    },
+                    "roleDefinitionIds": DIAGNOSTIC_POLICY_ROLE_DEFINITION_IDS,
+                    "deployment": {
+                        "properties": {
+                            "mode": "incremental",
+                            "template": template,
+                            "parameters": {
+                                "resourceId": {"value": "[field('id')]"},
+                                "resourceType": {"value": "[field('type')]"},
+                                "workspaceId": {"value": "[parameters('workspaceId')]"},
+                                "categories": {"value": "[parameters('categories')]"},
+                            },
+                        }
+                    },
+                },
+            },
+        }
+
+    def assign(self, platform_config, log_analytics_workspace_id, resource_groups) -> None:
+        """
+        Creates the policy definition and assigns it to every resource group
+        in 'resource_groups', a dictionary of reference key to ResourceGroup.
+        Call it after all other resources are declared, so that the resources
+        with their own settings are excluded.
+        """
+        self._assigned = True
+
+        resource_types = self.resource_types(platform_config)
+        if not resource_types:
+            return
+
+        categories = {
+            resource_type.lower(): {
+                "logs": _category_objects(
+                    DIAGNOSTIC_CATEGORIES_SNAPSHOT[resource_type.lower()]["logs"]
+                ),
+                "metrics": _category_objects(
+                    DIAGNOSTIC_CATEGORIES_SNAPSHOT[resource_type.lower()]["metrics"]
+                ),
+            }
+            for resource_type in resource_types
+        }
+
+        definition_name = generate_resource_name(
+            resource_type="policy_definition",
+            resource_name="diagnostic-settings",
+            platform_config=platform_config,
+        )
+        definition = authorization.PolicyDefinition(
+            resource_name=definition_name,
+            policy_definition_name=definition_name,
+            display_name=f"Diagnostic settings to {definition_name}",
+            description="Sends the logs and metrics of the platform resources to Log Analytics.",
+            mode="Indexed",
+            policy_type=authorization.PolicyType.CUSTOM,
+            parameters={
+                "workspaceId": authorization.ParameterDefinitionsValueArgs(type="String"),
+                "categories": authorization.ParameterDefinitionsValueArgs(type="Object"),
+            },
+            policy_rule=self._policy_rule(resource_types),
+        )
+
+        not_scopes = Output.all(*self._excluded_resource_ids)
+
+        for ref_key, resource_group in resource_groups.items():
+            if resource_group.generated_name.lower() not in self.resource_group_names(platform_config):
+                raise Exception(
+                    f"Resource group {resource_group.generated_name} is not in 'management.resource_groups', "
+                    "so its resources' diagnostic settings would be deployed twice."
+                )
+
+            assignment_name = generate_resource_name(
+                resource_type="policy_assignment",
+                resource_name=f"diagnostic-settings-{ref_key}",
+                platform_config=platform_config,
+            )
+            assignment = authorization.PolicyAssignment(
+                resource_name=assignment_name,
+                policy_assignment_name=assignment_name,
+                display_name=f"Diagnostic settings of the {ref_key} resource group",
+                policy_definition_id=definition.id,
+                scope=resource_group.id,
+                location=platform_config.region.long_name,
+                identity=authorization.IdentityArgs(
+                    type=authorization.ResourceIdentityType.SYSTEM_ASSIGNED
+                ),
+                not_scopes=not_scopes,
+                parameters={
+                    "workspaceId": authorization.ParameterValuesValueArgs(
+                        value=log_analytics_workspace_id
+                    ),
+                    "categories": authorization.ParameterValuesValueArgs(value=categories),
+                },
+            )
+
+            role_assignments = [
+                ServicePrincipalRoleAssignment(
+                    principal_name=assignment_name,
+                    principal_id=assignment.identity.apply(
+                        lambda identity: identity.principal_id
+                    ),
+                    role_name=role_name,
+                    scope=resource_group.id,
+                    scope_description=f"resource-group-{ref_key}",
+                )
+                for role_name in ("Monitoring Contributor", "Log Analytics Contributor")
+            ]
+
+            # Deploys the settings of the resources that already exist
+            policyinsights.Remediation(
+                resource_name=assignment_name,
+                remediation_name=assignment_name,
+                scope=resource_group.id,
+                policy_assignment_id=assignment.id,
+                resource_discovery_mode=policyinsights.ResourceDiscoveryMode.RE_EVALUATE_COMPLIANCE,
+                opts=ResourceOptions(depends_on=role_assignments),
+            )
+
+
+diagnostic_settings_policy = DiagnosticSettingsPolicy()
+
+# ----------------------------------------------------------------------------------------------------------------------
+# DIAGNOSTIC SETTINGS
+# ----------------------------------------------------------------------------------------------------------------------
 
 
 def _log_diagnostic_settings(
@@ -10,7 +457,14 @@ def _log_diagnostic_settings(
     resource_name,
     log_config_obj,
     metrics_config_obj,
+    platform_config=None,
+    retain_for_policy=False,
 ):
+    # Deployed by the diagnostic settings policy instead
+    if platform_config is not None and diagnostic_settings_policy.covers(
+        platform_config, resource_id
+    ):
+        return
 
     # Instead of None, empty dictionary
     log_config_obj = log_config_obj or {}
@@ -21,20 +475,20 @@ def _log_diagnostic_settings(
         log_config_obj.get("categories") is None
         or metrics_config_obj.get("categories") is None
     ):
-        all_categories = monitoring.get_diagnostic_categories(resource_id=resource_id)
-    else:
-        all_categories = None
+        all_log_categories, all_metric_categories = diagnostic_categories.get(
+            resource_id
+        )
 
     # Set the categories if specified, all if not
     # Also set the setting name
     setting_name_log, setting_name_metric = "All", "All"
     if log_config_obj.get("categories") is None:
-        log_categories = all_categories.logs
+        log_categories = all_log_categories
     else:
         log_categories = log_config_obj.get("categories")
         setting_name_log = "Configured"
     if metrics_config_obj.get("categories") is None:
-        metric_categories = all_categories.metrics
+        metric_categories = all_metric_categories
     else:
         metric_categories = metrics_config_obj.get("categories")
         setting_name_metric = "Configured"
@@ -71,15 +525,22 @@ def _log_diagnostic_settings(
     else:
         metric_objects = []
 
+    setting_name = f"{setting_name_log} Logs, {setting_name_metric} Metrics"
     insights.DiagnosticSetting(
         f"{resource_name}-diagnostic-setting",
-        name=f"{setting_name_log} Logs, {setting_name_metric} Metrics",
+        name=setting_name,
         workspace_id=log_analytics_workspace_id,
         log_analytics_destination_type="Dedicated",
         resource_uri=resource_id,
         logs=log_objects,
         metrics=metric_objects,
-        opts=ResourceOptions(ignore_changes=["log_analytics_destination_type"]),
+        opts=ResourceOptions(
+            ignore_changes=["log_analytics_destination_type"],
+            # Left in place for the policy, see DIAGNOSTIC_SETTING_NAME
+            retain_on_delete=retain_for_policy
+            and setting_name == DIAGNOSTIC_SETTING_NAME
+            and DiagnosticSettingsPolicy.eligible(get_resource_type(resource_id)),
+        ),
     )
 
 
@@ -109,16 +570,27 @@ def log_diagnostic_settings(
     if not logs_config.get("enabled", True) and not metrics_config.get("enabled", True):
         return
 
+    # In policy mode, resources with their own settings keep them and are
+    # excluded from the policy. The others are left to the policy if it
+    # covers their type and resource group.
+    policy_config = None
+    if DiagnosticSettingsPolicy.is_enabled(platform_config):
+        if logs_config or metrics_config:
+            diagnostic_settings_policy.exclude(resource_id)
+        else:
+            policy_config = platform_config
+    retain_for_policy = DiagnosticSettingsPolicy.retains_settings(platform_config)
+
     if isinstance(resource_id, Output):
         resource_id.apply(lambda r_id: 
             _log_diagnostic_settings(
                 log_analytics_workspace_id, r_id, resource_name,
-                logs_config, metrics_config)
+                logs_config, metrics_config, policy_config, retain_for_policy)
         )
     else:
         _log_diagnostic_settings(
             log_analytics_workspace_id, resource_id, resource_name,
-            logs_config, metrics_config)
+            logs_config, metrics_config, policy_config, retain_for_policy)
 
 
 def log_network_interfaces(
@@ -7,7 +7,7 @@ from pulumi_azure_native.authorization import (
 from pulumi_azuread import Group
 
 from ingenii_azure_data_platform.config import PlatformConfiguration
-from ingenii_azure_data_platform.utils import generate_resource_name
+from ingenii_azure_data_platform.utils import generate_resource_name, lock_registry
 
 
 class ResourceGroup(BaseResourceGroup):
@@ -26,6 +26,9 @@ class ResourceGroup(BaseResourceGroup):
             resource_name=resource_group_name,
             platform_config=platform_config,
         )
+        # The generated name, known before the resource group exists
+        self.generated_name = name
+
         super().__init__(
             resource_name=name,
             resource_group_name=name,
@@ -41,7 +44,10 @@ class ResourceGroup(BaseResourceGroup):
             ),
         )
 
-        if enable_delete_protection:
+        if enable_delete_protection or (
+            platform_config.resource_protection
+            and lock_registry.strategy == "resource_group"
+        ):
             ManagementLockAtResourceGroupLevel(
                 resource_name=name,
                 lock_name="Managed by Ingenii",
@@ -49,6 +55,7 @@ class ResourceGroup(BaseResourceGroup):
                 resource_group_name=name,
                 opts=ResourceOptions(depends_on=[self]),
             )
+            lock_registry.register(self.id, LockLevel.CAN_NOT_DELETE)
 
 
 class UserGroup(Group):
@@ -0,0 +1,226 @@
+import re
+from typing import Callable, Dict, Iterable, List, Tuple
+from weakref import WeakKeyDictionary
+
+from .config import PlatformConfiguration
+
+
+class ResourceNamingException(Exception):
+    ...
+
+
+# Short codes of the resource types named '<prefix>-<stack>-<region>-<code>-<name>'
+RESOURCE_TYPE_CODES = {
+    "action_group": "ag",
+    "container_registry": "cr",
+    "databricks_cluster": "dbwc",
+    "databricks_directory": "dbd",
+    "databricks_instance_pool": "dbwip",
+    "databricks_job": "dbj",
+    "databricks_notebook": "dbn",
+    "databricks_workspace": "dbw",
+    "devops_pipeline": "adopipe",
+    "devops_project": "adoproj",
+    "devops_repo": "adorepo",
+    "devops_variable_group": "adovg",
+    "dns_zone": "dz",
+    "kubernetes_agent_pool": "kap",
+    "kubernetes_cluster": "kc",
+    "kubernetes_job": "kj",
+    "kubernetes_persistent_volume": "kpv",
+    "log_analytics_workspace": "law",
+    "metric_alert": "ma",
+    "nat_gateway": "ngw",
+    "network_security_group": "nsg",
+    "private_dns_zone": "prdz",
+    "private_endpoint": "pe",
+    "policy_assignment": "pa",
+    "policy_definition": "pd",
+    "public_ip": "pip",
+    "public_ip_prefix": "ippre",
+    "quantum_workspace": "qw",
+    "random_password": "rp",
+    "random_string": "rs",
+    "resource_group": "rg",
+    "route_table": "rt",
+    "service_principal": "sp",
+    "static_site": "sts",
+    "static_site_custom_domain": "stscd",
+    "storage_blob": "sb",
+    "storage_blob_container": "sbc",
+    "storage_file_share": "sfs",
+    "storage_management_policy": "smp",
+    "subnet": "snet",
+    "user_assigned_managed_identity": "uami",
+    "virtual_machine_scale_set": "vmss",
+    "virtual_network": "vnet",
+}
+
+# Azure's naming rules, as (minimum length, maximum length, allowed
+# characters), for the resource types whose limits are easy to exceed.
+NAMING_RULES = {
+    "databricks_workspace": (3, 64, r"[\w.-]+"),
+    "datafactory": (3, 63, r"[a-zA-Z0-9-]+"),
+    "key_vault": (3, 24, r"[a-zA-Z0-9-]+"),
+    "log_analytics_workspace": (4, 63, r"[a-zA-Z0-9-]+"),
+    "private_endpoint": (2, 64, r"[\w.-]+"),
+    "resource_group": (1, 90, r"[\w().-]+"),
+    "storage_account": (3, 24, r"[a-z0-9]+"),
+    "virtual_network": (2, 64, r"[\w.-]+"),
+}
+
+
+class NamingEngine:
+    """
+    Generates resource names based on consistent naming conventions.
+
+    The templates of every resource type are rendered once, with the prefix,
+    stack, region and unique ID of the platform configuration, so naming a
+    resource is a dictionary lookup and a format. Every generated name is
+    validated against NAMING_RULES and indexed, and two different resources
+    of the same type that end up with the same name are rejected, so a bad
+    name fails when it is generated rather than during the deployment. Use
+    resolve() to generate the names known from the configuration up front.
+    """
+
+    def __init__(self, platform_config: PlatformConfiguration) -> None:
+        prefix = platform_config.prefix
+        stack = platform_config.stack_short_name
+        region_short_name = platform_config.region.short_name
+        unique_id = platform_config.unique_id
+
+        keep = str
+        lower = str.lower
+
+        # resource type -> (template, transformation of the resource name)
+        self._templates: Dict[str, Tuple[str, Callable[[str], str]]] = {
+            code_type: (f"{prefix}-{stack}-{region_short_name}-{code}-{{}}", lower)
+            for code_type, code in RESOURCE_TYPE_CODES.items()
+        }
+        self._templates.update(
+            {
+                # Example: ADP-Dev-Engineers
+                "user_group": (f"{prefix.upper()}-{stack.title()}-{{}}", str.title),
+                "gateway_subnet": ("Gateway", keep),
+                # Example: adp-tst-eus-kv-cred-ixk1
+                "key_vault": (f"{prefix}-{stack}-{region_short_name}-kv-{{}}-{unique_id}", keep),
+                "datafactory": (
+                    f"{prefix}-{stack}-{region_short_name}-adf-{{}}"
+                    if platform_config.use_legacy_naming
+                    else f"{prefix}-{stack}-{region_short_name}-adf-{{}}-{unique_id}",
+                    lower if platform_config.use_legacy_naming else keep,
+                ),
+                "adf_integration_runtime": (f"{prefix}-{stack}-{{}}-{unique_id}", keep),
+                "storage_account": (f"{prefix}{stack}{{}}{unique_id}", keep),
+                "log_analytics_workspace": (
+                    f"{prefix}-{stack}-{region_short_name}-law-{{}}-{unique_id}", lower
+                ),
+            }
+        )
+
+        self._rules = {
+            resource_type: (min_length, max_length, re.compile(pattern))
+            for resource_type, (min_length, max_length, pattern) in NAMING_RULES.items()
+        }
+
+        # (resource type, resource name) -> generated name
+        self._names: Dict[Tuple[str, str], str] = {}
+        # (resource type, generated name) -> resource name
+        self._index: Dict[Tuple[str, str], str] = {}
+
+    def name(self, resource_type: str, resource_name: str) -> str:
+        """
+        Returns the name of the resource, see generate_resource_name().
+        """
+        key = (resource_type, resource_name)
+        if key in self._names:
+            return self._names[key]
+
+        resource_type = resource_type.lower()
+        if resource_type not in self._templates:
+            raise ResourceNamingException(f"Resource type {resource_type} not recognised.")
+        template, transform = self._templates[resource_type]
+        name = template.format(transform(resource_name))
+
+        problem = self._validate(resource_type, resource_name, name)
+        if problem:
+            raise ResourceNamingException(problem)
+
+        self._index[(resource_type, name)] = resource_name
+        self._names[key] = name
+        return name
+
+    def resolve(self, names: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+        """
+        Generates the names of all (resource type, resource name) pairs, and
+        raises one exception listing every invalid or duplicate name.
+        """
+        resolved, problems = {}, []
+        for resource_type, resource_name in names:
+            try:
+                resolved[(resource_type, resource_name)] = self.name(resource_type, resource_name)
+            except ResourceNamingException as e:
+                problems.append(str(e))
+        if problems:
+            raise ResourceNamingException("\n".join(problems))
+        return resolved
+
+    def _validate(self, resource_type: str, resource_name: str, name: str) -> str:
+        if resource_type in self._rules:
+            min_length, max_length, pattern = self._rules[resource_type]
+            if not min_length <= len(name) <= max_length:
+                return (
+                    f"The {resource_type} name '{name}' is {len(name)} characters long, "
+                    f"Azure allows {min_length} to {max_length}."
+                )
+            if not pattern.fullmatch(name):
+                return f"The {resource_type} name '{name}' has characters Azure does not allow."
+
+        # Types with a fixed name, e.g. 'gateway_subnet', can not clash
+        if "{}" not in self._templates[resource_type][0]:
+            return ""
+        other = self._index.get((resource_type, name))
+        if other is not None and other != resource_name:
+            return (
+                f"The {resource_type} names for '{other}' and '{resource_name}' "
+                f"are both '{name}'."
+            )
+        return ""
+
+
+def configured_resource_names(platform_config: PlatformConfiguration) -> List[Tuple[str, str]]:
+    """
+    The (resource type, resource name) pairs of the resources named directly
+    after the configuration: user groups, resource groups, storage accounts
+    and data factories.
+    """
+    management_config = platform_config.from_yml.get("management", {})
+    datafactory_config = platform_config.from_yml.get("analytics_services", {}).get("datafactory", {})
+    return (
+        [
+            ("user_group", config["display_name"])
+            for config in management_config.get("user_groups", {}).values()
+        ]
+        + [
+            ("resource_group", config["display_name"])
+            for config in management_config.get("resource_groups", {}).values()
+        ]
+        + [
+            ("storage_account", config["display_name"])
+            for config in platform_config.from_yml.get("storage", {}).get("accounts", {}).values()
+        ]
+        + [
+            ("datafactory", config.get("display_name", ref_key))
+            for ref_key, config in datafactory_config.get("user_factories", {}).items()
+        ]
+    )
+
+
+_engines: "WeakKeyDictionary[PlatformConfiguration, NamingEngine]" = WeakKeyDictionary()
+
+
+def naming_engine(platform_config: PlatformConfiguration) -> NamingEngine:
+    """The naming engine of the platform configuration, built on first use."""
+    if platform_config not in _engines:
+        _engines[platform_config] = NamingEngine(platform_config)
+    return _engines[platform_config]
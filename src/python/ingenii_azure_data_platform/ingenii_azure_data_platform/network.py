@@ -1,4 +1,8 @@
-from typing import Dict, List, Union
+from ipaddress import IPv4Network, ip_network
+from math import ceil, log2
+from typing import Dict, List, Tuple, Union
+
+from pulumi import Resource, ResourceOptions
 
 class PlatformFirewall:
     def __init__(
@@ -78,3 +82,294 @@ class PlatformFirewall:
         if self._trust_azure_services:
             return "AzureServices"
         return None
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# SUBNET PLANNING
+# ----------------------------------------------------------------------------------------------------------------------
+
+# Azure reserves the first four and the last address of every subnet.
+AZURE_RESERVED_ADDRESSES = 5
+
+
+class SubnetPlanningException(Exception):
+    ...
+
+
+def subnet_cidr(address_space: str, new_prefix: int, network_number: int) -> str:
+    """
+    Returns the CIDR of the n-th subnet of size 'new_prefix' in the address
+    space, computed directly instead of enumerating the preceding subnets.
+    """
+    network = ip_network(address_space)
+    if new_prefix < network.prefixlen or new_prefix > network.max_prefixlen:
+        raise SubnetPlanningException(
+            f"A /{new_prefix} subnet does not fit in the address space {address_space}."
+        )
+
+    subnet_count = 2 ** (new_prefix - network.prefixlen)
+    if not 0 <= network_number < subnet_count:
+        raise SubnetPlanningException(
+            f"Subnet number {network_number} is out of range, {address_space} "
+            f"has {subnet_count} /{new_prefix} subnets."
+        )
+
+    block_size = 2 ** (network.max_prefixlen - new_prefix)
+    first_address = network.network_address + network_number * block_size
+    return f"{first_address}/{new_prefix}"
+
+
+def prefix_for_hosts(hosts: int) -> int:
+    """
+    Returns the longest prefix whose subnet fits the number of hosts, on top
+    of the addresses Azure reserves.
+    """
+    return 32 - max(ceil(log2(hosts + AZURE_RESERVED_ADDRESSES)), 3)
+
+
+class SubnetPlanner:
+    """
+    Allocates the subnets of a virtual network.
+
+    Subnets are either placed at a fixed position ('reserve', e.g. the
+    historical layout of a platform) or sized from the number of hosts they
+    need and placed in the first free, aligned block ('allocate'). All
+    calculations work on address ranges, so the cost only depends on the
+    number of subnets, not on the size of the address space. Overlapping
+    subnets and needs that do not fit raise a SubnetPlanningException.
+    """
+
+    def __init__(self, address_space: str):
+        self._network = ip_network(address_space)
+        self._start = int(self._network.network_address)
+        self._end = int(self._network.broadcast_address)
+        # name -> (first address, last address, hosts needed)
+        self._subnets: Dict[str, Tuple[int, int, Union[int, None]]] = {}
+
+    def _check_free(self, name: str, first: int, last: int):
+        if first < self._start or last > self._end:
+            raise SubnetPlanningException(
+                f"Subnet '{name}' is outside of the address space {self._network}."
+            )
+        for other_name, (other_first, other_last, _) in self._subnets.items():
+            if first <= other_last and other_first <= last:
+                raise SubnetPlanningException(
+                    f"Subnet '{name}' overlaps with subnet '{other_name}' "
+                    f"({self.cidr(other_name)})."
+                )
+
+    def reserve(self, name: str, cidr: str, hosts: Union[int, None] = None) -> str:
+        subnet = ip_network(cidr)
+        first, last = int(subnet.network_address), int(subnet.broadcast_address)
+        self._check_free(name, first, last)
+        if hosts is not None and hosts > subnet.num_addresses - AZURE_RESERVED_ADDRESSES:
+            raise SubnetPlanningException(
+                f"Subnet '{name}' ({cidr}) is too small for {hosts} hosts."
+            )
+        self._subnets[name] = (first, last, hosts)
+        return self.cidr(name)
+
+    def allocate(self, name: str, hosts: int) -> str:
+        prefix = prefix_for_hosts(hosts)
+        block_size = 2 ** (32 - prefix)
+
+        # Walk the gaps between the allocated subnets, in address order
+        taken = sorted((first, last) for first, last, _ in self._subnets.values())
+        candidate = self._start
+        for first, last in taken + [(self._end + 1, self._end + 1)]:
+            aligned = ceil(candidate / block_size) * block_size
+            if aligned + block_size - 1 < first:
+                self._subnets[name] = (aligned, aligned + block_size - 1, hosts)
+                return self.cidr(name)
+            candidate = max(candidate, last + 1)
+
+        raise SubnetPlanningException(
+            f"There is no free /{prefix} block for subnet '{name}' ({hosts} hosts) "
+            f"in the address space {self._network}. Headroom: {self.headroom()}"
+        )
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._subnets
+
+    def cidr(self, name: str) -> str:
+        first, last, _ = self._subnets[name]
+        return str(IPv4Network((first, 32 - int(log2(last - first + 1)))))
+
+    def headroom(self) -> dict:
+        """
+        Returns the free addresses of the address space, the largest subnet
+        that can still be added, and the spare hosts of every subnet.
+        """
+        taken = sorted((first, last) for first, last, _ in self._subnets.values())
+        free_addresses, largest_free_prefix = 0, None
+        candidate = self._start
+        for first, last in taken + [(self._end + 1, self._end + 1)]:
+            if first > candidate:
+                free_addresses += first - candidate
+                # Largest aligned block in the gap
+                for prefix in range(self._network.prefixlen, 33):
+                    block_size = 2 ** (32 - prefix)
+                    aligned = ceil(candidate / block_size) * block_size
+                    if aligned + block_size - 1 < first:
+                        if largest_free_prefix is None or prefix < largest_free_prefix:
+                            largest_free_prefix = prefix
+                        break
+            candidate = max(candidate, last + 1)
+
+        return {
+            "free_addresses": free_addresses,
+            "largest_free_subnet": None if largest_free_prefix is None else f"/{largest_free_prefix}",
+            "subnets": {
+                name: {
+                    "address_prefix": self.cidr(name),
+                    "usable_hosts": last - first + 1 - AZURE_RESERVED_ADDRESSES,
+                    "spare_hosts": None
+                    if hosts is None
+                    else last - first + 1 - AZURE_RESERVED_ADDRESSES - hosts,
+                }
+                for name, (first, last, hosts) in self._subnets.items()
+            },
+        }
+
+
+def plan_subnets(
+    address_space: str,
+    default_layout: Dict[str, Tuple[int, int]],
+    capacity: Dict[str, dict] = None,
+) -> SubnetPlanner:
+    """
+    Plans all subnets of a virtual network in one pass.
+
+    Parameters
+    ----------
+    address_space: str
+        The address space of the virtual network.
+    default_layout: Dict[str, Tuple[int, int]]
+        The default position of every subnet, as (prefix, subnet number).
+    capacity: Dict[str, dict]
+        Overrides per subnet, either 'address_prefix' to pin the subnet or
+        'hosts' to size it for that many hosts.
+
+    Subnets without overrides keep their default position, so that existing
+    networks do not change. Pinned subnets come next, and sized subnets are
+    placed last, largest first, in the remaining space.
+    """
+    capacity = capacity or {}
+    unknown = [name for name in capacity if name not in default_layout]
+    if unknown:
+        raise SubnetPlanningException(
+            f"Unknown subnets {unknown}, the subnets are {list(default_layout)}."
+        )
+
+    planner = SubnetPlanner(address_space)
+
+    for name, (prefix, network_number) in default_layout.items():
+        if name not in capacity:
+            planner.reserve(name, subnet_cidr(address_space, prefix, network_number))
+
+    for name, needs in capacity.items():
+        if needs.get("address_prefix"):
+            planner.reserve(name, needs["address_prefix"], needs.get("hosts"))
+
+    sized = [
+        (name, needs["hosts"])
+        for name, needs in capacity.items()
+        if not needs.get("address_prefix") and needs.get("hosts")
+    ]
+    for name, hosts in sorted(sized, key=lambda item: -item[1]):
+        planner.allocate(name, hosts)
+
+    missing = [name for name in default_layout if name not in planner]
+    if missing:
+        raise SubnetPlanningException(
+            f"Subnets {missing} need either an 'address_prefix' or 'hosts'."
+        )
+
+    return planner
+
+
+def subnet_resource_options(
+    previous_subnet: Union[Resource, None], sequential: bool = True
+) -> ResourceOptions:
+    """
+    Azure serialises the updates of the subnets of a virtual network and can
+    reject concurrent ones with 'AnotherOperationInProgress'. In sequential
+    mode every subnet waits for the previous one. In parallel mode the
+    subnets, and the NSG and route table associations they carry, are
+    created concurrently and conflicts are left to a retry of the deployment.
+    """
+    if sequential and previous_subnet is not None:
+        return ResourceOptions(depends_on=[previous_subnet])
+    return ResourceOptions()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# NAT GATEWAY CAPACITY
+# ----------------------------------------------------------------------------------------------------------------------
+
+# SNAT ports a NAT gateway offers per public IP address
+SNAT_PORTS_PER_PUBLIC_IP = 64512
+
+# Public IP addresses a NAT gateway can use, counting those of its prefixes
+MAX_NAT_GATEWAY_PUBLIC_IPS = 16
+
+# Concurrent outbound connections assumed per node when none are configured,
+# e.g. a Databricks node installing libraries from PyPI and Maven.
+DEFAULT_SNAT_PORTS_PER_NODE = 1024
+
+
+class NatGatewayCapacityException(Exception):
+    ...
+
+
+def nat_gateway_public_ip_count(public_ip_count: int = 1, public_ip_prefix_length: int = None) -> int:
+    """
+    Returns the number of public IP addresses of a NAT gateway with
+    'public_ip_count' addresses and, optionally, a prefix of that length.
+    With a prefix, 'public_ip_count' can be 0, e.g. for a /28 prefix, which
+    uses all 16 addresses by itself.
+    """
+    total = public_ip_count
+    if public_ip_prefix_length is not None:
+        total += 2 ** (32 - public_ip_prefix_length)
+    if total == 0:
+        raise NatGatewayCapacityException(
+            "A NAT gateway needs at least one public IP address, set 'public_ip_count' or 'public_ip_prefix_length'."
+        )
+    if total > MAX_NAT_GATEWAY_PUBLIC_IPS:
+        raise NatGatewayCapacityException(
+            f"A NAT gateway can use at most {MAX_NAT_GATEWAY_PUBLIC_IPS} public IP addresses, "
+            f"{total} are configured."
+        )
+    return total
+
+
+def estimate_snat_capacity(
+    nodes: Dict[str, int],
+    public_ip_count: int,
+    ports_per_node: int = DEFAULT_SNAT_PORTS_PER_NODE,
+) -> dict:
+    """
+    Estimates the SNAT port demand of the nodes sending traffic through a NAT
+    gateway, against the ports its public IP addresses offer.
+
+    Parameters
+    ----------
+    nodes: Dict[str, int]
+        The maximum number of nodes per source, e.g. a Databricks workspace.
+    public_ip_count: int
+        The public IP addresses of the NAT gateway, see
+        nat_gateway_public_ip_count().
+    ports_per_node: int
+        The concurrent outbound connections expected from every node.
+    """
+    demand = sum(nodes.values()) * ports_per_node
+    capacity = public_ip_count * SNAT_PORTS_PER_PUBLIC_IP
+    return {
+        "nodes": dict(nodes),
+        "ports_per_node": ports_per_node,
+        "demand": demand,
+        "capacity": capacity,
+        "utilisation": round(demand / capacity, 2),
+        "required_public_ips": max(ceil(demand / SNAT_PORTS_PER_PUBLIC_IP), 1),
+    }
@@ -4,7 +4,7 @@ from pulumi import Resource, ResourceOptions
 from pulumi_azure_native import network
 
 from .config import PlatformConfiguration
-from .logs import log_network_interfaces
+from .logs import log_diagnostic_settings
 from .utils import generate_resource_name, lock_resource
 
 
@@ -64,12 +64,15 @@ def create_private_endpoint(
     if platform_config.resource_protection:
         lock_resource(private_endpoint_name, private_endpoint.id, provider=provider)
 
-    # To Log Analytics Workspace
-    log_network_interfaces(
+    # To Log Analytics Workspace. Azure creates exactly one network interface
+    # per private endpoint, so its settings are declared up front rather than
+    # after listing the interfaces.
+    log_diagnostic_settings(
         platform_config,
         log_analytics_workspace_id,
-        private_endpoint_name,
-        private_endpoint.network_interfaces,
+        "Microsoft.Network/networkInterfaces",
+        private_endpoint.network_interfaces.apply(lambda nics: nics[0].id),
+        f"{private_endpoint_name}-network_interface-0",
         logs_config=logs_metrics_config.get("logs", {}),
         metrics_config=logs_metrics_config.get("metrics", {}),
     )
@@ -99,6 +102,7 @@ def create_private_endpoint(
                 private_endpoint_dns_zone_group_name,
                 private_endpoint_dns_zone_group.id,
                 provider=provider,
+                parents=[private_endpoint],
             )
     else:
         private_endpoint_dns_zone_group = None
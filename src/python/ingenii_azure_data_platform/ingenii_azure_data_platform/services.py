@@ -0,0 +1,60 @@
+from importlib import import_module
+from os import getenv
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+from pulumi import log
+
+
+class ServiceRegistry:
+    """
+    Loads the sub-components of a Pulumi program.
+
+    Each sub-component is registered with the module that defines it and
+    whether the platform configuration enables it. Only enabled modules are
+    imported, so disabled services, and the provider SDKs that only they use,
+    are never loaded. Please note, the registration order is not an execution
+    order, Pulumi builds the dependency graph after all modules are loaded.
+
+    Import times are recorded per sub-component. They include the first import
+    of any module the sub-component depends on. Set
+    ADP_REPORT_SERVICE_IMPORT_TIMES=1 to print them.
+    """
+
+    def __init__(self) -> None:
+        self._services: List[Tuple[str, bool]] = []
+        self._import_times: Dict[str, float] = {}
+
+    def register(self, module_name: str, enabled: bool = True) -> None:
+        self._services.append((module_name, bool(enabled)))
+
+    def load(self) -> None:
+        for module_name, enabled in self._services:
+            if not enabled:
+                log.debug(f"Service '{module_name}' is disabled, not loading it.")
+                continue
+
+            start_time = perf_counter()
+            import_module(module_name)
+            self._import_times[module_name] = perf_counter() - start_time
+
+        if bool(int(getenv("ADP_REPORT_SERVICE_IMPORT_TIMES", 0))):
+            print(self.report())
+
+    @property
+    def import_times(self) -> Dict[str, float]:
+        return dict(self._import_times)
+
+    def report(self) -> str:
+        width = max([len(name) for name, _ in self._services] + [len("Service")])
+        lines = [f"{'Service':<{width}}  Import time"]
+        for module_name, enabled in self._services:
+            if module_name in self._import_times:
+                timing = f"{self._import_times[module_name] * 1000:>8.0f}ms"
+            else:
+                timing = "disabled" if not enabled else "not loaded"
+            lines.append(f"{module_name:<{width}}  {timing}")
+        lines.append(
+            f"{'Total':<{width}}  {sum(self._import_times.values()) * 1000:>8.0f}ms"
+        )
+        return "\n".join(lines)
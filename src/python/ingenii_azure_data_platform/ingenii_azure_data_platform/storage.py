@@ -1,4 +1,286 @@
+import json
+from hashlib import sha256
+from typing import Dict, Iterator, List
+
+from pulumi import Input, Output, ResourceOptions
+from pulumi.dynamic import (
+    CreateResult,
+    DiffResult,
+    ReadResult,
+    Resource,
+    ResourceProvider,
+    UpdateResult,
+)
+
+
 def get_container_registry_resource_id(
     subscription_id: str, resource_group_name: str, registry_name: str
 ):
     return f"/subscriptions/{subscription_id}/resourceGroups/{resource_group_name}/providers/Microsoft.ContainerRegistry/registries/{registry_name}"
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# LIFECYCLE MANAGEMENT
+# ----------------------------------------------------------------------------------------------------------------------
+
+# Azure allows at most this many prefixes in the filter of a rule
+MAX_RULE_PREFIXES = 10
+
+
+class LifecycleRuleException(Exception):
+    ...
+
+
+def lifecycle_details(config: dict) -> Dict[str, int]:
+    """The actions of a lifecycle configuration, as action -> days."""
+    details = {}
+    if config.get("archive_after") is not None:
+        details["tier_to_archive"] = config["archive_after"]
+    if config.get("cool_after") is not None:
+        details["tier_to_cool"] = config["cool_after"]
+    if config.get("delete_after") is not None:
+        details["delete"] = config["delete_after"]
+    return details
+
+
+def lifecycle_rules(datalake_config: dict) -> List[dict]:
+    """
+    The lifecycle rules of a storage account, as dictionaries of the rule
+    'name', its 'details' (see lifecycle_details), the 'prefixes' it filters
+    on, none for all blobs, and whether it counts from the blobs' last access
+    ('after_last_access').
+
+    Every entry of 'lifecycle_management.rules' applies to its containers, or
+    the prefixes within them. The account wide settings apply to the
+    containers without a rule. A rule without actions keeps its containers
+    hot. Azure applies the cheapest action of all rules matching a blob, so
+    rules can't overlap. Rules with more than MAX_RULE_PREFIXES prefixes are
+    split.
+    """
+    lm_config = datalake_config.get("lifecycle_management", {})
+    containers = datalake_config.get("containers", {})
+    rules = []
+
+    # The prefixes of the rules by container, '' for a whole container
+    rule_prefixes = {}
+    for rule_name, rule_config in lm_config.get("rules", {}).items():
+        for container_ref_key in rule_config["containers"]:
+            if container_ref_key not in containers:
+                raise LifecycleRuleException(
+                    f"Lifecycle rule '{rule_name}' refers to the unknown container '{container_ref_key}'."
+                )
+            for prefix in rule_config.get("prefixes", [""]):
+                for other_rule_name, other_prefix in rule_prefixes.get(container_ref_key, []):
+                    if other_rule_name != rule_name and (
+                        prefix.startswith(other_prefix) or other_prefix.startswith(prefix)
+                    ):
+                        raise LifecycleRuleException(
+                            f"Lifecycle rules '{other_rule_name}' and '{rule_name}' overlap in container "
+                            f"'{container_ref_key}', Azure would apply the cheapest action of both."
+                        )
+                rule_prefixes.setdefault(container_ref_key, []).append((rule_name, prefix))
+        if rule_config.get("after_last_access") and not lm_config.get("track_last_access"):
+            raise LifecycleRuleException(
+                f"Lifecycle rule '{rule_name}' needs 'track_last_access' to count from the last access."
+            )
+
+        details = lifecycle_details(rule_config)
+        if not details:
+            if rule_config.get("prefixes"):
+                raise LifecycleRuleException(
+                    f"Lifecycle rule '{rule_name}' has prefixes but no actions, only whole containers can be kept hot."
+                )
+            continue
+        prefixes = [
+            f"{containers[container_ref_key]['display_name']}/{prefix}"
+            for container_ref_key in rule_config["containers"]
+            for prefix in rule_config.get("prefixes", [""])
+        ]
+        for idx in range(0, len(prefixes), MAX_RULE_PREFIXES):
+            rules.append({
+                "name": rule_name if idx == 0 else f"{rule_name} {idx // MAX_RULE_PREFIXES + 1}",
+                "details": details,
+                "prefixes": prefixes[idx:idx + MAX_RULE_PREFIXES],
+                "after_last_access": rule_config.get("after_last_access", False),
+            })
+
+    # Azure filters can't exclude prefixes, so the account wide settings leave
+    # out every container with a rule, rather than override its rules
+    covered_containers = set(rule_prefixes)
+
+    details = lifecycle_details(lm_config)
+    if details:
+        if not covered_containers:
+            rules.append({"name": "All Blob Management", "details": details, "prefixes": [], "after_last_access": False})
+        else:
+            prefixes = [
+                f"{container_config['display_name']}/"
+                for container_ref_key, container_config in containers.items()
+                if container_ref_key not in covered_containers
+            ]
+            for idx in range(0, len(prefixes), MAX_RULE_PREFIXES):
+                rules.append({
+                    "name": f"Other Blob Management {idx // MAX_RULE_PREFIXES + 1}",
+                    "details": details,
+                    "prefixes": prefixes[idx:idx + MAX_RULE_PREFIXES],
+                    "after_last_access": False,
+                })
+
+    return rules
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# TABLE ENTITIES
+# ----------------------------------------------------------------------------------------------------------------------
+
+# Azure Tables accepts at most 100 operations per transaction, all on the same partition.
+MAX_TRANSACTION_OPERATIONS = 100
+
+
+def _entity_key(entity: dict) -> str:
+    # '/' is not allowed in partition and row keys
+    return f"{entity['PartitionKey']}/{entity['RowKey']}"
+
+
+def _string_properties(entity: dict) -> dict:
+    # Classic TableEntity resources store every property as a string, so the
+    # types don't change when a table switches between the two.
+    return {
+        key: str(value).lower() if isinstance(value, bool) else str(value)
+        for key, value in entity.items()
+    }
+
+
+def _entity_hash(entity: dict) -> str:
+    return sha256(json.dumps(entity, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _transactions(operations: List[tuple]) -> Iterator[List[tuple]]:
+    """Splits the operations into transactions Azure accepts."""
+    by_partition: Dict[str, List[tuple]] = {}
+    for operation in operations:
+        by_partition.setdefault(operation[1]["PartitionKey"], []).append(operation)
+    for partition_operations in by_partition.values():
+        for start in range(0, len(partition_operations), MAX_TRANSACTION_OPERATIONS):
+            yield partition_operations[start : start + MAX_TRANSACTION_OPERATIONS]
+
+
+class TableEntitySetProvider(ResourceProvider):
+    """
+    Keeps a set of entities in an Azure Table in line with the configuration.
+
+    The state records a content hash per entity. Only new and changed
+    entities are upserted and only removed ones are deleted, in transactions
+    of up to 100 operations per partition. Entities the set does not manage,
+    e.g. rows written by the pipelines, are left alone. 'pulumi refresh'
+    re-reads the hashes of the managed entities, so that entities changed or
+    removed outside Pulumi are restored by the next update.
+    """
+
+    def _client(self, props: dict):
+        from azure.core.credentials import AzureNamedKeyCredential
+        from azure.data.tables import TableClient
+
+        return TableClient(
+            endpoint=f"https://{props['account_name']}.table.{props['endpoint_suffix']}",
+            table_name=props["table_name"],
+            credential=AzureNamedKeyCredential(props["account_name"], props["account_key"]),
+        )
+
+    def _sync(self, props: dict, deployed_hashes: Dict[str, str]) -> dict:
+        from azure.data.tables import UpdateMode
+
+        entities = {_entity_key(entity): entity for entity in props["entities"]}
+        entity_hashes = {key: _entity_hash(entity) for key, entity in entities.items()}
+
+        operations = [
+            ("upsert", entities[key], {"mode": UpdateMode.REPLACE})
+            for key, entity_hash in entity_hashes.items()
+            if deployed_hashes.get(key) != entity_hash
+        ]
+        for key in deployed_hashes:
+            if key not in entity_hashes:
+                partition_key, row_key = key.split("/", 1)
+                operations.append(("delete", {"PartitionKey": partition_key, "RowKey": row_key}))
+
+        if operations:
+            with self._client(props) as client:
+                for transaction in _transactions(operations):
+                    client.submit_transaction(transaction)
+
+        return dict(props, entity_hashes=entity_hashes)
+
+    def create(self, props: dict) -> CreateResult:
+        return CreateResult(
+            id_=f"{props['account_name']}/{props['table_name']}",
+            outs=self._sync(props, {}),
+        )
+
+    def diff(self, _id: str, olds: dict, news: dict) -> DiffResult:
+        replaces = [key for key in ("account_name", "table_name") if olds.get(key) != news.get(key)]
+        entity_hashes = {_entity_key(entity): _entity_hash(entity) for entity in news["entities"]}
+        changes = bool(replaces) or entity_hashes != olds.get("entity_hashes")
+        return DiffResult(changes=changes, replaces=replaces, delete_before_replace=False)
+
+    def update(self, _id: str, olds: dict, news: dict) -> UpdateResult:
+        return UpdateResult(outs=self._sync(news, olds.get("entity_hashes") or {}))
+
+    def read(self, id_: str, props: dict) -> ReadResult:
+        from azure.core.exceptions import ResourceNotFoundError
+
+        managed = set(props.get("entity_hashes") or {})
+        entity_hashes = {}
+        try:
+            with self._client(props) as client:
+                for entity in client.list_entities():
+                    entity = dict(entity)
+                    key = _entity_key(entity)
+                    if key in managed:
+                        entity_hashes[key] = _entity_hash(entity)
+        except ResourceNotFoundError:
+            pass
+        return ReadResult(id_=id_, outs=dict(props, entity_hashes=entity_hashes))
+
+    def delete(self, _id: str, props: dict) -> None:
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            self._sync(dict(props, entities=[]), props.get("entity_hashes") or {})
+        except ResourceNotFoundError:
+            # The table is gone, and its entities with it
+            pass
+
+
+class TableEntitySet(Resource):
+    """
+    The entities of an Azure Table as a single resource, see
+    TableEntitySetProvider. 'entities' are dictionaries with the
+    'PartitionKey', the 'RowKey' and the properties of every entity. The
+    properties are written as strings, as classic TableEntity resources do.
+    """
+
+    entity_hashes: Output[dict]
+
+    def __init__(
+        self,
+        resource_name: str,
+        account_name: Input[str],
+        account_key: Input[str],
+        table_name: Input[str],
+        entities: List[dict],
+        endpoint_suffix: str = "core.windows.net",
+        opts: ResourceOptions = None,
+    ) -> None:
+        super().__init__(
+            TableEntitySetProvider(),
+            resource_name,
+            {
+                "account_name": account_name,
+                "account_key": Output.secret(account_key),
+                "table_name": table_name,
+                "entities": [_string_properties(entity) for entity in entities],
+                "endpoint_suffix": endpoint_suffix,
+                "entity_hashes": None,
+            },
+            opts,
+        )
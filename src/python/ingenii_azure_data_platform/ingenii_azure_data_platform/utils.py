@@ -1,12 +1,13 @@
 import os
-from ipaddress import ip_network
 from hashlib import md5
-from typing import Any
+from typing import Any, Dict, List, Tuple
 
-from pulumi import Output, ResourceOptions
+from pulumi import Output, Resource, ResourceOptions
 from pulumi_azure_native.authorization import ManagementLockByScope, LockLevel
 
 from ingenii_azure_data_platform.config import PlatformConfiguration
+from ingenii_azure_data_platform.naming import naming_engine
+from ingenii_azure_data_platform.network import subnet_cidr
 
 
 def generate_resource_name(
@@ -32,98 +33,14 @@ def generate_resource_name(
     -------
     str
         The generated resource name.
-    """
-    resource_names = {
-        "action_group": "ag",
-        "container_registry": "cr",
-        "databricks_cluster": "dbwc",
-        "databricks_directory": "dbd",
-        "databricks_instance_pool": "dbwip",
-        "databricks_job": "dbj",
-        "databricks_notebook": "dbn",
-        "databricks_workspace": "dbw",
-        "devops_pipeline": "adopipe",
-        "devops_project": "adoproj",
-        "devops_repo": "adorepo",
-        "devops_variable_group": "adovg",
-        "dns_zone": "dz",
-        "kubernetes_agent_pool": "kap",
-        "kubernetes_cluster": "kc",
-        "kubernetes_job": "kj",
-        "kubernetes_persistent_volume": "kpv",
-        "log_analytics_workspace": "law",
-        "metric_alert": "ma",
-        "nat_gateway": "ngw",
-        "network_security_group": "nsg",
-        "private_dns_zone": "prdz",
-        "private_endpoint": "pe",
-        "public_ip": "pip",
-        "quantum_workspace": "qw",
-        "random_password": "rp",
-        "random_string": "rs",
-        "resource_group": "rg",
-        "route_table": "rt",
-        "service_principal": "sp",
-        "static_site": "sts",
-        "static_site_custom_domain": "stscd",
-        "storage_blob": "sb",
-        "storage_blob_container": "sbc",
-        "storage_file_share": "sfs",
-        "storage_management_policy": "smp",
-        "subnet": "snet",
-        "user_assigned_managed_identity": "uami",
-        "virtual_machine_scale_set": "vmss",
-        "virtual_network": "vnet",
-    }
-
-    resource_type = resource_type.lower()
-    prefix = platform_config.prefix
-    stack = platform_config.stack_short_name
-    region_short_name = platform_config.region.short_name
-    unique_id = platform_config.unique_id
-    use_legacy_naming = platform_config.use_legacy_naming
-
-    # User Groups (Azure AD Groups)
-    if resource_type == "user_group":
-        # Example
-        # ADP-Dev-Engineers
-        return f"{prefix.upper()}-{stack.title()}-{resource_name.title()}"
-
-    # Gateway Subnet
-    elif resource_type == "gateway_subnet":
-        return "Gateway"
-
-    # Key Vault
-    elif resource_type == "key_vault":
-        # Example:
-        # adp-tst-eus-kv-cred-ixk1
-        return f"{prefix}-{stack}-{region_short_name}-kv-{resource_name}-{unique_id}"
-
-    # Data Factory
-    elif resource_type == "datafactory":
-        if use_legacy_naming:
-            return f"{prefix}-{stack}-{region_short_name}-adf-{resource_name.lower()}"
-
-        return f"{prefix}-{stack}-{region_short_name}-adf-{resource_name}-{unique_id}"
-
-    # Data Factory: Self Hosted Integration Runtime
-    elif resource_type == "adf_integration_runtime":
-        return f"{prefix}-{stack}-{resource_name}-{unique_id}"
-
-    # Storage Account
-    elif resource_type == "storage_account":
-        return f"{prefix}{stack}{resource_name}{unique_id}"
-
-    # Log Analytics Workspace
-    elif resource_type == "log_analytics_workspace":
-        return f"{prefix}-{stack}-{region_short_name}-law-{resource_name.lower()}-{unique_id}"
-
-    # Other Resources
-    elif resource_type in resource_names:
-        return f"{prefix}-{stack}-{region_short_name}-{resource_names[resource_type]}-{resource_name.lower()}"
 
-    else:
-        raise Exception(f"Resource type {resource_type} not recognised.")
+    Raises
+    ------
+    ResourceNamingException
+        If the resource type is not recognised, the name breaks Azure's naming
+        rules or another resource of the type already has it, see NamingEngine.
+    """
+    return naming_engine(platform_config).name(resource_type, resource_name)
 
 
 def generate_hash(*args: str) -> str:
@@ -147,12 +64,10 @@ def generate_hash(*args: str) -> str:
 
 def generate_cidr(cidr_subnet: str, new_prefix: int, network_number: int) -> Any:
     """
-    Calculates a new subnet number based on the inputs provided.
-    # TODO
+    Returns the CIDR of the n-th subnet of size 'new_prefix' in 'cidr_subnet'.
+    See SubnetPlanner to size subnets from their capacity instead.
     """
-    return list(ip_network(cidr_subnet).subnets(new_prefix=new_prefix))[
-        network_number
-    ].exploded
+    return subnet_cidr(cidr_subnet, new_prefix, network_number)
 
 
 def get_os_root_path() -> str:
@@ -176,12 +91,64 @@ def ensure_type(value, types):
         raise TypeError(f"Value {value} is {type(value),}, but should be {types}!")
 
 
+class LockRegistry:
+    """
+    Keeps track of the scopes that carry a management lock.
+
+    Azure applies a lock to everything below its scope, so a resource whose
+    parent resource or resource group is already locked at the same or a
+    stricter level is protected without a lock of its own. The strategy,
+    'general.lock_strategy' in the platform configuration, decides whether
+    such locks are still created:
+
+    resource: every protected resource gets its own lock (default)
+    covering: resources covered by a locked parent are not locked again
+    resource_group: as 'covering', and every platform resource group is locked
+    """
+
+    STRATEGIES = ("resource", "covering", "resource_group")
+
+    # Higher is stricter
+    _STRICTNESS = {LockLevel.CAN_NOT_DELETE: 1, LockLevel.READ_ONLY: 2}
+
+    def __init__(self) -> None:
+        self.strategy = "resource"
+        # id() of the resource ID output -> (output, lock level)
+        self._locked: Dict[int, Tuple[Output, LockLevel]] = {}
+
+    def register(self, resource_id: Output, lock_level: LockLevel) -> None:
+        self._locked[id(resource_id)] = (resource_id, lock_level)
+
+    def is_covered(self, parents: List[Resource], lock_level: LockLevel) -> bool:
+        if self.strategy == "resource":
+            return False
+        for parent in parents:
+            _, parent_level = self._locked.get(id(parent.id), (None, None))
+            if parent_level is not None and (
+                self._STRICTNESS[parent_level] >= self._STRICTNESS[lock_level]
+            ):
+                return True
+        return False
+
+
+lock_registry = LockRegistry()
+
+
 def lock_resource(
     resource_name: str,
     resource_id: Output,
     lock_level: LockLevel = LockLevel.CAN_NOT_DELETE,
     provider = None,
+    parents: List[Resource] = None,
 ):
+    """
+    Locks a resource. 'parents' are the resources whose lock would cover this
+    one, e.g. the storage account of a container and the resource group, see
+    LockRegistry.
+    """
+    if lock_registry.is_covered(parents or [], lock_level):
+        return
+
     ManagementLockByScope(
         resource_name=resource_name,
         level=lock_level,
@@ -192,3 +159,4 @@ def lock_resource(
             provider=provider,
         )
     )
+    lock_registry.register(resource_id, lock_level)
@@ -0,0 +1,136 @@
+from os import path
+
+import pytest
+import yaml
+
+from ingenii_azure_data_platform.iam import RoleAssignmentPlanner
+
+DEFAULTS_FILE_PATH = path.join(
+    path.dirname(__file__), "..", "..", "..", "platform-config", "defaults.yml"
+)
+
+
+class FakeResource:
+    def __init__(self, name):
+        self.id = f"/resources/{name}"
+
+
+class GroupRoleAssignment:
+    """Records the arguments instead of creating a role assignment."""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def __repr__(self):
+        return f"{self.kwargs['principal_name']}: {self.kwargs['role_name']} on {self.kwargs['scope']}"
+
+
+@pytest.fixture
+def planner():
+    return RoleAssignmentPlanner()
+
+
+def request(planner, scope, role_name, principal_name="admins", parents=None):
+    planner.request(
+        GroupRoleAssignment,
+        scope,
+        parents=parents,
+        principal_id=f"{principal_name}-id",
+        principal_name=principal_name,
+        role_name=role_name,
+        scope_description="scope",
+    )
+
+
+def emitted(assignments):
+    return sorted((a.kwargs["principal_name"], a.kwargs["role_name"], a.kwargs["scope"]) for a in assignments)
+
+
+def test_exact_duplicates(planner):
+    group, account = FakeResource("group"), FakeResource("account")
+    request(planner, account, "Reader")
+    request(planner, account, "Reader")
+    request(planner, account, "Reader", principal_name="engineers")
+    request(planner, group, "Reader")
+
+    assert emitted(planner.emit()) == [
+        ("admins", "Reader", "/resources/account"),
+        ("admins", "Reader", "/resources/group"),
+        ("engineers", "Reader", "/resources/account"),
+    ]
+    assert planner.removed_duplicates == 1
+    assert planner.removed_covered == 0
+
+
+def test_including_role_on_a_parent(planner):
+    group, account, container = FakeResource("group"), FakeResource("account"), FakeResource("container")
+    request(planner, group, "Owner")
+    request(planner, account, "Reader", parents=[group])
+    request(planner, container, "Storage Blob Data Owner", parents=[account, group])
+    request(planner, container, "Storage Blob Data Reader", parents=[account, group])
+
+    assert emitted(planner.emit()) == [
+        ("admins", "Owner", "/resources/group"),
+        ("admins", "Storage Blob Data Owner", "/resources/container"),
+        ("admins", "Storage Blob Data Reader", "/resources/container"),
+    ]
+    # Reader through Owner and Contributor on the resource group. The data
+    # reader is on the same scope as the data owner, not on a parent.
+    assert planner.removed_covered == 1
+
+
+def test_not_covered_by_a_child_or_another_principal(planner):
+    group, account = FakeResource("group"), FakeResource("account")
+    request(planner, account, "Owner", parents=[group])
+    request(planner, group, "Reader")
+    request(planner, group, "Owner", principal_name="engineers")
+    request(planner, account, "Contributor", parents=[group])
+
+    assert len(planner.emit()) == 4
+    assert planner.removed_covered == 0
+
+
+def test_control_plane_does_not_cover_data_plane(planner):
+    group, account, container = FakeResource("group"), FakeResource("account"), FakeResource("container")
+    request(planner, group, "Owner")
+    request(planner, account, "Contributor", parents=[group])
+    request(planner, container, "Storage Blob Data Reader", parents=[account, group])
+    request(planner, account, "Storage Blob Data Contributor", parents=[group])
+    request(planner, container, "Storage Blob Data Reader", principal_name="engineers", parents=[account, group])
+
+    assert emitted(planner.emit()) == [
+        ("admins", "Owner", "/resources/group"),
+        ("admins", "Storage Blob Data Contributor", "/resources/account"),
+        ("engineers", "Storage Blob Data Reader", "/resources/container"),
+    ]
+    # The account Contributor through the group Owner, and the container data
+    # reader through the account data contributor
+    assert planner.removed_covered == 2
+
+
+def test_default_configuration(planner):
+    with open(DEFAULTS_FILE_PATH, "r") as f:
+        defaults = yaml.safe_load(f)
+
+    # As the resource group and Databricks workspace modules request them
+    resource_groups = {ref_key: FakeResource(f"rg-{ref_key}") for ref_key in defaults["management"]["resource_groups"]}
+    for ref_key, config in defaults["management"]["resource_groups"].items():
+        for assignment in config.get("iam", {}).get("role_assignments", []):
+            request(planner, resource_groups[ref_key], assignment["role_definition_name"],
+                    principal_name=assignment["user_group_ref_key"])
+
+    workspaces = defaults["analytics_services"]["databricks"]["workspaces"]
+    for name in ("engineering", "analytics"):
+        workspace = FakeResource(f"dbw-{name}")
+        for assignment in workspaces[name].get("iam", {}).get("role_assignments", []):
+            request(planner, workspace, assignment["role_definition_name"],
+                    principal_name=assignment["user_group_ref_key"], parents=[resource_groups["infra"]])
+
+    kept = emitted(planner.emit())
+
+    assert planner.removed_duplicates == 0
+    assert planner.removed_covered == 2
+    for name in ("engineering", "analytics"):
+        assert ("admins", "Owner", f"/resources/dbw-{name}") not in kept
+    assert ("admins", "Owner", "/resources/rg-infra") in kept
+    assert ("engineers", "Owner", "/resources/dbw-engineering") in kept
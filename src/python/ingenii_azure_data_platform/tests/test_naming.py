@@ -0,0 +1,133 @@
+from types import SimpleNamespace
+
+import pytest
+
+from ingenii_azure_data_platform.naming import (
+    NAMING_RULES,
+    RESOURCE_TYPE_CODES,
+    NamingEngine,
+    ResourceNamingException,
+)
+
+SPECIAL_TYPES = [
+    "user_group", "gateway_subnet", "key_vault", "datafactory",
+    "adf_integration_runtime", "storage_account", "log_analytics_workspace",
+]
+
+# Short enough for key vaults
+RESOURCE_NAMES = ["main", "Eng", "dl-1", "cred"]
+
+
+def platform_config(use_legacy_naming=False):
+    return SimpleNamespace(
+        prefix="adp",
+        stack_short_name="tst",
+        region=SimpleNamespace(short_name="eus"),
+        unique_id="ixk1",
+        use_legacy_naming=use_legacy_naming,
+    )
+
+
+def old_generate_resource_name(resource_type, resource_name, platform_config):
+    """ generate_resource_name before the naming engine """
+    resource_type = resource_type.lower()
+    prefix = platform_config.prefix
+    stack = platform_config.stack_short_name
+    region_short_name = platform_config.region.short_name
+    unique_id = platform_config.unique_id
+
+    if resource_type == "user_group":
+        return f"{prefix.upper()}-{stack.title()}-{resource_name.title()}"
+    elif resource_type == "gateway_subnet":
+        return "Gateway"
+    elif resource_type == "key_vault":
+        return f"{prefix}-{stack}-{region_short_name}-kv-{resource_name}-{unique_id}"
+    elif resource_type == "datafactory":
+        if platform_config.use_legacy_naming:
+            return f"{prefix}-{stack}-{region_short_name}-adf-{resource_name.lower()}"
+        return f"{prefix}-{stack}-{region_short_name}-adf-{resource_name}-{unique_id}"
+    elif resource_type == "adf_integration_runtime":
+        return f"{prefix}-{stack}-{resource_name}-{unique_id}"
+    elif resource_type == "storage_account":
+        return f"{prefix}{stack}{resource_name}{unique_id}"
+    elif resource_type == "log_analytics_workspace":
+        return f"{prefix}-{stack}-{region_short_name}-law-{resource_name.lower()}-{unique_id}"
+    return f"{prefix}-{stack}-{region_short_name}-{RESOURCE_TYPE_CODES[resource_type]}-{resource_name.lower()}"
+
+
+@pytest.mark.parametrize("use_legacy_naming", [False, True])
+@pytest.mark.parametrize("resource_type", sorted(RESOURCE_TYPE_CODES) + SPECIAL_TYPES)
+def test_names_match_generate_resource_name(resource_type, use_legacy_naming):
+    config = platform_config(use_legacy_naming)
+    engine = NamingEngine(config)
+
+    for resource_name in RESOURCE_NAMES:
+        if resource_type == "storage_account":
+            # Storage account names can only be lowercase letters and digits
+            resource_name = resource_name.lower().replace("-", "")
+        assert engine.name(resource_type, resource_name) == \
+            old_generate_resource_name(resource_type, resource_name, config)
+
+
+def test_resource_type_is_case_insensitive():
+    engine = NamingEngine(platform_config())
+
+    assert engine.name("Resource_Group", "data") == "adp-tst-eus-rg-data"
+
+
+def test_unknown_resource_type():
+    with pytest.raises(ResourceNamingException, match="not recognised"):
+        NamingEngine(platform_config()).name("unknown", "main")
+
+
+@pytest.mark.parametrize("resource_type", sorted(NAMING_RULES))
+def test_rejects_too_long_names(resource_type):
+    engine = NamingEngine(platform_config())
+
+    with pytest.raises(ResourceNamingException, match="characters long"):
+        engine.name(resource_type, "a" * NAMING_RULES[resource_type][1])
+
+
+@pytest.mark.parametrize("resource_type", sorted(NAMING_RULES))
+def test_rejects_characters(resource_type):
+    engine = NamingEngine(platform_config())
+
+    with pytest.raises(ResourceNamingException, match="characters Azure does not allow"):
+        engine.name(resource_type, "a!b")
+
+
+def test_rejects_uppercase_storage_accounts():
+    with pytest.raises(ResourceNamingException, match="characters Azure does not allow"):
+        NamingEngine(platform_config()).name("storage_account", "Data")
+
+
+def test_rejects_duplicates():
+    engine = NamingEngine(platform_config())
+    engine.name("resource_group", "data")
+
+    # The same resource again is fine
+    assert engine.name("resource_group", "data") == "adp-tst-eus-rg-data"
+    # Another type can have the same resource name
+    assert engine.name("virtual_network", "data") == "adp-tst-eus-vnet-data"
+    with pytest.raises(ResourceNamingException, match="are both 'adp-tst-eus-rg-data'"):
+        engine.name("resource_group", "Data")
+
+
+def test_fixed_names_do_not_clash():
+    engine = NamingEngine(platform_config())
+
+    assert engine.name("gateway_subnet", "first") == engine.name("gateway_subnet", "second") == "Gateway"
+
+
+def test_resolve_lists_every_problem():
+    engine = NamingEngine(platform_config())
+
+    with pytest.raises(ResourceNamingException) as error:
+        engine.resolve([
+            ("resource_group", "data"),
+            ("resource_group", "Data"),
+            ("storage_account", "a" * 24),
+            ("key_vault", "main"),
+        ])
+    assert len(str(error.value).splitlines()) == 2
+    assert engine.resolve([("key_vault", "main")]) == {("key_vault", "main"): "adp-tst-eus-kv-main-ixk1"}
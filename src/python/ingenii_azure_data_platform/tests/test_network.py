@@ -0,0 +1,156 @@
+from ipaddress import ip_network
+
+import pytest
+
+from ingenii_azure_data_platform.network import (
+    SubnetPlanner,
+    SubnetPlanningException,
+    plan_subnets,
+    prefix_for_hosts,
+    subnet_cidr,
+)
+
+ADDRESS_SPACE = "10.110.0.0/16"
+
+# The subnet layout of the core-dtap network
+SUBNET_LAYOUT = {
+    "gateway": (24, 0),
+    "privatelink": (24, 1),
+    "hosted_services": (24, 2),
+    "databricks_engineering_hosts": (22, 1),
+    "databricks_engineering_containers": (22, 2),
+    "databricks_analytics_hosts": (22, 3),
+    "databricks_analytics_containers": (22, 4),
+}
+
+
+def old_generate_cidr(cidr_subnet, new_prefix, network_number):
+    """ generate_cidr before subnet planning, listing every subnet """
+    return str(list(ip_network(cidr_subnet).subnets(new_prefix=new_prefix))[network_number])
+
+
+def overlapping(cidrs):
+    networks = [ip_network(cidr) for cidr in cidrs]
+    return [
+        (first, second)
+        for idx, first in enumerate(networks)
+        for second in networks[idx + 1:]
+        if first.overlaps(second)
+    ]
+
+
+@pytest.mark.parametrize("address_space", [ADDRESS_SPACE, "10.0.0.0/12", "192.168.0.0/19"])
+@pytest.mark.parametrize("new_prefix", [22, 24, 26])
+def test_subnet_cidr_matches_listing(address_space, new_prefix):
+    for network_number in (0, 1, 2, 3, 4, 7):
+        assert subnet_cidr(address_space, new_prefix, network_number) == \
+            old_generate_cidr(address_space, new_prefix, network_number)
+
+
+def test_subnet_cidr_out_of_range():
+    with pytest.raises(SubnetPlanningException):
+        subnet_cidr("192.168.0.0/24", 26, 4)
+    with pytest.raises(SubnetPlanningException):
+        subnet_cidr("192.168.0.0/24", 22, 0)
+
+
+def test_default_layout_is_unchanged():
+    planner = plan_subnets(ADDRESS_SPACE, SUBNET_LAYOUT)
+
+    for name, (prefix, network_number) in SUBNET_LAYOUT.items():
+        assert planner.cidr(name) == old_generate_cidr(ADDRESS_SPACE, prefix, network_number)
+
+
+@pytest.mark.parametrize("hosts,prefix", [
+    (1, 29), (3, 29), (4, 28), (11, 28), (12, 27), (251, 24), (252, 23), (1019, 22), (1020, 21),
+])
+def test_prefix_for_hosts(hosts, prefix):
+    assert prefix_for_hosts(hosts) == prefix
+
+
+def test_reserve_rejects_overlaps():
+    planner = SubnetPlanner(ADDRESS_SPACE)
+    planner.reserve("first", "10.110.4.0/22")
+
+    with pytest.raises(SubnetPlanningException, match="overlaps with subnet 'first'"):
+        planner.reserve("second", "10.110.5.0/24")
+    with pytest.raises(SubnetPlanningException, match="overlaps with subnet 'first'"):
+        planner.reserve("second", "10.110.0.0/21")
+    with pytest.raises(SubnetPlanningException, match="outside of the address space"):
+        planner.reserve("second", "10.111.0.0/24")
+
+    assert planner.reserve("second", "10.110.8.0/24") == "10.110.8.0/24"
+
+
+def test_reserve_rejects_too_few_hosts():
+    planner = SubnetPlanner(ADDRESS_SPACE)
+
+    with pytest.raises(SubnetPlanningException, match="too small"):
+        planner.reserve("subnet", "10.110.0.0/24", hosts=252)
+    assert planner.reserve("subnet", "10.110.0.0/24", hosts=251) == "10.110.0.0/24"
+
+
+def test_allocate_fills_aligned_gaps():
+    planner = SubnetPlanner("10.0.0.0/24")
+    planner.reserve("first", "10.0.0.0/27")
+    planner.reserve("third", "10.0.0.64/26")
+
+    assert planner.allocate("second", 20) == "10.0.0.32/27"
+    assert planner.allocate("fourth", 50) == "10.0.0.128/26"
+    with pytest.raises(SubnetPlanningException, match="no free /25 block"):
+        planner.allocate("fifth", 100)
+    assert not overlapping(planner.cidr(name) for name in ("first", "second", "third", "fourth"))
+
+
+def test_headroom():
+    planner = SubnetPlanner("10.0.0.0/24")
+    planner.reserve("first", "10.0.0.0/26", hosts=50)
+    planner.reserve("second", "10.0.0.128/27")
+
+    headroom = planner.headroom()
+    assert headroom["free_addresses"] == 256 - 64 - 32
+    assert headroom["largest_free_subnet"] == "/26"
+    assert headroom["subnets"]["first"] == {
+        "address_prefix": "10.0.0.0/26", "usable_hosts": 59, "spare_hosts": 9,
+    }
+    assert headroom["subnets"]["second"]["spare_hosts"] is None
+
+
+def test_headroom_full():
+    planner = SubnetPlanner("10.0.0.0/24")
+    planner.reserve("all", "10.0.0.0/24")
+
+    assert planner.headroom()["free_addresses"] == 0
+    assert planner.headroom()["largest_free_subnet"] is None
+
+
+def test_databricks_subnets_beyond_a_22():
+    max_nodes = 2000
+    capacity = {
+        "databricks_engineering_hosts": {"hosts": max_nodes},
+        "databricks_engineering_containers": {"hosts": max_nodes},
+    }
+    planner = plan_subnets(ADDRESS_SPACE, SUBNET_LAYOUT, capacity)
+
+    for name in capacity:
+        assert ip_network(planner.cidr(name)).prefixlen == 21
+        assert planner.headroom()["subnets"][name]["spare_hosts"] >= 0
+    # The other subnets keep their positions
+    for name, (prefix, network_number) in SUBNET_LAYOUT.items():
+        if name not in capacity:
+            assert planner.cidr(name) == old_generate_cidr(ADDRESS_SPACE, prefix, network_number)
+    assert not overlapping(planner.cidr(name) for name in SUBNET_LAYOUT)
+
+
+def test_plan_subnets_pinned_overlap():
+    with pytest.raises(SubnetPlanningException, match="overlaps"):
+        plan_subnets(ADDRESS_SPACE, SUBNET_LAYOUT, {
+            "databricks_analytics_hosts": {"address_prefix": "10.110.4.0/22"},
+        })
+
+
+def test_plan_subnets_unknown_and_unsized():
+    with pytest.raises(SubnetPlanningException, match="Unknown subnets"):
+        plan_subnets(ADDRESS_SPACE, SUBNET_LAYOUT, {"other": {"hosts": 10}})
+    with pytest.raises(SubnetPlanningException, match="need either"):
+        plan_subnets(ADDRESS_SPACE, SUBNET_LAYOUT, {"gateway": {}})
@@ -0,0 +1,225 @@
+import pytest
+
+from ingenii_azure_data_platform.storage import (
+    MAX_RULE_PREFIXES,
+    MAX_TRANSACTION_OPERATIONS,
+    LifecycleRuleException,
+    TableEntitySetProvider,
+    _entity_key,
+    _string_properties,
+    lifecycle_rules,
+)
+
+
+class FakeTableClient:
+    """An in-memory Azure Table, recording the transactions submitted."""
+
+    def __init__(self):
+        self.rows = {}
+        self.transactions = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def submit_transaction(self, operations):
+        if len(operations) > MAX_TRANSACTION_OPERATIONS:
+            raise ValueError("Too many operations in one transaction")
+        if len({entity["PartitionKey"] for _, entity, *_ in operations}) > 1:
+            raise ValueError("All operations of a transaction must be on one partition")
+        self.transactions.append(operations)
+        for operation, entity, *_ in operations:
+            if operation == "upsert":
+                self.rows[_entity_key(entity)] = dict(entity)
+            else:
+                del self.rows[_entity_key(entity)]
+
+    def list_entities(self):
+        return list(self.rows.values())
+
+
+@pytest.fixture
+def client():
+    return FakeTableClient()
+
+
+@pytest.fixture
+def provider(client, monkeypatch):
+    provider = TableEntitySetProvider()
+    monkeypatch.setattr(provider, "_client", lambda props: client)
+    return provider
+
+
+def props(entities):
+    return {
+        "account_name": "account",
+        "account_key": "key",
+        "table_name": "table",
+        "endpoint_suffix": "core.windows.net",
+        "entities": entities,
+    }
+
+
+def entities(count, partitions=3, value="value"):
+    return [
+        {"PartitionKey": f"partition{i % partitions}", "RowKey": f"row{i}", "Value": value}
+        for i in range(count)
+    ]
+
+
+def test_create_writes_in_transactions_per_partition(provider, client):
+    result = provider.create(props(entities(1000)))
+
+    assert len(client.rows) == 1000
+    # 334, 333 and 333 entities per partition
+    assert len(client.transactions) == 12
+    assert len(result.outs["entity_hashes"]) == 1000
+
+
+def test_update_writes_only_changes(provider, client):
+    olds = provider.create(props(entities(1000))).outs
+    client.transactions = []
+
+    news = entities(1000)[:-10]
+    news[0]["Value"] = "changed"
+    diff = provider.diff("account/table", olds, props(news))
+    provider.update("account/table", olds, props(news))
+
+    assert diff.changes and not diff.replaces
+    assert len(client.rows) == 990
+    assert client.rows["partition0/row0"]["Value"] == "changed"
+    assert sum(len(transaction) for transaction in client.transactions) == 11
+
+
+def test_no_changes(provider, client):
+    olds = provider.create(props(entities(10))).outs
+
+    assert not provider.diff("account/table", olds, props(entities(10))).changes
+
+
+def test_unmanaged_rows_are_left_alone(provider, client):
+    client.rows["partition0/pipeline"] = {"PartitionKey": "partition0", "RowKey": "pipeline"}
+
+    olds = provider.create(props(entities(10))).outs
+    provider.update("account/table", olds, props([]))
+    assert list(client.rows) == ["partition0/pipeline"]
+
+    olds = provider.create(props(entities(10))).outs
+    provider.delete("account/table", olds)
+    assert list(client.rows) == ["partition0/pipeline"]
+
+
+def test_read_picks_up_rows_changed_outside(provider, client):
+    olds = provider.create(props(entities(10))).outs
+    del client.rows["partition1/row1"]
+    client.rows["partition2/row2"]["Value"] = "edited"
+
+    refreshed = provider.read("account/table", olds).outs
+    provider.update("account/table", refreshed, props(entities(10)))
+
+    assert client.rows["partition1/row1"]["Value"] == "value"
+    assert client.rows["partition2/row2"]["Value"] == "value"
+
+
+def test_properties_are_strings():
+    assert _string_properties(
+        {"PartitionKey": "p", "RowKey": "r", "Enabled": True, "Count": 3, "Name": "n"}
+    ) == {"PartitionKey": "p", "RowKey": "r", "Enabled": "true", "Count": "3", "Name": "n"}
+
+
+def datalake(lifecycle_management, containers=("raw", "source", "curated")):
+    return {
+        "containers": {ref_key: {"display_name": ref_key.title()} for ref_key in containers},
+        "lifecycle_management": lifecycle_management,
+    }
+
+
+def rule_summary(rules):
+    return [(rule["name"], rule["prefixes"]) for rule in rules]
+
+
+def test_account_wide_rule():
+    rules = lifecycle_rules(datalake({"cool_after": 30, "delete_after": 365}))
+
+    assert rules == [{
+        "name": "All Blob Management",
+        "details": {"tier_to_cool": 30, "delete": 365},
+        "prefixes": [],
+        "after_last_access": False,
+    }]
+    assert lifecycle_rules(datalake({})) == []
+
+
+def test_account_wide_rule_leaves_out_covered_containers():
+    rules = lifecycle_rules(datalake({
+        "cool_after": 30,
+        "rules": {
+            "Raw": {"containers": ["raw"], "prefixes": ["landing/"], "archive_after": 90},
+            "Hot": {"containers": ["curated"]},
+        },
+    }))
+
+    assert rule_summary(rules) == [
+        ("Raw", ["Raw/landing/"]),
+        ("Other Blob Management 1", ["Source/"]),
+    ]
+    assert rules[0]["details"] == {"tier_to_archive": 90}
+
+
+def test_overlapping_prefixes():
+    for first, second in ((["landing/"], ["landing/old/"]), (["landing/old/"], ["landing/"]), ([""], ["a/"])):
+        with pytest.raises(LifecycleRuleException, match="'First' and 'Second' overlap in container 'raw'"):
+            lifecycle_rules(datalake({"rules": {
+                "First": {"containers": ["raw"], "prefixes": first, "cool_after": 30},
+                "Second": {"containers": ["raw", "source"], "prefixes": second, "delete_after": 90},
+            }}))
+
+    # The same prefixes in different containers, or within one rule, are fine
+    rules = lifecycle_rules(datalake({"rules": {
+        "First": {"containers": ["raw"], "prefixes": ["landing/", "landing/old/"], "cool_after": 30},
+        "Second": {"containers": ["source"], "prefixes": ["landing/"], "delete_after": 90},
+    }}))
+    assert rule_summary(rules) == [
+        ("First", ["Raw/landing/", "Raw/landing/old/"]),
+        ("Second", ["Source/landing/"]),
+    ]
+
+
+def test_rules_are_split_beyond_max_prefixes():
+    prefixes = [f"table{i}/" for i in range(MAX_RULE_PREFIXES + 3)]
+    containers = [f"container{i}" for i in range(2 * MAX_RULE_PREFIXES + 3)]
+
+    rules = lifecycle_rules(datalake({
+        "delete_after": 365,
+        "rules": {"Tables": {"containers": ["container0"], "prefixes": prefixes, "cool_after": 30}},
+    }, containers=containers))
+
+    assert rule_summary(rules) == [
+        ("Tables", [f"Container0/{prefix}" for prefix in prefixes[:MAX_RULE_PREFIXES]]),
+        ("Tables 2", [f"Container0/{prefix}" for prefix in prefixes[MAX_RULE_PREFIXES:]]),
+        ("Other Blob Management 1", [f"Container{i}/" for i in range(1, MAX_RULE_PREFIXES + 1)]),
+        ("Other Blob Management 2", [f"Container{i}/" for i in range(MAX_RULE_PREFIXES + 1, 2 * MAX_RULE_PREFIXES + 1)]),
+        ("Other Blob Management 3", [f"Container{i}/" for i in range(2 * MAX_RULE_PREFIXES + 1, 2 * MAX_RULE_PREFIXES + 3)]),
+    ]
+    assert all(rule["details"] == {"tier_to_cool": 30} for rule in rules[:2])
+
+
+def test_after_last_access_needs_track_last_access():
+    rule = {"containers": ["raw"], "cool_after": 30, "after_last_access": True}
+
+    with pytest.raises(LifecycleRuleException, match="needs 'track_last_access'"):
+        lifecycle_rules(datalake({"rules": {"Raw": rule}}))
+
+    rules = lifecycle_rules(datalake({"track_last_access": True, "rules": {"Raw": rule}}))
+    assert rules == [{
+        "name": "Raw", "details": {"tier_to_cool": 30}, "prefixes": ["Raw/"], "after_last_access": True,
+    }]
+
+
+def test_invalid_rules():
+    with pytest.raises(LifecycleRuleException, match="unknown container 'missing'"):
+        lifecycle_rules(datalake({"rules": {"Raw": {"containers": ["missing"], "cool_after": 30}}}))
+    with pytest.raises(LifecycleRuleException, match="has prefixes but no actions"):
+        lifecycle_rules(datalake({"rules": {"Raw": {"containers": ["raw"], "prefixes": ["landing/"]}}}))
@@ -0,0 +1,144 @@
+"""
+This script compares the cost of validating the platform configuration the
+legacy way (dump the merged config to YAML text and re-parse it with yamale)
+against validating the in-memory dictionary and building the typed config
+model. Large customer configurations are simulated by scaling the number of
+containers, clusters and role assignments on top of the defaults.
+"""
+import argparse
+import sys
+import tracemalloc
+from copy import deepcopy
+from os import path
+from time import perf_counter
+
+import hiyapyco as hco
+import yamale
+
+SOURCE_DIR = path.dirname(path.dirname(path.abspath(__file__)))
+sys.path.insert(0, path.join(SOURCE_DIR, "python", "ingenii_azure_data_platform"))
+
+from ingenii_azure_data_platform.config_model import PlatformConfigModel  # noqa: E402
+
+parser = argparse.ArgumentParser(
+    description="Benchmarks platform configuration validation on large configurations."
+)
+
+parser.add_argument(
+    "--containers", type=int, default=500, help="Number of data lake containers."
+)
+parser.add_argument(
+    "--clusters", type=int, default=200, help="Number of Databricks clusters."
+)
+parser.add_argument(
+    "--role-assignments",
+    type=int,
+    default=500,
+    help="Number of role assignments added to every resource group.",
+)
+parser.add_argument(
+    "--repeat", type=int, default=5, help="Number of runs, the best one is reported."
+)
+
+
+def build_config(containers: int, clusters: int, role_assignments: int) -> dict:
+    config = dict(
+        hco.load(
+            [path.join(SOURCE_DIR, "platform-config", "defaults.yml")],
+            method=hco.METHOD_MERGE,
+            mergelists=False,
+        )
+    )
+    roles = [
+        {"user_group_ref_key": group, "role_definition_name": "Reader"}
+        for group in ("admins", "engineers", "analysts")
+    ]
+
+    datalake = config["storage"]["accounts"]["datalake"]
+    for idx in range(containers):
+        datalake["containers"][f"container_{idx}"] = {
+            "display_name": f"container-{idx}",
+            "iam": {"role_assignments": deepcopy(roles)},
+        }
+
+    workspace = config["analytics_services"]["databricks"]["workspaces"]["engineering"]
+    for idx in range(clusters):
+        workspace["clusters"][f"cluster_{idx}"] = {
+            "type": "standard",
+            "display_name": f"cluster-{idx}",
+            "spark_version": "10.4.x-scala2.12",
+            "node_type_id": "Standard_F4s",
+            "auto_scale_min_workers": 1,
+            "auto_scale_max_workers": 4,
+            "libraries": {"pypi": [{"package": "pandas"}]},
+        }
+
+    for resource_group in config["management"]["resource_groups"].values():
+        resource_group["iam"]["role_assignments"] += [
+            deepcopy(roles[idx % len(roles)]) for idx in range(role_assignments)
+        ]
+
+    return config
+
+
+def legacy_validation(schema, config):
+    yamale.validate(schema, yamale.make_data(content=hco.dump(config)))
+    return config
+
+
+def in_memory_validation(schema, config):
+    yamale.validate(schema, [(config, None)])
+    return PlatformConfigModel.from_dict(config)
+
+
+def measure(function, schema, config, repeat):
+    timings = []
+    for _ in range(repeat):
+        start_time = perf_counter()
+        function(schema, config)
+        timings.append(perf_counter() - start_time)
+
+    tracemalloc.start()
+    function(schema, config)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(timings), peak
+
+
+def traced_size(build, config):
+    """Memory held by the structure that the modules read the config from."""
+    tracemalloc.start()
+    result = build(config)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    schema = yamale.make_schema(path.join(SOURCE_DIR, "platform-config", "schema.yml"))
+    config = build_config(args.containers, args.clusters, args.role_assignments)
+
+    print(
+        f"Config: {args.containers} containers, {args.clusters} clusters, "
+        f"{args.role_assignments} role assignments per resource group"
+    )
+    print(f"{'path':<12}{'best time':>12}{'peak memory':>14}{'retained':>12}")
+    results = {}
+    for name, function, build in (
+        # The legacy path keeps the nested dictionaries, the new one the model.
+        ("legacy", legacy_validation, deepcopy),
+        ("in-memory", in_memory_validation, PlatformConfigModel.from_dict),
+    ):
+        best, peak = measure(function, schema, config, args.repeat)
+        results[name] = best
+        retained = traced_size(build, config)
+        print(
+            f"{name:<12}{best * 1000:>10.1f}ms{peak / 2**20:>12.1f}MB"
+            f"{retained / 2**20:>10.1f}MB"
+        )
+
+    print(f"Speed-up: {results['legacy'] / results['in-memory']:.1f}x")
@@ -0,0 +1,404 @@
+"""
+This script benchmarks the evaluation of the Pulumi programs (core-shared,
+core-dtap and core-extensions) without any cloud access. Every program is run
+against the Pulumi mock runtime (pulumi.runtime.set_mocks), as a preview,
+with synthetic configurations scaled along several axes:
+
+* extra storage accounts, and containers in the data lake
+* Databricks clusters and users in the engineering workspace
+* role assignments on every resource group
+* extension packages (core-extensions only)
+
+Each evaluation runs in a fresh interpreter and reports the wall-clock time,
+the peak RSS, the number of resources registered and the number of invokes,
+including role definition fetches. Cold runs start without the on-disk caches
+(ADP_CONFIG_CACHE_DIR: merged configuration, role definitions, diagnostic
+categories), warm runs with the caches a previous run of the same
+configuration left behind, see --cache. Results can be written to a JSON file and
+compared with a previous one, failing if any program got slower or bigger by
+more than --max-regression, so that CI catches regressions in startup and
+evaluation cost.
+
+Examples:
+python scripts/benchmark_programs.py --scales 1 10 --output-file benchmark.json
+python scripts/benchmark_programs.py --scales 10 --cache cold warm
+python scripts/benchmark_programs.py --baseline-file benchmark.json --max-regression 0.25
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+from os import chdir, environ, path
+from time import perf_counter
+from typing import Dict, List
+from uuid import NAMESPACE_URL, uuid5
+
+import yaml
+
+SOURCE_DIR = path.dirname(path.dirname(path.abspath(__file__)))
+PULUMI_SOURCE_DIR = path.join(SOURCE_DIR, "pulumi")
+PLATFORM_CONFIG_DIR = path.join(SOURCE_DIR, "platform-config")
+PACKAGE_DIR = path.join(SOURCE_DIR, "python", "ingenii_azure_data_platform")
+
+SUBSCRIPTION_ID = "00000000-0000-0000-0000-000000000000"
+
+# Program -> (stack name, default configuration file)
+PROGRAMS = {
+    "core-shared": ("bench.shared", "defaults.shared.yml"),
+    "core-dtap": ("bench.dev", "defaults.yml"),
+    "core-extensions": ("bench.extensions.dev", "defaults.yml"),
+}
+
+# Metrics compared with the baseline
+COMPARED_METRICS = ("seconds", "peak_rss_mb", "resources", "invokes")
+
+parser = argparse.ArgumentParser(
+    description="Benchmarks the evaluation of the Pulumi programs against the mock runtime."
+)
+
+parser.add_argument(
+    "--programs",
+    type=str,
+    nargs="+",
+    choices=list(PROGRAMS),
+    default=list(PROGRAMS),
+    help="The programs to evaluate.",
+)
+parser.add_argument(
+    "--scales",
+    type=int,
+    nargs="+",
+    default=[1, 10],
+    help="Scale factors for the synthetic configuration, see scaled_config().",
+)
+parser.add_argument(
+    "--output-file", type=str, required=False, help="Writes the results to this JSON file."
+)
+parser.add_argument(
+    "--baseline-file",
+    type=str,
+    required=False,
+    help="Compares the results with the ones in this JSON file.",
+)
+parser.add_argument(
+    "--max-regression",
+    type=float,
+    default=0.25,
+    help="The relative increase over the baseline above which the run fails.",
+)
+parser.add_argument(
+    "--cache",
+    type=str,
+    nargs="+",
+    choices=["cold", "warm"],
+    default=["cold"],
+    help="Whether to run without the on-disk caches, with them filled by a previous run, or both.",
+)
+# Internal, runs a single evaluation in a fresh interpreter.
+parser.add_argument("--child", type=str, required=False, help=argparse.SUPPRESS)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# SYNTHETIC CONFIGURATION
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def scaled_config(scale: int, package_names: List[str], shared: bool) -> dict:
+    """
+    A customer configuration, merged on top of the defaults, growing linearly
+    with 'scale'. The shared stack has no data lake or engineering workspace,
+    so only its role assignments and packages grow.
+    """
+    roles = [
+        {"user_group_ref_key": group, "role_definition_name": role}
+        for group in ("admins", "engineers", "analysts")
+        for role in ("Reader", "Contributor")
+    ]
+
+    accounts = {
+        "datalake": {
+            "containers": {
+                f"bench{idx}": {
+                    "display_name": f"bench{idx}",
+                    "iam": {"role_assignments": roles[:2]},
+                }
+                for idx in range(10 * scale)
+            }
+        }
+    }
+    for idx in range(scale):
+        accounts[f"extra{idx}"] = {
+            "display_name": f"extra{idx}",
+            "containers": {"main": {"display_name": "main"}},
+        }
+
+    config = {
+        "management": {
+            "resource_groups": {
+                name: {"iam": {"role_assignments": [roles[idx % len(roles)] for idx in range(5 * scale)]}}
+                for name in ("data", "infra", "security")
+            }
+        },
+        "packages": [{"name": name, "config": {}} for name in package_names],
+    }
+    if shared:
+        return config
+
+    config["storage"] = {"accounts": accounts}
+    config["analytics_services"] = {
+        "databricks": {
+            "workspaces": {
+                "engineering": {
+                    "clusters": {
+                        f"bench{idx}": {
+                            "type": "standard",
+                            "display_name": f"bench-{idx}",
+                            "auto_scale_min_workers": 1,
+                            "auto_scale_max_workers": 4,
+                        }
+                        for idx in range(5 * scale)
+                    },
+                    "users": [
+                        {"email_address": f"user{idx}@example.com", "roles": ["workspace_access"]}
+                        for idx in range(10 * scale)
+                    ],
+                }
+            }
+        }
+    }
+    return config
+
+
+def write_packages(directory: str, count: int) -> List[str]:
+    """Extension packages that each add a resource group and a storage account."""
+    names = []
+    for idx in range(count):
+        name = f"bench_package_{idx}"
+        with open(path.join(directory, f"{name}.py"), "w") as f:
+            f.write(
+                "from pulumi_azure_native import resources, storage\n\n\n"
+                "def init(args):\n"
+                "    group = resources.ResourceGroup(f'{args.namespace}-rg')\n"
+                "    storage.StorageAccount(\n"
+                "        f'{args.namespace}-sa',\n"
+                "        resource_group_name=group.name,\n"
+                "        kind='StorageV2',\n"
+                "        sku=storage.SkuArgs(name='Standard_LRS'),\n"
+                "    )\n"
+            )
+        names.append(name)
+    return names
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# EVALUATION (child process)
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def evaluate(program: str, work_dir: str) -> dict:
+    import pulumi
+
+    from ingenii_azure_data_platform import iam
+
+    resources = Counter()
+    invokes = Counter()
+
+    class BenchmarkMocks(pulumi.runtime.Mocks):
+        def new_resource(self, args: pulumi.runtime.MockResourceArgs):
+            resources[args.typ] += 1
+            resource_id = (
+                f"/subscriptions/{SUBSCRIPTION_ID}/resourceGroups/bench/providers/"
+                f"{args.typ.replace(':', '/')}/{args.name}"
+            )
+            return resource_id, dict(args.inputs, name=args.inputs.get("name", args.name))
+
+        def call(self, args: pulumi.runtime.MockCallArgs):
+            invokes[args.token] += 1
+            return {
+                "azure-native:authorization:getClientConfig": {
+                    "clientId": "bench",
+                    "objectId": "bench",
+                    "subscriptionId": SUBSCRIPTION_ID,
+                    "tenantId": SUBSCRIPTION_ID,
+                },
+                "azure-native:authorization:getClientToken": {"token": "bench"},
+                "azure:monitoring/getDiagnosticCategories:getDiagnosticCategories": {
+                    "id": args.args.get("resourceId"),
+                    "resourceId": args.args.get("resourceId"),
+                    "logs": ["AuditEvent"],
+                    "metrics": ["AllMetrics"],
+                },
+                "azure-native:storage:listStorageAccountSAS": {"accountSasToken": "bench"},
+                "azure-native:storage:listStorageAccountKeys": {
+                    "keys": [{"keyName": "key1", "permissions": "FULL", "value": "bench"}]
+                },
+            }.get(args.token, {})
+
+    class OfflineRoleInfo(iam.RoleInfo):
+        """
+        Resolves every role name to a stable, made up role definition ID. A
+        fetch of the role definitions, that RoleInfo would make when the
+        index and the disk cache miss, is counted as one invoke.
+        """
+
+        def _connect(self):
+            self._subscription_id = SUBSCRIPTION_ID
+
+        def _fetch(self, use_cache=True):
+            self._connect()
+            self._fetched = True
+            role_definitions = self._load_cached_definitions() if use_cache else None
+            if role_definitions is None:
+                invokes["role definitions"] += 1
+                self._refreshed = True
+                return
+            self._index(role_definitions)
+
+        def _lookup(self, index, key):
+            role = super()._lookup(index, key)
+            if role is None and index is self._by_name:
+                self._index(
+                    {
+                        key: f"/subscriptions/{SUBSCRIPTION_ID}/providers/Microsoft.Authorization"
+                        f"/roleDefinitions/{uuid5(NAMESPACE_URL, key)}"
+                    }
+                )
+            return index.get(key, key)
+
+    role_info = iam.role_info = OfflineRoleInfo()
+
+    stack_name = PROGRAMS[program][0]
+    pulumi.runtime.set_mocks(BenchmarkMocks(), project="bench", stack=stack_name, preview=True)
+
+    program_dir = path.join(PULUMI_SOURCE_DIR, program)
+    chdir(program_dir)
+    sys.path[:0] = [program_dir, work_dir]
+
+    @pulumi.runtime.test
+    def run():
+        import runpy
+
+        runpy.run_path(program_dir, run_name="__main__")
+
+    start_time = perf_counter()
+    run()
+    seconds = perf_counter() - start_time
+
+    # What a fetch would have left on disk, for warm runs
+    if role_info._fetched:
+        role_info._save_cached_definitions(role_info._by_name)
+
+    return {
+        "seconds": seconds,
+        # Kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "resources": sum(resources.values()),
+        "invokes": sum(invokes.values()),
+        "invokes_by_token": dict(invokes),
+    }
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# DRIVER
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def run_child(program: str, scale: int, cache: str) -> dict:
+    """
+    Evaluates the program at the scale in a fresh interpreter. A warm run is
+    preceded by an unmeasured run filling the on-disk caches.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        package_names = write_packages(work_dir, scale if program == "core-extensions" else 0)
+
+        config_file_path = path.join(work_dir, "config.yml")
+        with open(config_file_path, "w") as f:
+            yaml.safe_dump(
+                scaled_config(scale, package_names, program == "core-shared"), f
+            )
+        metadata_file_path = path.join(work_dir, "metadata.yml")
+        with open(metadata_file_path, "w") as f:
+            yaml.safe_dump({"benchmark": True}, f)
+
+        env = dict(
+            environ,
+            ADP_CONFIG_SCHEMA_FILE_PATH=path.join(PLATFORM_CONFIG_DIR, "schema.yml"),
+            ADP_DEFAULT_CONFIG_FILE_PATH=path.join(PLATFORM_CONFIG_DIR, PROGRAMS[program][1]),
+            ADP_CUSTOM_CONFIGS_FILE_PATH=config_file_path,
+            ADP_METADATA_FILE_PATH=metadata_file_path,
+            ADP_CONFIG_CACHE_DIR=path.join(work_dir, "cache"),
+            PYTHONPATH=PACKAGE_DIR,
+        )
+        if cache == "cold":
+            # Every run should pay for merging and validating the configuration
+            env.update(
+                ADP_CONFIG_CACHE_DISABLED="1",
+                ADP_DIAGNOSTIC_CATEGORIES_CACHE_TTL="0",
+                ADP_ROLE_DEFINITIONS_CACHE_TTL="0",
+            )
+
+        for _ in range(2 if cache == "warm" else 1):
+            completed = subprocess.run(
+                [sys.executable, path.abspath(__file__), "--child", json.dumps([program, work_dir])],
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            if completed.returncode != 0:
+                raise RuntimeError(f"{program} at scale {scale} failed:\n{completed.stderr}")
+    return dict(json.loads(completed.stdout.strip().splitlines()[-1]), cache=cache)
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], max_regression: float) -> List[str]:
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for metric in COMPARED_METRICS:
+            previous = baseline[key][metric]
+            if previous and (result[metric] - previous) / previous > max_regression:
+                regressions.append(
+                    f"{key} {metric}: {previous:.2f} -> {result[metric]:.2f}"
+                )
+    return regressions
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    if args.child:
+        program, work_dir = json.loads(args.child)
+        result = evaluate(program, work_dir)
+        # The last line of the output is the result, programs print as well.
+        print(json.dumps(result))
+        sys.exit(0)
+
+    results = {}
+    print(
+        f"{'program':<17}{'scale':>6}{'cache':>7}{'time':>10}{'peak RSS':>11}{'resources':>11}{'invokes':>9}"
+    )
+    for program in args.programs:
+        for scale in args.scales:
+            for cache in args.cache:
+                # Cold runs keep the keys of the results from before warm runs
+                key = f"{program}@{scale}" + ("" if cache == "cold" else f"/{cache}")
+                result = results[key] = run_child(program, scale, cache)
+                print(
+                    f"{program:<17}{scale:>6}{cache:>7}{result['seconds']:>9.2f}s{result['peak_rss_mb']:>9.0f}MB"
+                    f"{result['resources']:>11}{result['invokes']:>9}"
+                )
+
+    if args.output_file:
+        with open(args.output_file, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline_file:
+        with open(args.baseline_file, "r") as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print("Regressions over the baseline:\n" + "\n".join(regressions))
+            sys.exit(1)
+        print("No regressions over the baseline. ✅")
@@ -0,0 +1,408 @@
+"""
+This script previews, refreshes or applies all the stacks of a platform in one
+process, using the Pulumi Automation API.
+
+The stacks are run in dependency order, with independent stacks running
+concurrently:
+
+    core-shared ─┬─> core-dtap (dev) ──> extensions (dev)
+                 ├─> core-dtap (test) ─> extensions (test)
+                 ├─> core-dtap (prod) ─> extensions (prod)
+                 └─> extensions (shared)
+
+When a stack fails, the stacks that depend on it are skipped.
+
+The parallelism of each stack is adjusted from run to run, based on how often
+Azure Resource Manager throttled it (HTTP 429). A stack that was throttled
+runs with half the parallelism next time, and one that was not throttled
+runs with a little more, up to --max-parallelism. The values are kept in
+--parallelism-file.
+
+Operations that fail on conflicting updates of the same Azure resource, e.g.
+subnets of a virtual network created in parallel (see
+network.virtual_network.subnet_provisioning), are retried after a backoff.
+Pulumi only returns once all in-flight operations of the stack have settled,
+so the retry starts from a quiet virtual network and only sends the
+operations that are still missing.
+
+The stacks have to be initialised beforehand, e.g. with 'make init'.
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from os import getenv, path
+from time import perf_counter, sleep
+from typing import Dict, List, Union
+
+from pulumi import automation as auto
+
+SOURCE_DIR = path.dirname(path.dirname(path.abspath(__file__)))
+
+parser = argparse.ArgumentParser(
+    description="Runs the platform stacks concurrently, in dependency order."
+)
+
+parser.add_argument(
+    "operation",
+    type=str,
+    choices=["preview", "refresh", "apply"],
+    help="The operation to run on every stack.",
+)
+
+parser.add_argument(
+    "--customer-code",
+    type=str,
+    help="The customer code the stack names start with.",
+    required=True,
+)
+
+parser.add_argument(
+    "--environments",
+    type=str,
+    nargs="+",
+    help="The DTAP environments to run.",
+    required=False,
+    default=["dev", "test", "prod"],
+)
+
+parser.add_argument(
+    "--configs-dir",
+    type=str,
+    help="The directory with the customer's platform configuration files and metadata.yml.",
+    required=True,
+)
+
+parser.add_argument(
+    "--no-extensions",
+    action="store_true",
+    help="Do not run the extensions stacks.",
+)
+
+
+def add_run_arguments(parser: argparse.ArgumentParser) -> None:
+    """The arguments for the parallelism and retries of the stack runs."""
+    parser.add_argument(
+        "--parallelism-file",
+        type=str,
+        help="The JSON file that keeps the parallelism of each stack between runs.",
+        required=False,
+        default="pulumi.parallelism.json",
+    )
+
+    parser.add_argument(
+        "--initial-parallelism",
+        type=int,
+        help="The parallelism of a stack without any history.",
+        required=False,
+        default=10,
+    )
+
+    parser.add_argument(
+        "--max-parallelism",
+        type=int,
+        help="The highest parallelism a stack can reach.",
+        required=False,
+        default=32,
+    )
+
+    parser.add_argument(
+        "--conflict-retries",
+        type=int,
+        help="How many times a stack is retried after conflicting Azure updates.",
+        required=False,
+        default=3,
+    )
+
+
+add_run_arguments(parser)
+
+PULUMI_SOURCE_DIR = path.join(SOURCE_DIR, "pulumi")
+PLATFORM_CONFIG_DIR = path.join(SOURCE_DIR, "platform-config")
+
+# Errors that Azure Resource Manager returns when requests are throttled. The
+# status code only counts in the error's status field, as resource IDs and
+# counts in the output can contain 429 too
+THROTTLING_PATTERN = re.compile(
+    r"(TooManyRequests|Too Many Requests|\bStatus(Code)?[=:] ?429\b"
+    r"|(Subscription|ResourceGroup|Tenant)RequestsThrottled|RetryableError.*throttl)",
+    re.IGNORECASE,
+)
+
+# Errors that Azure Resource Manager returns for concurrent updates of the same
+# resource, e.g. two subnets of one virtual network
+CONFLICT_PATTERN = re.compile(
+    r"(AnotherOperationInProgress|ReferencedResourceNotProvisioned|InUseSubnetCannotBeUpdated)",
+)
+
+# Seconds to wait before the first retry, doubled for every further retry
+CONFLICT_BACKOFF_SECONDS = 15
+
+# Environment variables that are swapped when running the shared stacks, see
+# the customer repository Makefile.
+SHARED_CREDENTIALS = (
+    "ARM_CLIENT_ID",
+    "ARM_CLIENT_SECRET",
+    "ARM_SUBSCRIPTION_ID",
+    "ARM_TENANT_ID",
+)
+
+PRINT_LOCK = threading.Lock()
+
+
+@dataclass
+class StackRun:
+    """One Pulumi stack and the stacks that have to succeed before it runs."""
+
+    name: str
+    project: str
+    default_config_file_path: str
+    custom_config_file_path: str
+    shared: bool = False
+    depends_on: List[str] = field(default_factory=list)
+    # Resource URNs to limit the operation to, all resources when empty
+    targets: List[str] = field(default_factory=list)
+
+    parallelism: int = 0
+    throttled_requests: int = 0
+    conflicts: int = 0
+    retries: int = 0
+    status: str = "pending"
+    seconds: float = 0.0
+    message: str = ""
+
+
+def build_stack_runs(
+    customer_code: str, environments: List[str], configs_dir: str, extensions: bool
+) -> Dict[str, StackRun]:
+    shared_defaults = path.join(PLATFORM_CONFIG_DIR, "defaults.shared.yml")
+    dtap_defaults = path.join(PLATFORM_CONFIG_DIR, "defaults.yml")
+    shared_config = path.join(configs_dir, "shared.yml")
+
+    core_shared = f"{customer_code}.shared"
+    runs = [
+        StackRun(core_shared, "core-shared", shared_defaults, shared_config, shared=True)
+    ]
+    if extensions:
+        runs.append(
+            StackRun(
+                f"{customer_code}.extensions.shared",
+                "core-extensions",
+                shared_defaults,
+                shared_config,
+                shared=True,
+                depends_on=[core_shared],
+            )
+        )
+
+    for environment in environments:
+        core_dtap = f"{customer_code}.{environment}"
+        dtap_config = path.join(configs_dir, f"{environment}.yml")
+        runs.append(
+            StackRun(
+                core_dtap,
+                "core-dtap",
+                dtap_defaults,
+                dtap_config,
+                depends_on=[core_shared],
+            )
+        )
+        if extensions:
+            runs.append(
+                StackRun(
+                    f"{customer_code}.extensions.{environment}",
+                    "core-extensions",
+                    dtap_defaults,
+                    dtap_config,
+                    depends_on=[core_dtap],
+                )
+            )
+
+    return {run.name: run for run in runs}
+
+
+def load_parallelism(file_path: str) -> Dict[str, dict]:
+    if not path.isfile(file_path):
+        return {}
+    with open(file_path, "r") as f:
+        return json.load(f)
+
+
+def save_parallelism(file_path: str, runs: Dict[str, StackRun], history: Dict[str, dict]):
+    for run in runs.values():
+        if run.status in ("succeeded", "failed"):
+            history[run.name] = {
+                "parallelism": run.parallelism,
+                "throttled_requests": run.throttled_requests,
+            }
+    with open(file_path, "w") as f:
+        json.dump(history, f, indent=2)
+
+
+def next_parallelism(previous: Union[dict, None], initial: int, maximum: int) -> int:
+    """
+    Halves the parallelism of a stack that was throttled in its last run,
+    otherwise raises it by a quarter.
+    """
+    if previous is None:
+        return min(initial, maximum)
+    if previous["throttled_requests"] > 0:
+        return max(1, previous["parallelism"] // 2)
+    return min(maximum, previous["parallelism"] + max(1, previous["parallelism"] // 4))
+
+
+def stack_env_vars(run: StackRun, configs_dir: str) -> Dict[str, str]:
+    env_vars = {
+        "ADP_CONFIG_SCHEMA_FILE_PATH": path.join(PLATFORM_CONFIG_DIR, "schema.yml"),
+        "ADP_DEFAULT_CONFIG_FILE_PATH": run.default_config_file_path,
+        "ADP_CUSTOM_CONFIGS_FILE_PATH": run.custom_config_file_path,
+        "ADP_METADATA_FILE_PATH": path.join(configs_dir, "metadata.yml"),
+    }
+    if run.shared and getenv("SHARED_ARM_CLIENT_ID"):
+        env_vars.update({name: getenv(f"SHARED_{name}", "") for name in SHARED_CREDENTIALS})
+    return env_vars
+
+
+def execute(run: StackRun, operation: str, configs_dir: str) -> None:
+    def on_output(line: str):
+        if THROTTLING_PATTERN.search(line):
+            run.throttled_requests += 1
+        if CONFLICT_PATTERN.search(line):
+            run.conflicts += 1
+        with PRINT_LOCK:
+            print(f"[{run.name}] {line}", flush=True)
+
+    stack = auto.select_stack(
+        stack_name=run.name,
+        work_dir=path.join(PULUMI_SOURCE_DIR, run.project),
+        opts=auto.LocalWorkspaceOptions(env_vars=stack_env_vars(run, configs_dir)),
+    )
+
+    targets = {"target": run.targets, "target_dependents": True} if run.targets else {}
+
+    if operation == "preview":
+        stack.preview(parallel=run.parallelism, diff=True, on_output=on_output, **targets)
+    elif operation == "refresh":
+        stack.refresh(
+            parallel=run.parallelism, on_output=on_output, target=run.targets or None
+        )
+    else:
+        stack.up(parallel=run.parallelism, diff=True, on_output=on_output, **targets)
+
+
+def execute_with_retries(
+    run: StackRun, operation: str, configs_dir: str, max_retries: int
+) -> None:
+    """
+    Runs the operation, and runs it again with an exponential backoff when it
+    failed after Azure reported conflicting updates. Only apply changes
+    resources, so only apply is retried.
+    """
+    while True:
+        conflicts_before = run.conflicts
+        try:
+            return execute(run, operation, configs_dir)
+        except Exception:
+            conflicted = run.conflicts > conflicts_before
+            if operation != "apply" or not conflicted or run.retries >= max_retries:
+                raise
+
+        delay = CONFLICT_BACKOFF_SECONDS * 2**run.retries * random.uniform(1, 1.5)
+        run.retries += 1
+        with PRINT_LOCK:
+            print(
+                f"[{run.name}] Conflicting Azure updates, retry {run.retries} of "
+                f"{max_retries} in {delay:.0f}s. 🔁",
+                flush=True,
+            )
+        sleep(delay)
+
+
+def run_stacks(
+    runs: Dict[str, StackRun], operation: str, configs_dir: str, max_retries: int = 0
+) -> None:
+    # Dependencies outside of the runs, e.g. stacks a plan left out, are
+    # treated as up to date.
+    for run in runs.values():
+        run.depends_on = [name for name in run.depends_on if name in runs]
+
+    pending = dict(runs)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=len(runs)) as executor:
+        while pending or running:
+            for run in list(pending.values()):
+                dependencies = [runs[name].status for name in run.depends_on]
+                if any(status in ("failed", "skipped") for status in dependencies):
+                    run.status = "skipped"
+                    run.message = "a dependency did not succeed"
+                    del pending[run.name]
+                elif all(status == "succeeded" for status in dependencies):
+                    run.status = "running"
+                    start_time = perf_counter()
+                    future = executor.submit(
+                        execute_with_retries, run, operation, configs_dir, max_retries
+                    )
+                    running[future] = (run, start_time)
+                    del pending[run.name]
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                run, start_time = running.pop(future)
+                run.seconds = perf_counter() - start_time
+                try:
+                    future.result()
+                    run.status = "succeeded"
+                except Exception as e:
+                    run.status = "failed"
+                    run.message = str(e).strip().splitlines()[-1] if str(e).strip() else repr(e)
+
+
+def report(runs: Dict[str, StackRun], total_seconds: float) -> str:
+    width = max(len(name) for name in runs)
+    lines = [
+        f"{'Stack':<{width}}  {'Status':<9}  {'Time':>8}  {'Parallel':>8}  {'429s':>5}  {'Retries':>7}"
+    ]
+    for run in runs.values():
+        lines.append(
+            f"{run.name:<{width}}  {run.status:<9}  {run.seconds:>7.0f}s  "
+            f"{run.parallelism:>8}  {run.throttled_requests:>5}  {run.retries:>7}"
+            + (f"  {run.message}" if run.message else "")
+        )
+    sequential_seconds = sum(run.seconds for run in runs.values())
+    lines.append(
+        f"Wall-clock time {total_seconds:.0f}s, "
+        f"{sequential_seconds:.0f}s if run one after another."
+    )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    runs = build_stack_runs(
+        args.customer_code, args.environments, args.configs_dir, not args.no_extensions
+    )
+
+    history = load_parallelism(args.parallelism_file)
+    for run in runs.values():
+        run.parallelism = next_parallelism(
+            history.get(run.name), args.initial_parallelism, args.max_parallelism
+        )
+
+    start_time = perf_counter()
+    run_stacks(runs, args.operation, args.configs_dir, args.conflict_retries)
+    total_seconds = perf_counter() - start_time
+
+    save_parallelism(args.parallelism_file, runs, history)
+    print(report(runs, total_seconds))
+
+    if any(run.status != "succeeded" for run in runs.values()):
+        sys.exit(1)
@@ -0,0 +1,230 @@
+"""
+This script compiles the platform configuration schema (schema.yml) into a
+module of frozen, slotted dataclasses. The generated module gives typed,
+attribute based access to a validated configuration, e.g.
+platform_config.model.storage.accounts["datalake"].containers["raw"].
+
+Re-run it whenever schema.yml changes:
+python scripts/generate_config_model.py
+"""
+import argparse
+from os import path
+from typing import Dict, List, Tuple
+
+import yamale
+from yamale import validators as val
+
+SOURCE_DIR = path.dirname(path.dirname(path.abspath(__file__)))
+
+parser = argparse.ArgumentParser(
+    description="Generates the typed platform configuration model from the YAML schema."
+)
+
+parser.add_argument(
+    "--schema-file",
+    type=str,
+    nargs="?",
+    help="The yamale schema file to compile.",
+    required=False,
+    default=path.join(SOURCE_DIR, "platform-config", "schema.yml"),
+)
+
+parser.add_argument(
+    "--output-file",
+    type=str,
+    nargs="?",
+    help="The Python module to write the generated model to.",
+    required=False,
+    default=path.join(
+        SOURCE_DIR,
+        "python",
+        "ingenii_azure_data_platform",
+        "ingenii_azure_data_platform",
+        "config_model.py",
+    ),
+)
+
+ROOT_CLASS_NAME = "PlatformConfigModel"
+
+HEADER = '''"""
+Typed model of the platform configuration.
+
+Generated by src/scripts/generate_config_model.py from
+src/platform-config/schema.yml. Do not edit by hand.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Literal, Mapping, Optional, Tuple, Union
+
+
+def _tuple(value: Any, convert: Optional[Callable] = None) -> Optional[tuple]:
+    if value is None:
+        return None
+    if convert is None:
+        return tuple(value)
+    return tuple(convert(item) for item in value)
+
+
+def _mapping(value: Any, convert: Optional[Callable] = None) -> Optional[Mapping]:
+    if value is None:
+        return None
+    if convert is None:
+        return MappingProxyType(dict(value))
+    return MappingProxyType({key: convert(item) for key, item in value.items()})
+'''
+
+
+def pascal_case(name: str) -> str:
+    return "".join(part[:1].upper() + part[1:] for part in name.split("_") if part)
+
+
+class ModelCompiler:
+    """Walks the parsed yamale schema and renders one dataclass per mapping."""
+
+    def __init__(self, schema: yamale.schema.Schema):
+        self._schema = schema
+        self._class_names = self._name_includes(schema.includes)
+        # Rendered classes, in dependency order
+        self._classes: Dict[str, str] = {}
+
+    @staticmethod
+    def _name_includes(includes: dict) -> Dict[str, str]:
+        names = {}
+        taken = set()
+        # Public definitions get the plain name, so that the common ('_' prefixed)
+        # definitions are the ones renamed on a clash, e.g. 'logs' and '_logs'.
+        for include_name in sorted(includes, key=lambda n: (n.startswith("_"), n)):
+            if not isinstance(includes[include_name]._schema, dict):
+                continue
+            class_name = pascal_case(include_name)
+            if class_name in taken:
+                class_name += "Settings"
+            taken.add(class_name)
+            names[include_name] = class_name
+        return names
+
+    def compile(self) -> str:
+        self._render_class(ROOT_CLASS_NAME, self._schema._schema)
+        return "\n\n".join([HEADER] + list(self._classes.values()))
+
+    def _include_class(self, include_name: str) -> str:
+        class_name = self._class_names[include_name]
+        if class_name not in self._classes:
+            self._render_class(class_name, self._schema.includes[include_name]._schema)
+        return class_name
+
+    def _type_and_converter(self, validator, context: str) -> Tuple[str, str]:
+        """
+        Returns the annotation of a validator and the expression of a callable
+        that converts a raw value to it. The callable is 'None' when the raw
+        value can be used as is.
+        """
+        if isinstance(validator, dict):
+            class_name = context
+            self._render_class(class_name, validator)
+            return class_name, f"{class_name}.from_dict"
+
+        if isinstance(validator, val.Include):
+            include = self._schema.includes[validator.include_name]
+            if not isinstance(include._schema, dict):
+                # Named aliases of other validators, e.g. 'packages'
+                return self._type_and_converter(include._schema, context)
+            class_name = self._include_class(validator.include_name)
+            return class_name, f"{class_name}.from_dict"
+
+        if isinstance(validator, val.List):
+            item_type, item_converter = self._union(validator.validators, context)
+            return f"Tuple[{item_type}, ...]", self._wrap("_tuple", item_converter)
+
+        if isinstance(validator, val.Map):
+            value_type, value_converter = self._union(validator.validators, context)
+            return f"Mapping[str, {value_type}]", self._wrap("_mapping", value_converter)
+
+        if isinstance(validator, val.Enum):
+            return f"Literal[{', '.join(repr(e) for e in validator.enums)}]", "None"
+
+        scalar_types = (
+            (val.Boolean, "bool"),
+            (val.Integer, "int"),
+            (val.Number, "float"),
+            (val.Null, "None"),
+            (val.String, "str"),
+            (val.Ip, "str"),
+            (val.Regex, "str"),
+        )
+        for validator_type, annotation in scalar_types:
+            if isinstance(validator, validator_type):
+                return annotation, "None"
+
+        return "Any", "None"
+
+    def _union(self, validators: List, context: str) -> Tuple[str, str]:
+        if not validators:
+            return "Any", "None"
+        typed = [self._type_and_converter(v, context) for v in validators]
+        if len(typed) == 1:
+            return typed[0]
+
+        annotations = list(dict.fromkeys(t for t, _ in typed))
+        converters = {c for _, c in typed if c != "None"}
+        # Raw values are kept when it is ambiguous which conversion applies.
+        converter = converters.pop() if len(converters) == 1 else "None"
+        return f"Union[{', '.join(annotations)}]", converter
+
+    @staticmethod
+    def _wrap(container_function: str, item_converter: str) -> str:
+        if item_converter == "None":
+            return f"lambda value: {container_function}(value)"
+        return f"lambda value: {container_function}(value, {item_converter})"
+
+    def _render_class(self, class_name: str, fields: dict) -> None:
+        # Reserve the name first, so self-referencing schemas terminate
+        self._classes[class_name] = ""
+
+        annotations, arguments = [], []
+        for field_name, validator in fields.items():
+            annotation, converter = self._type_and_converter(
+                validator, class_name + pascal_case(field_name)
+            )
+            required = isinstance(validator, dict) or validator.is_required
+            if required:
+                annotations.append(f"    {field_name}: {annotation}")
+            else:
+                annotations.append(f"    {field_name}: Optional[{annotation}] = None")
+
+            raw_value = f'data.get("{field_name}")'
+            if converter == "None":
+                arguments.append(f"            {field_name}={raw_value},")
+            elif converter.startswith("lambda value: "):
+                call = converter[len("lambda value: "):].replace("(value", f"({raw_value}", 1)
+                arguments.append(f"            {field_name}={call},")
+            else:
+                arguments.append(f"            {field_name}={converter}({raw_value}),")
+
+        # Dependencies were rendered while walking the fields, so move this
+        # class after them.
+        del self._classes[class_name]
+        self._classes[class_name] = "\n".join(
+            [
+                "@dataclass(frozen=True, slots=True, kw_only=True)",
+                f"class {class_name}:",
+                *annotations,
+                "",
+                "    @classmethod",
+                f'    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["{class_name}"]:',
+                "        if data is None:",
+                "            return None",
+                "        return cls(",
+                *arguments,
+                "        )",
+                "",
+            ]
+        )
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    compiled = ModelCompiler(yamale.make_schema(args.schema_file)).compile()
+    with open(args.output_file, "w") as f:
+        f.write(compiled)
+    print(f"Generated {args.output_file}")
@@ -0,0 +1,454 @@
+"""
+This script deploys only what a configuration change affects.
+
+The merged configuration of every stack is compared with a snapshot of the
+configuration it was last deployed with. Each changed configuration path is
+mapped to the stacks that read it and, where the resources are known, to the
+URNs of the resources it configures, e.g. a new entry under
+storage.accounts.<account>.containers maps to that container's BlobContainer
+resource in the core-dtap stack. Stacks without changes are skipped, stacks
+whose changes all map to resources are updated with those resources as
+targets (and their dependents, such as locks and role assignments), and all
+other stacks are updated in full.
+
+The snapshots are written after a successful update, one JSON file per stack
+in --snapshot-dir, together with a hash of the platform source the stack is
+deployed from: its Pulumi program, the Python package and the platform
+configuration defaults and schema. A stack without a snapshot, or whose source
+changed since, e.g. after a platform upgrade, is updated in full.
+
+The parallelism and conflict retries take the same arguments as
+deploy_platform.py.
+
+Examples:
+python scripts/plan_changes.py plan --customer-code abc --configs-dir configs
+python scripts/plan_changes.py apply --customer-code abc --configs-dir configs
+"""
+import argparse
+import fnmatch
+import hashlib
+import json
+import sys
+from dataclasses import dataclass, field
+from os import makedirs, path, walk
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+import yaml
+
+SOURCE_DIR = path.dirname(path.dirname(path.abspath(__file__)))
+sys.path.insert(0, path.join(SOURCE_DIR, "python", "ingenii_azure_data_platform"))
+
+from deploy_platform import (  # noqa: E402
+    PLATFORM_CONFIG_DIR,
+    PULUMI_SOURCE_DIR,
+    StackRun,
+    add_run_arguments,
+    build_stack_runs,
+    load_parallelism,
+    next_parallelism,
+    report,
+    run_stacks,
+    save_parallelism,
+)
+from ingenii_azure_data_platform.config import PlatformConfiguration  # noqa: E402
+from ingenii_azure_data_platform.utils import generate_resource_name  # noqa: E402
+
+parser = argparse.ArgumentParser(
+    description="Plans and applies the changes of the platform configuration to the affected stacks and resources only."
+)
+
+parser.add_argument(
+    "operation",
+    type=str,
+    choices=["plan", "preview", "apply", "snapshot"],
+    help="Print the plan, preview or apply it, or record the current configuration as deployed.",
+)
+
+parser.add_argument(
+    "--customer-code",
+    type=str,
+    help="The customer code the stack names start with.",
+    required=True,
+)
+
+parser.add_argument(
+    "--environments",
+    type=str,
+    nargs="+",
+    help="The DTAP environments to plan.",
+    required=False,
+    default=["dev", "test", "prod"],
+)
+
+parser.add_argument(
+    "--configs-dir",
+    type=str,
+    help="The directory with the customer's platform configuration files and metadata.yml.",
+    required=True,
+)
+
+parser.add_argument(
+    "--snapshot-dir",
+    type=str,
+    help="The directory with the configurations the stacks were last deployed with.",
+    required=False,
+    default="config-snapshots",
+)
+
+add_run_arguments(parser)
+
+# ----------------------------------------------------------------------------------------------------------------------
+# CONFIGURATION DIFF
+# ----------------------------------------------------------------------------------------------------------------------
+
+# Lists whose items are identified by one of their fields, so that adding one
+# item is a change to that item only.
+LIST_ITEM_KEYS = {
+    "users": "email_address",
+}
+
+
+def diff_configs(old: Any, new: Any, prefix: Tuple[str, ...] = ()) -> List[Tuple[str, ...]]:
+    """
+    Returns the paths of all values that were added, removed or changed.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in sorted(set(old) | set(new), key=str):
+            # A section that was added or removed as a whole is compared with
+            # an empty one, so that it is reported entry by entry.
+            value = new[key] if key in new else old[key]
+            empty = type(value)() if isinstance(value, (dict, list)) and value else None
+            if (key not in old or key not in new) and empty is None:
+                changes.append(prefix + (str(key),))
+            else:
+                changes += diff_configs(
+                    old.get(key, empty), new.get(key, empty), prefix + (str(key),)
+                )
+        return changes
+
+    item_key = LIST_ITEM_KEYS.get(prefix[-1]) if prefix else None
+    if item_key and isinstance(old, list) and isinstance(new, list):
+        old_items = {item.get(item_key): item for item in old if isinstance(item, dict)}
+        new_items = {item.get(item_key): item for item in new if isinstance(item, dict)}
+        if len(old_items) == len(old) and len(new_items) == len(new):
+            return diff_configs(old_items, new_items, prefix)
+
+    return [] if old == new else [prefix]
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# CHANGE RULES
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+@dataclass
+class ChangeRule:
+    """
+    Maps configuration paths matching 'pattern' to the program that reads
+    them, and optionally to the resources they configure. 'resources' returns
+    (resource type, resource name) pairs for the matched path, or None when
+    the change can't be limited to known resources.
+    """
+
+    pattern: Tuple[str, ...]
+    program: str
+    module: str
+    resources: Union[
+        Callable[[Tuple[str, ...], PlatformConfiguration, dict], Union[List[Tuple[str, str]], None]], None
+    ] = None
+
+
+def _has_lifecycle_policy(account_config):
+    # Whether ingenii_azure_data_platform.storage.lifecycle_rules() returns any rules
+    lm_config = account_config.get("lifecycle_management", {})
+    actions = ("archive_after", "cool_after", "delete_after")
+    rules = lm_config.get("rules", {}).values()
+    if any(rule_config.get(action) is not None for rule_config in rules for action in actions):
+        return True
+    if all(lm_config.get(action) is None for action in actions):
+        return False
+    covered_containers = {ref_key for rule_config in rules for ref_key in rule_config["containers"]}
+    return any(ref_key not in covered_containers for ref_key in account_config.get("containers", {}))
+
+
+def _container_resources(changed_path, platform_config, config):
+    resources = [
+        (
+            "azure-native:storage:BlobContainer",
+            generate_resource_name("storage_blob_container", changed_path[4], platform_config),
+        )
+    ]
+    # The lifecycle rules filter on the container names
+    if _has_lifecycle_policy(config["storage"]["accounts"][changed_path[2]]):
+        resources.append(
+            (
+                "azure-native:storage:ManagementPolicy",
+                generate_resource_name(
+                    "storage_management_policy", f"{changed_path[2]}-blob-overall", platform_config
+                ),
+            )
+        )
+    return resources
+
+
+def _table_resources(changed_path, platform_config, config):
+    account_config = config["storage"]["accounts"][changed_path[2]]
+    table_config = account_config["tables"][changed_path[4]]
+    datalake_name = generate_resource_name(
+        "storage_account", account_config["display_name"], platform_config
+    )
+    table_name = table_config["display_name"]
+    # Switching the sync creates and deletes resources other than the
+    # targets, see storage/common.py
+    if len(changed_path) > 5 and changed_path[5] in ("entity_sync", "retain_entities"):
+        return None
+    if len(changed_path) > 5 and changed_path[5] == "entities":
+        # All entities of a 'batch' table are one TableEntitySet
+        if table_config.get("entity_sync") == "batch":
+            return [
+                (
+                    "pulumi-python:dynamic:Resource",
+                    f"{datalake_name}-{table_name}-entities".lower(),
+                )
+            ]
+        if len(changed_path) > 6:
+            return [
+                (
+                    "azure:storage/tableEntity:TableEntity",
+                    f"{datalake_name}-{table_name}-{changed_path[6]}".lower(),
+                )
+            ]
+    return [("azure-native:storage:Table", f"{datalake_name}-{table_name}".lower())]
+
+
+def _databricks_user_resources(changed_path, platform_config, config):
+    return [("databricks:index/user:User", f"{changed_path[3]}_workspace_user_{changed_path[5]}")]
+
+
+CHANGE_RULES = [
+    ChangeRule(
+        ("storage", "accounts", "*", "containers", "*", "*"),
+        "core-dtap",
+        "storage/common.py",
+        _container_resources,
+    ),
+    ChangeRule(
+        ("storage", "accounts", "*", "tables", "*", "*"),
+        "core-dtap",
+        "storage/common.py",
+        _table_resources,
+    ),
+    ChangeRule(
+        ("analytics_services", "databricks", "workspaces", "*", "users", "*", "*"),
+        "core-dtap",
+        "analytics/databricks",
+        _databricks_user_resources,
+    ),
+    ChangeRule(("packages", "*"), "core-extensions", "core-extensions"),
+]
+
+
+def match_rule(changed_path: Tuple[str, ...], program: str) -> Union[ChangeRule, None]:
+    for rule in CHANGE_RULES:
+        if rule.program != program:
+            continue
+        # A rule matches the path and anything below it, and the addition or
+        # removal of a whole entry one level up, e.g. a new container.
+        pattern = rule.pattern[: len(changed_path)]
+        if len(changed_path) >= len(rule.pattern) - 1 and all(
+            fnmatch.fnmatchcase(part, pattern_part)
+            for part, pattern_part in zip(changed_path, pattern)
+        ):
+            return rule
+    return None
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# PLANNING
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+@dataclass
+class StackPlan:
+    run: StackRun
+    # 'skip', 'targeted' or 'full'
+    mode: str = "skip"
+    reasons: List[str] = field(default_factory=list)
+
+
+def snapshot_file_path(snapshot_dir: str, stack_name: str) -> str:
+    return path.join(snapshot_dir, f"{stack_name}.json")
+
+
+PACKAGE_SOURCE_DIR = path.join(SOURCE_DIR, "python", "ingenii_azure_data_platform", "ingenii_azure_data_platform")
+
+
+def source_hash(project: str) -> str:
+    """
+    Hashes the source a stack is deployed from. Generated Pulumi project and
+    stack files, and compiled Python files, are left out.
+    """
+    digest = hashlib.sha256()
+    for source_dir in (path.join(PULUMI_SOURCE_DIR, project), PACKAGE_SOURCE_DIR, PLATFORM_CONFIG_DIR):
+        for root, dirs, files in walk(source_dir):
+            dirs[:] = sorted(d for d in dirs if d not in ("__pycache__", "venv", ".venv"))
+            for file_name in sorted(files):
+                if file_name.startswith("Pulumi.") or file_name.endswith(".pyc"):
+                    continue
+                file_path = path.join(root, file_name)
+                digest.update(path.relpath(file_path, SOURCE_DIR).encode())
+                with open(file_path, "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_platform_config(run: StackRun, configs_dir: str, stack: str) -> PlatformConfiguration:
+    return PlatformConfiguration(
+        stack=stack,
+        config_schema_file_path=path.join(PLATFORM_CONFIG_DIR, "schema.yml"),
+        default_config_file_path=run.default_config_file_path,
+        metadata_file_path=path.join(configs_dir, "metadata.yml"),
+        custom_config_file_path=run.custom_config_file_path,
+    )
+
+
+def stack_urn(run: StackRun, resource_type: str, resource_name: str) -> str:
+    with open(path.join(PULUMI_SOURCE_DIR, run.project, "Pulumi.yaml"), "r") as f:
+        project_name = yaml.safe_load(f)["name"]
+    return f"urn:pulumi:{run.name}::{project_name}::{resource_type}::{resource_name}"
+
+
+def plan_stack(plan: StackPlan, platform_config: PlatformConfiguration, snapshot_dir: str):
+    run = plan.run
+    snapshot_path = snapshot_file_path(snapshot_dir, run.name)
+    if not path.isfile(snapshot_path):
+        plan.mode = "full"
+        plan.reasons.append("no snapshot of the deployed configuration")
+        return
+
+    with open(snapshot_path, "r") as f:
+        snapshot = json.load(f)
+
+    if snapshot.get("source_hash") != source_hash(run.project):
+        plan.mode = "full"
+        plan.reasons.append("platform source changed since the snapshot")
+        return
+
+    deployed_config = snapshot["config"]
+
+    targets = []
+    for changed_path in diff_configs(deployed_config, platform_config.from_yml):
+        path_name = ".".join(changed_path)
+        # Extensions only read the packages, the core programs everything else.
+        if run.project == "core-extensions" and changed_path[0] != "packages":
+            continue
+        if run.project != "core-extensions" and changed_path[0] == "packages":
+            continue
+
+        rule = match_rule(changed_path, run.project)
+
+        # Resources are named from both configurations, to cover additions,
+        # removals and renames.
+        resources = None
+        if rule is not None and rule.resources is not None:
+            resources = []
+            for config in (deployed_config, platform_config.from_yml):
+                try:
+                    config_resources = rule.resources(changed_path, platform_config, config)
+                except KeyError:
+                    continue
+                if config_resources is None:
+                    resources = None
+                    break
+                resources += config_resources
+
+        if resources is None:
+            plan.mode = "full"
+            plan.reasons.append(f"{path_name} (full update)")
+            continue
+
+        targets += [stack_urn(run, *resource) for resource in resources]
+        plan.reasons.append(f"{path_name} ({rule.module})")
+        if plan.mode == "skip":
+            plan.mode = "targeted"
+
+    run.targets = sorted(set(targets)) if plan.mode == "targeted" else []
+
+
+def build_plans(args) -> Tuple[Dict[str, StackPlan], Dict[str, PlatformConfiguration]]:
+    runs = build_stack_runs(args.customer_code, args.environments, args.configs_dir, True)
+    plans, platform_configs = {}, {}
+    for name, run in runs.items():
+        stack = "shared" if run.shared else name.rsplit(".", 1)[-1]
+        platform_configs[name] = load_platform_config(run, args.configs_dir, stack)
+        plans[name] = StackPlan(run)
+        plan_stack(plans[name], platform_configs[name], args.snapshot_dir)
+
+    # A full update can change any output that the dependent stacks read.
+    for plan in plans.values():
+        for dependency in plan.run.depends_on:
+            if plans[dependency].mode == "full" and plan.mode != "full":
+                plan.mode = "full"
+                plan.run.targets = []
+                plan.reasons.append(f"full update of {dependency}")
+
+    return plans, platform_configs
+
+
+def save_snapshot(snapshot_dir: str, run: StackRun, platform_config: PlatformConfiguration):
+    makedirs(snapshot_dir, exist_ok=True)
+    snapshot = {"source_hash": source_hash(run.project), "config": platform_config.from_yml}
+    with open(snapshot_file_path(snapshot_dir, run.name), "w") as f:
+        json.dump(snapshot, f, indent=2, sort_keys=True)
+
+
+def print_plan(plans: Dict[str, StackPlan]):
+    for plan in plans.values():
+        print(f"{plan.run.name}: {plan.mode}")
+        for reason in plan.reasons:
+            print(f"    {reason}")
+        for target in plan.run.targets:
+            print(f"    -> {target}")
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    plans, platform_configs = build_plans(args)
+
+    if args.operation == "snapshot":
+        for name, platform_config in platform_configs.items():
+            save_snapshot(args.snapshot_dir, plans[name].run, platform_config)
+        sys.exit(0)
+
+    print_plan(plans)
+    if args.operation == "plan":
+        sys.exit(0)
+
+    runs = {name: plan.run for name, plan in plans.items() if plan.mode != "skip"}
+    if not runs:
+        print("No configuration changes, nothing to deploy. ✅")
+        sys.exit(0)
+
+    history = load_parallelism(args.parallelism_file)
+    for run in runs.values():
+        run.parallelism = next_parallelism(
+            history.get(run.name), args.initial_parallelism, args.max_parallelism
+        )
+
+    operation = "apply" if args.operation == "apply" else "preview"
+    start_time = perf_counter()
+    run_stacks(runs, operation, args.configs_dir, args.conflict_retries)
+    total_seconds = perf_counter() - start_time
+    save_parallelism(args.parallelism_file, runs, history)
+    print(report(runs, total_seconds))
+
+    if operation == "apply":
+        for name, run in runs.items():
+            if run.status == "succeeded":
+                save_snapshot(args.snapshot_dir, run, platform_configs[name])
+
+    if any(run.status != "succeeded" for run in runs.values()):
+        sys.exit(1)